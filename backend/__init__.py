@@ -4,6 +4,7 @@ from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_pymongo import PyMongo
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Initialize MongoDB connection
 mongo = PyMongo()
@@ -11,6 +12,78 @@ mongo = PyMongo()
 load_dotenv()
 
 
+def configure(app, config_overrides: dict | None = None) -> None:
+    """Apply the configuration shared by the Flask app and the ASGI app (backend.aio)."""
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    # MongoDB configuration
+    app.config["MONGO_URI"] = os.getenv("MONGODB_URI", "mongodb://localhost:27017/lostfound")
+    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "your-secret-key-here")
+    # "mongo" (MONGO_URI) or "memory" (backend.storage.memory, single process only)
+    app.config.setdefault("STORAGE_ENGINE", os.getenv("STORAGE_ENGINE", "mongo"))
+    # Memory engine: snapshot file loaded at startup and rewritten every STORAGE_SNAPSHOT_SECONDS and at exit
+    app.config.setdefault("STORAGE_SNAPSHOT_PATH", os.getenv("STORAGE_SNAPSHOT_PATH") or None)
+    app.config.setdefault("STORAGE_SNAPSHOT_SECONDS", float(os.getenv("STORAGE_SNAPSHOT_SECONDS", 60)))
+    # Campuses served by this deployment; each one is a separate query/index partition
+    app.config.setdefault("CAMPUSES", [c.strip() for c in os.getenv("CAMPUSES", "main").split(",") if c.strip()])
+    app.config.setdefault("DEFAULT_CAMPUS", os.getenv("DEFAULT_CAMPUS", app.config["CAMPUSES"][0]))
+    # Campus given at startup to documents from before campuses existed
+    app.config.setdefault("LEGACY_CAMPUS", os.getenv("LEGACY_CAMPUS", app.config["DEFAULT_CAMPUS"]))
+    # "field": shared collections partitioned by the campus field; "database": one database per campus
+    app.config.setdefault("CAMPUS_PARTITIONING", os.getenv("CAMPUS_PARTITIONING", "field"))
+    app.config.setdefault("ARCHIVE_AFTER_DAYS", int(os.getenv("ARCHIVE_AFTER_DAYS", 180)))
+    app.config.setdefault("STATS_RECONCILE_SECONDS", int(os.getenv("STATS_RECONCILE_SECONDS", 3600)))
+    app.config.setdefault("MATCH_TOP_K", int(os.getenv("MATCH_TOP_K", 10)))
+    app.config.setdefault("MATCH_BLOCK_SIZE", int(os.getenv("MATCH_BLOCK_SIZE", 256)))
+    app.config.setdefault("MATCH_MAX_TERMS", int(os.getenv("MATCH_MAX_TERMS", 8)))
+    app.config.setdefault("MATCH_DATE_TOLERANCE_DAYS", int(os.getenv("MATCH_DATE_TOLERANCE_DAYS", 2)))
+    # "auto" tails a change stream on replica sets and sharded clusters and uses in-process events
+    # elsewhere (standalone mongod, memory engine); "local" or "change_stream" force a mode
+    app.config.setdefault("EVENTS_BACKEND", os.getenv("EVENTS_BACKEND", "auto"))
+    app.config.setdefault("EVENTS_HEARTBEAT_SECONDS", int(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15)))
+    # Whether the Flask app serves /api/events; serve.py turns it off under thread-per-request workers
+    app.config.setdefault("EVENTS_STREAM", os.getenv("EVENTS_STREAM", "1") != "0")
+    # Reverse proxies in front of the app whose X-Forwarded-* headers are trusted (0: none, use the peer address)
+    app.config.setdefault("TRUSTED_PROXIES", int(os.getenv("TRUSTED_PROXIES", 0)))
+    # Rate-limit state: "memory://" per process, or "redis://host:6379/0" shared by all workers
+    app.config.setdefault("ADMISSION_STORAGE_URI", os.getenv("ADMISSION_STORAGE_URI", "memory://"))
+    # Per-endpoint overrides merged into utils.admission.DEFAULT_RULES, e.g. {"api.login": {"rate": 1, "burst": 20}}
+    # keeps login's concurrency limit; None lifts an endpoint's limits
+    app.config.setdefault("ADMISSION_RULES", {})
+    # Request deadlines (utils.deadlines): default budget, cap for X-Request-Timeout-Ms, per-endpoint budgets
+    app.config.setdefault("REQUEST_DEADLINE_MS", float(os.getenv("REQUEST_DEADLINE_MS", 10000)))
+    app.config.setdefault("REQUEST_DEADLINE_MAX_MS", float(os.getenv("REQUEST_DEADLINE_MAX_MS", 25000)))
+    # e.g. {"api.get_retrievals": 20000}; None disables the deadline of an endpoint
+    app.config.setdefault("REQUEST_DEADLINES", {})
+    # Request profiling (utils.profiling): share of requests profiled besides those sent with X-Profile
+    app.config.setdefault("PROFILING_SAMPLE_RATE", float(os.getenv("PROFILING_SAMPLE_RATE", 0)))
+    # "cprofile" (deterministic) or "sample" (stack sampling every PROFILING_SAMPLE_INTERVAL_MS)
+    app.config.setdefault("PROFILING_MODE", os.getenv("PROFILING_MODE", "cprofile"))
+    app.config.setdefault("PROFILING_SAMPLE_INTERVAL_MS", float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", 5)))
+    # Capacity of the capped request_profiles collection (whichever limit is hit first)
+    app.config.setdefault("PROFILING_BUFFER_SIZE", int(os.getenv("PROFILING_BUFFER_SIZE", 200)))
+    app.config.setdefault("PROFILING_BUFFER_MB", int(os.getenv("PROFILING_BUFFER_MB", 64)))
+
+
+def init_mongo(app: Flask) -> None:
+    """Connect ``mongo`` for ``app``; also used to reconnect in forked server workers."""
+    from .utils.mongo_monitor import command_recorder  # noqa: WPS433
+
+    mongo.init_app(app, event_listeners=[command_recorder])
+
+
+def frontend_origins() -> list[str]:
+    """Origins allowed by CORS: the Vite dev server (ports 5173 and 5174) and FRONTEND_ORIGIN."""
+    origins = [
+        "http://localhost:5173",
+        "http://localhost:5174",
+        os.getenv("FRONTEND_ORIGIN", "http://localhost:5173")
+    ]
+    # Remove any duplicates and None values
+    return list({origin for origin in origins if origin})
+
+
 def create_app(config_overrides: dict | None = None) -> Flask:
     """Application factory for the Flask app.
 
@@ -30,13 +103,15 @@ def create_app(config_overrides: dict | None = None) -> Flask:
         static_url_path=static_url_path,
     )
 
-    if config_overrides:
-        app.config.update(config_overrides)
+    configure(app, config_overrides)
+    if app.config["TRUSTED_PROXIES"]:
+        # Client address and scheme from the proxies' headers (rate limits are keyed on the address)
+        proxies = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
 
-    # MongoDB configuration
-    app.config["MONGO_URI"] = os.getenv("MONGODB_URI", "mongodb://localhost:27017/lostfound")
-    app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "your-secret-key-here")
-    mongo.init_app(app)
+    from .storage import init_storage  # noqa: WPS433
+
+    init_storage(app)
 
     # Ensure DB indexes on startup
     with app.app_context():
@@ -47,21 +122,26 @@ def create_app(config_overrides: dict | None = None) -> Flask:
             # Avoid hard-failing app if index creation encounters a transient error
             app.logger.warning(f"Index creation warning: {exc}")
 
-    # CORS for Vite dev server - allow both 5173 and 5174 ports in development
-    frontend_origins = [
-        "http://localhost:5173",
-        "http://localhost:5174",
-        os.getenv("FRONTEND_ORIGIN", "http://localhost:5173")
-    ]
-    # Remove any duplicates and None values
-    frontend_origins = list({origin for origin in frontend_origins if origin})
-    CORS(app, resources={"/api/*": {"origins": frontend_origins}})
+    CORS(app, resources={"/api/*": {"origins": frontend_origins()}})
 
     # Register blueprints
     from .routes.api import api_bp  # noqa: WPS433 (import within function)
+    from .utils.admission import init_admission  # noqa: WPS433
+    from .utils.deadlines import init_deadlines  # noqa: WPS433
+    from .utils.events import init_events  # noqa: WPS433
+    from .utils.profiling import init_profiling  # noqa: WPS433
+
+    init_profiling(app)
+    init_admission(app)
+    init_deadlines(app)
+    init_events(app)
 
     app.register_blueprint(api_bp, url_prefix="/api")
 
+    from .cli import register_commands  # noqa: WPS433
+
+    register_commands(app)
+
     @app.get("/healthz")
     def healthz():  # type: ignore[unused-ignore]
         return jsonify(status="ok")
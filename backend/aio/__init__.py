@@ -0,0 +1,54 @@
+"""Async (ASGI) variant of the API.
+
+Serves the same ``/api`` routes as the Flask app from :mod:`backend.aio.routes`,
+on Quart and PyMongo's ``AsyncMongoClient``, so a worker keeps many requests
+in flight on one event loop instead of pinning a thread per request. Run it
+with any ASGI server, e.g. ``uvicorn backend.aio.app:app --workers 4``.
+"""
+import asyncio
+
+from pymongo import AsyncMongoClient
+from quart import Quart, jsonify
+from quart_cors import cors
+
+from backend import configure, frontend_origins
+
+
+def _sync_app(config_overrides: dict | None):
+    """The Flask app, which owns the index definitions and runs the events change stream."""
+    from backend import create_app, mongo
+    from backend.utils.events import broker
+
+    sync_app = create_app(config_overrides)
+    if broker.local_mode:
+        # Nothing left for the sync client to do in this worker
+        mongo.cx.close()
+    return sync_app
+
+
+def create_app(config_overrides: dict | None = None) -> Quart:
+    """Application factory for the ASGI app; configuration is shared with :func:`backend.create_app`."""
+    app = Quart(__name__)
+    configure(app, config_overrides)
+    if app.config["STORAGE_ENGINE"] != "mongo":
+        raise ValueError("The async app only supports STORAGE_ENGINE=mongo")
+
+    @app.before_serving
+    async def connect_mongo():
+        # One client per worker, created on the worker's event loop
+        app.extensions["mongo"] = AsyncMongoClient(app.config["MONGO_URI"])
+        app.extensions["sync_app"] = await asyncio.to_thread(_sync_app, config_overrides)
+
+    @app.after_serving
+    async def close_mongo():
+        await app.extensions.pop("mongo").close()
+
+    from .routes import api_bp  # noqa: WPS433 (import within function)
+
+    app.register_blueprint(cors(api_bp, allow_origin=frontend_origins()), url_prefix="/api")
+
+    @app.get("/healthz")
+    async def healthz():
+        return jsonify(status="ok")
+
+    return app
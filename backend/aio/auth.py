@@ -0,0 +1,83 @@
+"""Async counterparts of the JWT helpers in :mod:`backend.utils.auth`."""
+from datetime import datetime, timedelta
+from functools import wraps
+
+from jose import jwt
+from quart import current_app, g, jsonify, request
+
+
+def create_token(user_id: str, role: str = 'student', campus: str = None) -> str:
+    """Create a JWT token for authentication"""
+    payload = {
+        'exp': datetime.utcnow() + timedelta(days=1),
+        'iat': datetime.utcnow(),
+        'sub': str(user_id),
+        'role': role,
+        'campus': campus or current_app.config['DEFAULT_CAMPUS']
+    }
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def _decode_request_token(allow_query: bool = False):
+    """Return ``(payload, None)`` or ``(None, error response)`` for the bearer token."""
+    token = None
+    if 'Authorization' in request.headers:
+        try:
+            token = request.headers['Authorization'].split(" ")[1]
+        except IndexError:
+            return None, (jsonify({'message': 'Invalid token format'}), 401)
+    elif allow_query:
+        token = request.args.get('token')
+    if not token:
+        return None, (jsonify({'message': 'Token is missing'}), 401)
+    try:
+        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({'message': 'Token has expired'}), 401)
+    except jwt.JWTError:
+        return None, (jsonify({'message': 'Invalid token'}), 401)
+    g.campus = payload.get('campus', current_app.config['DEFAULT_CAMPUS'])
+    return payload, None
+
+
+def token_required(f):
+    """Decorator to protect routes with JWT authentication"""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        payload, error = _decode_request_token()
+        if error:
+            return error
+        kwargs['current_user_id'] = payload['sub']
+        return await f(*args, **kwargs)
+
+    return decorated
+
+
+def stream_token_required(f):
+    """Like ``token_required``, but also accepts ``?token=`` (``EventSource`` cannot send headers)"""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        payload, error = _decode_request_token(allow_query=True)
+        if error:
+            return error
+        kwargs['current_user_id'] = payload['sub']
+        return await f(*args, **kwargs)
+
+    return decorated
+
+
+def admin_required(f):
+    """Decorator to protect routes requiring admin role"""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        payload, error = _decode_request_token()
+        if error:
+            return error
+        from .models import Student
+        user = await Student.find_by_id(payload['sub'])
+        if not user or user.get('role') != 'admin':
+            return jsonify({'message': 'Admin access required'}), 403
+        kwargs['current_user_id'] = payload['sub']
+        return await f(*args, **kwargs)
+
+    return decorated
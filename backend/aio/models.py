@@ -0,0 +1,476 @@
+"""Async versions of the models in :mod:`backend.models.models`.
+
+Same classes, methods and documents, on PyMongo's ``AsyncMongoClient``. Methods
+that return a cursor in the sync models return a list here; only
+``FoundItem.find_match_candidates`` keeps the cursor so callers can ``explain`` it.
+Writes publish their events like the sync models: through the change stream
+on replica sets, or in-process via :func:`backend.utils.events.notify`.
+"""
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from quart import current_app
+
+from backend.models import models as sync_models
+from backend.models.models import FOUND_ACTIVE_STATUS
+from backend.utils.events import claim_events, notify, retrieval_events
+from backend.utils.locations import best_match, phrases
+
+from .tenancy import current_campus, database, scoped
+
+
+def _db():
+    """Database of the current campus (see :mod:`backend.aio.tenancy`)."""
+    return database()
+
+
+class Student:
+    @staticmethod
+    async def create(email: str, name: str, password_hash: str, role: str = "student",
+                     student_id: ObjectId | None = None):
+        student = {
+            "_id": student_id or ObjectId(),
+            "email": email,
+            "name": name,
+            "password": password_hash,
+            "role": role,  # "student" or "admin"
+            "campus": current_campus(),
+            "created_at": datetime.utcnow()
+        }
+        return await _db().students.insert_one(student)
+
+    @staticmethod
+    async def register(email: str, name: str, password_hash: str):
+        """See :meth:`backend.models.models.Student.register`."""
+        if await Student.find_by_email(email) is not None:
+            return None
+        student_id = ObjectId()
+        role = "admin" if await Marker.claim(sync_models.Marker.FIRST_ADMIN, student_id) else "student"
+        try:
+            await Student.create(email, name, password_hash, role, student_id)
+        except DuplicateKeyError:
+            if role == "admin":
+                await Marker.release(sync_models.Marker.FIRST_ADMIN, student_id)
+            return None
+        return student_id, role
+
+    @staticmethod
+    async def find_by_email(email: str):
+        return await _db().students.find_one(scoped({"email": email}))
+
+    @staticmethod
+    async def find_by_id(student_id: str):
+        return await _db().students.find_one(scoped({"_id": ObjectId(student_id)}))
+
+    @staticmethod
+    async def exists_any() -> bool:
+        return await _db().students.find_one(scoped(), {"_id": 1}) is not None
+
+    @staticmethod
+    async def find_all():
+        return await _db().students.find(scoped()).sort("created_at", -1).to_list()
+
+    @staticmethod
+    async def update_role(student_id: str, role: str):
+        return await _db().students.update_one(scoped({"_id": ObjectId(student_id)}), {"$set": {"role": role}})
+
+    @staticmethod
+    async def delete(student_id: str):
+        return await _db().students.delete_one(scoped({"_id": ObjectId(student_id)}))
+
+
+class LostItem:
+    @staticmethod
+    async def create(title: str, description: str, category: str, location: str, date_lost: datetime,
+                     student_id: str, passkey: str, serial_number: str = None):
+        item = {
+            "title": title,
+            "description": description,
+            "category": category,
+            "location": location,
+            "location_id": await Location.resolve(location),
+            "date_lost": date_lost,
+            "student_id": ObjectId(student_id),
+            "passkey": passkey,
+            "serial_number": serial_number,
+            "status": "pending",
+            "campus": current_campus(),
+            "created_at": datetime.utcnow()
+        }
+        result = await _db().lost_items.insert_one(item)
+        await Stats.record_created("lost_items", item)
+        return result
+
+    @staticmethod
+    async def find_by_passkey(passkey: str):
+        return await _db().lost_items.find_one(scoped({"passkey": passkey}))
+
+    @staticmethod
+    async def find_by_student(student_id: str):
+        return await _db().lost_items.find(scoped({"student_id": ObjectId(student_id)})).to_list()
+
+    @staticmethod
+    async def find_by_id(item_id: str, include_archived: bool = False):
+        item = await _db().lost_items.find_one(scoped({"_id": ObjectId(item_id)}))
+        if item is None and include_archived:
+            item = await _db().lost_items_archive.find_one(scoped({"_id": ObjectId(item_id)}))
+        return item
+
+    @staticmethod
+    async def find_all(limit: int = 100, archived: bool = False):
+        """Find the most recent lost items, from the archive if requested."""
+        collection = _db().lost_items_archive if archived else _db().lost_items
+        return await collection.find(scoped()).sort("created_at", -1).limit(limit).to_list()
+
+    @staticmethod
+    async def search(query: str, limit: int = 20, where: dict | None = None):
+        """Text search lost items by query string, restricted by ``where``."""
+        spec = sync_models.LostItem.search_query(query, limit, where)
+        return await _db().lost_items.find(
+            scoped(spec["filter"]), spec["projection"]
+        ).sort(spec["sort"]).limit(spec["limit"]).to_list()
+
+    @staticmethod
+    async def find_by_serial_number(serial_number: str):
+        """Find lost items by exact serial number match."""
+        return await _db().lost_items.find(
+            scoped({"serial_number": {"$regex": serial_number, "$options": "i"}})
+        ).to_list()
+
+    @staticmethod
+    async def delete(item_id: str):
+        return await _db().lost_items.delete_one(scoped({"_id": ObjectId(item_id)}))
+
+    @staticmethod
+    async def update_status(item_id: str, status: str):
+        """Set the status and return the item as it was before the update."""
+        previous = await _db().lost_items.find_one_and_update(
+            scoped({"_id": ObjectId(item_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if previous is not None:
+            await Stats.record_status_change("lost_items", previous.get("status"), status)
+        return previous
+
+
+class FoundItem:
+    FACET_FIELDS = sync_models.FoundItem.FACET_FIELDS
+
+    @staticmethod
+    async def create(title: str, description: str, category: str, location: str,
+                     finder_id: str, passkey: str, serial_number: str = None):
+        item = {
+            "title": title,
+            "description": description,
+            "category": category,
+            "location": location,
+            "location_id": await Location.resolve(location),
+            "finder_id": ObjectId(finder_id),
+            "passkey": passkey,
+            "serial_number": serial_number,
+            "status": "unclaimed",
+            "campus": current_campus(),
+            "created_at": datetime.utcnow()
+        }
+        result = await _db().found_items.insert_one(item)
+        await Stats.record_created("found_items", item)
+        return result
+
+    @staticmethod
+    async def find_by_passkey(passkey: str):
+        return await _db().found_items.find_one(scoped({
+            "passkey": passkey,
+            "status": FOUND_ACTIVE_STATUS  # Exclude claimed items
+        }))
+
+    @staticmethod
+    async def find_by_id(item_id: str, include_archived: bool = False):
+        item = await _db().found_items.find_one(scoped({"_id": ObjectId(item_id)}))
+        if item is None and include_archived:
+            item = await _db().found_items_archive.find_one(scoped({"_id": ObjectId(item_id)}))
+        return item
+
+    @staticmethod
+    async def find_all(limit: int = 0, archived: bool = False):
+        """Find all found items (newest first), from the archive if requested."""
+        collection = _db().found_items_archive if archived else _db().found_items
+        return await collection.find(scoped()).sort("created_at", -1).limit(limit).to_list()
+
+    @staticmethod
+    async def delete(item_id: str):
+        return await _db().found_items.delete_one(scoped({"_id": ObjectId(item_id)}))
+
+    @staticmethod
+    async def update_status(item_id: str, status: str):
+        """Set the status and return the item as it was before the update."""
+        previous = await _db().found_items.find_one_and_update(
+            scoped({"_id": ObjectId(item_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if previous is not None:
+            await Stats.record_status_change("found_items", previous.get("status"), status)
+        return previous
+
+    @staticmethod
+    async def search(query: str, limit: int = 20, where: dict | None = None):
+        """Text search found items by query string, excluding claimed items."""
+        spec = sync_models.FoundItem.search_query(query, limit, where)
+        return await _db().found_items.find(
+            scoped(spec["filter"]), spec["projection"]
+        ).sort(spec["sort"]).limit(spec["limit"]).to_list()
+
+    @staticmethod
+    def find_match_candidates(plan, limit: int = 20):
+        """Cursor running a :class:`~backend.utils.match_planner.MatchPlan` against unclaimed found items."""
+        if plan.strategy == "text":
+            return _db().found_items.find(
+                scoped({"$text": {"$search": plan.text_query}, **plan.filter}),
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        return _db().found_items.find(scoped(plan.filter)).sort("created_at", -1).limit(limit)
+
+    @staticmethod
+    async def search_with_facets(query: str, facets: list[str], filters: dict = None, limit: int = 20):
+        """Text search plus per-facet counts in a single ``$facet`` aggregation."""
+        match = scoped(sync_models.FoundItem.facets_query(query))
+        cursor = await _db().found_items.aggregate(sync_models.FoundItem.facets_pipeline(match, facets, filters, limit))
+        results = await cursor.to_list()
+        return results[0] if results else {"hits": []}
+
+    @staticmethod
+    async def find_by_serial_number(serial_number: str):
+        """Find found items by exact serial number match, excluding claimed items."""
+        return await _db().found_items.find(scoped({
+            "serial_number": {"$regex": serial_number, "$options": "i"},
+            "status": FOUND_ACTIVE_STATUS  # Exclude claimed items
+        })).to_list()
+
+
+class Claim:
+    @staticmethod
+    async def create(lost_item_id: str, found_item_id: str, student_id: str):
+        """Create a pending claim unless it exists; returns ``(claim_id, created)``."""
+        key = scoped({"found_item_id": ObjectId(found_item_id), "student_id": ObjectId(student_id)})
+        fields = {
+            "_id": ObjectId(),
+            "lost_item_id": ObjectId(lost_item_id),
+            "status": "pending",
+            "created_at": datetime.utcnow()
+        }
+        try:
+            existing = await _db().claims.find_one_and_update(
+                key, {"$setOnInsert": fields}, projection={"_id": 1}, upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            existing = await Claim.find_existing_claim(found_item_id, student_id)
+        if existing is not None:
+            return existing["_id"], False
+
+        claim = {**key, **fields}
+        await Stats.record_created("claims", claim)
+        notify(claim_events(claim, None))
+        return claim["_id"], True
+
+    @staticmethod
+    async def update_status(claim_id: str, status: str):
+        """Set the status and return the claim as it was before the update."""
+        previous = await _db().claims.find_one_and_update(
+            scoped({"_id": ObjectId(claim_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1, "student_id": 1, "lost_item_id": 1, "found_item_id": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if previous is not None:
+            await Stats.record_status_change("claims", previous.get("status"), status)
+            notify(claim_events(previous, status))
+        return previous
+
+    @staticmethod
+    async def find_all(limit: int = 50):
+        return await _db().claims.find(scoped()).sort("created_at", -1).limit(limit).to_list()
+
+    @staticmethod
+    async def find_by_id(claim_id: str):
+        return await _db().claims.find_one(scoped({"_id": ObjectId(claim_id)}))
+
+    @staticmethod
+    async def find_existing_claim(found_item_id: str, student_id: str):
+        """Check if a user has already claimed this found item."""
+        return await _db().claims.find_one(scoped({
+            "found_item_id": ObjectId(found_item_id),
+            "student_id": ObjectId(student_id)
+        }))
+
+
+class Retrieval:
+    @staticmethod
+    async def create(claim_id: str, student_id: str, admin_id: str, retrieval_location: str, notes: str = None):
+        """Create a retrieval record when a physical item is picked up."""
+        retrieval = {
+            "claim_id": ObjectId(claim_id),
+            "student_id": ObjectId(student_id),
+            "admin_id": ObjectId(admin_id),
+            "retrieval_location": retrieval_location,
+            "notes": notes,
+            "retrieval_date": datetime.utcnow(),
+            "campus": current_campus(),
+            "created_at": datetime.utcnow()
+        }
+        result = await _db().retrievals.insert_one(retrieval)
+        await Stats.record_created("retrievals", retrieval)
+        notify(retrieval_events(retrieval))
+        return result
+
+    @staticmethod
+    async def find_by_claim_id(claim_id: str):
+        """Find retrieval record by claim ID."""
+        return await _db().retrievals.find_one(scoped({"claim_id": ObjectId(claim_id)}))
+
+    @staticmethod
+    async def find_by_student(student_id: str):
+        """Find all retrievals by a student."""
+        return await _db().retrievals.find(
+            scoped({"student_id": ObjectId(student_id)})
+        ).sort("retrieval_date", -1).to_list()
+
+    @staticmethod
+    async def find_by_id(retrieval_id: str):
+        """Find retrieval by ID."""
+        return await _db().retrievals.find_one(scoped({"_id": ObjectId(retrieval_id)}))
+
+    @staticmethod
+    async def find_all(limit: int = 50):
+        """Find all retrievals."""
+        return await _db().retrievals.find(scoped()).sort("retrieval_date", -1).limit(limit).to_list()
+
+    @staticmethod
+    async def update_notes(retrieval_id: str, notes: str):
+        """Update retrieval notes."""
+        return await _db().retrievals.update_one(
+            scoped({"_id": ObjectId(retrieval_id)}),
+            {"$set": {"notes": notes, "updated_at": datetime.utcnow()}}
+        )
+
+
+class Location:
+    @staticmethod
+    async def find_all():
+        spec = sync_models.Location.find_all_query()
+        return await _db().locations.find(scoped(spec["filter"]), spec["projection"]).sort(spec["sort"]).to_list()
+
+    @staticmethod
+    async def resolve(text: str | None) -> str | None:
+        """See :meth:`backend.models.models.Location.resolve`."""
+        candidates = phrases(text)
+        if not candidates:
+            return None
+        spec = sync_models.Location.resolve_query(candidates)
+        matches = await _db().locations.find(scoped(spec["filter"]), spec["projection"]).to_list()
+        return best_match(text, matches)
+
+    @staticmethod
+    async def expand(location_id: str) -> list[str]:
+        spec = sync_models.Location.expand_query(location_id)
+        locations = await _db().locations.find(scoped(spec["filter"]), spec["projection"]).to_list()
+        return [doc["location_id"] for doc in locations]
+
+    @staticmethod
+    async def filter_query(text: str | None) -> dict | None:
+        """See :meth:`backend.models.models.Location.filter_query`."""
+        if not text:
+            return None
+        location_id = await Location.resolve(text)
+        if location_id is None:
+            return {"location": text}
+        return {"location_id": {"$in": await Location.expand(location_id)}}
+
+
+class Marker:
+    @staticmethod
+    async def claim(name: str, value) -> bool:
+        """See :meth:`backend.models.models.Marker.claim`."""
+        settled = current_app.extensions.setdefault("settled_markers", set())
+        doc_id = f"{name}:{current_campus()}"
+        if (_db().name, doc_id) in settled:
+            return False
+        try:
+            result = await _db().markers.update_one(
+                {"_id": doc_id},
+                {"$setOnInsert": {"value": value, "campus": current_campus(), "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            result = None
+        settled.add((_db().name, doc_id))
+        return result is not None and result.upserted_id is not None
+
+    @staticmethod
+    async def release(name: str, value) -> bool:
+        """See :meth:`backend.models.models.Marker.release`."""
+        doc_id = f"{name}:{current_campus()}"
+        current_app.extensions.setdefault("settled_markers", set()).discard((_db().name, doc_id))
+        return (await _db().markers.delete_one({"_id": doc_id, "value": value})).deleted_count == 1
+
+
+class Stats:
+    """Async access to the admin counters document (see :class:`backend.models.models.Stats`)."""
+
+    BREAKDOWNS = sync_models.Stats.BREAKDOWNS
+
+    @staticmethod
+    def _doc_id() -> str:
+        return f"{sync_models.Stats.DOC_ID}:{current_campus()}"
+
+    @staticmethod
+    async def record_created(collection: str, doc: dict):
+        inc = {f"{collection}.total": 1}
+        for facet, field in Stats.BREAKDOWNS[collection].items():
+            inc[f"{collection}.{facet}.{sync_models.Stats._key(doc.get(field))}"] = 1
+        return await _db().stats.update_one({"_id": Stats._doc_id()}, {"$inc": inc}, upsert=True)
+
+    @staticmethod
+    async def record_status_change(collection: str, old_status: str, new_status: str):
+        if old_status == new_status:
+            return None
+        key = sync_models.Stats._key
+        return await _db().stats.update_one(
+            {"_id": Stats._doc_id()},
+            {"$inc": {
+                f"{collection}.status.{key(old_status)}": -1,
+                f"{collection}.status.{key(new_status)}": 1,
+            }},
+            upsert=True,
+        )
+
+    @staticmethod
+    async def get():
+        return await _db().stats.find_one({"_id": Stats._doc_id()})
+
+    @staticmethod
+    async def reconcile():
+        """Recompute every counter, running the per-collection aggregations concurrently."""
+        async def count(collection):
+            pipeline = sync_models.Stats.reconcile_pipeline(collection, scoped())
+            results = await (await _db()[collection].aggregate(pipeline)).to_list()
+            return sync_models.Stats.counters_from_result(collection, results[0] if results else {})
+
+        # Stored counters first, recount retried while writes move them (see the sync Stats.reconcile)
+        collections = list(Stats.BREAKDOWNS)
+        for _ in range(sync_models.Stats.RECONCILE_ATTEMPTS):
+            stored = await Stats.get()
+            counters = dict(zip(collections, await asyncio.gather(*(count(c) for c in collections))))
+            if sync_models.Stats.stored_counters(await Stats.get()) == sync_models.Stats.stored_counters(stored):
+                break
+        counters["campus"] = current_campus()
+        counters["reconciled_at"] = datetime.utcnow()
+        update = sync_models.Stats.reconcile_update(counters, stored)
+        await _db().stats.update_one({"_id": Stats._doc_id()}, update, upsert=True)
+        return {"_id": Stats._doc_id(), **counters}
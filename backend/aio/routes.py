@@ -0,0 +1,577 @@
+"""The API blueprint on async models; same paths, payloads and responses as :mod:`backend.routes.api`.
+
+Lookups that do not depend on each other are awaited together with
+``asyncio.gather``. ``/events`` waits on the event loop, so an open stream
+costs a queue rather than a thread. Not ported (served by the Flask app): the
+batch match endpoints under ``/admin/matches``, ``/admin/profiles`` and
+``/admin/metrics``, along with the admission, deadline and profiling hooks
+behind them.
+"""
+import asyncio
+from datetime import datetime
+
+from quart import Blueprint, current_app, jsonify, make_response, request
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from backend.routes.serializers import (
+    serialize_admin_claim, serialize_admin_found_item, serialize_admin_lost_item, serialize_admin_retrieval,
+    serialize_basic, serialize_facets, serialize_found_item, serialize_location, serialize_own_lost_item,
+    serialize_own_retrieval, serialize_stats, serialize_user,
+)
+from backend.utils.auth import generate_passkey
+from backend.utils.events import AsyncSubscription, broker, format_sse
+from backend.utils.match_planner import plan_match_query, summarize_explain
+from backend.utils.tenancy import UnknownCampusError
+
+from .auth import admin_required, create_token, stream_token_required, token_required
+from .models import Claim, FoundItem, Location, LostItem, Retrieval, Stats, Student
+from .tenancy import campus_from_request, current_campus, set_campus
+
+api_bp = Blueprint("api", __name__)
+
+
+@api_bp.before_request
+async def _resolve_campus():
+    """Scope anonymous requests to the campus they name; the auth decorators
+    override this with the campus in the user's token."""
+    try:
+        set_campus(await campus_from_request())
+    except UnknownCampusError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+
+async def _none():
+    return None
+
+
+def _claim_items(claim):
+    """Awaitables for the lost and found item a claim refers to (archived ones included)."""
+    return (
+        LostItem.find_by_id(str(claim["lost_item_id"]), include_archived=True) if claim.get("lost_item_id") else _none(),
+        FoundItem.find_by_id(str(claim["found_item_id"]), include_archived=True) if claim.get("found_item_id") else _none(),
+    )
+
+
+# Auth routes
+@api_bp.post("/auth/register")
+async def register():
+    data = await request.get_json()
+
+    password_hash = generate_password_hash(data["password"])
+    # The first user of the campus becomes its admin
+    registered = await Student.register(data["email"], data["name"], password_hash)
+    if registered is None:
+        return jsonify({"message": "Email already registered"}), 400
+    student_id, role = registered
+
+    return jsonify({
+        "message": "Registration successful",
+        "token": create_token(str(student_id), role, current_campus())
+    }), 201
+
+
+@api_bp.post("/auth/login")
+async def login():
+    data = await request.get_json()
+    student = await Student.find_by_email(data["email"])
+
+    if not student or not check_password_hash(student["password"], data["password"]):
+        return jsonify({"message": "Invalid credentials"}), 401
+
+    return jsonify({
+        "token": create_token(str(student["_id"]), student.get('role', 'student'), current_campus())
+    })
+
+
+# Lost Items routes
+@api_bp.post("/lost-items")
+@token_required
+async def report_lost_item(current_user_id):
+    data = await request.get_json()
+    passkey = generate_passkey()
+
+    await LostItem.create(
+        title=data["title"],
+        description=data["description"],
+        category=data["category"],
+        location=data["location"],
+        date_lost=datetime.fromisoformat(data["date_lost"]),
+        student_id=current_user_id,
+        passkey=passkey,
+        serial_number=data.get("serialNumber")  # Optional field
+    )
+
+    return jsonify({
+        "message": "Lost item reported successfully",
+        "passkey": passkey
+    }), 201
+
+
+@api_bp.get("/lost-items")
+@token_required
+async def get_lost_items(current_user_id):
+    items = await LostItem.find_by_student(current_user_id)
+    return jsonify([serialize_own_lost_item(item) for item in items])
+
+
+# Found Items routes
+@api_bp.post("/found-items")
+@token_required
+async def report_found_item(current_user_id):
+    data = await request.get_json()
+    passkey = data.get("passkey", generate_passkey())
+
+    # The insert and the lookup of a lost item with the same passkey are independent
+    found_item, lost_item = await asyncio.gather(
+        FoundItem.create(
+            title=data["title"],
+            description=data["description"],
+            category=data["category"],
+            location=data["location"],
+            finder_id=current_user_id,
+            passkey=passkey,
+            serial_number=data.get("serialNumber")  # Optional field
+        ),
+        LostItem.find_by_passkey(passkey),
+    )
+    if lost_item:
+        # Create a claim automatically
+        await Claim.create(
+            lost_item_id=str(lost_item["_id"]),
+            found_item_id=str(found_item.inserted_id),
+            student_id=str(lost_item["student_id"])
+        )
+
+    return jsonify({
+        "message": "Found item reported successfully",
+        "passkey": passkey
+    }), 201
+
+
+@api_bp.get("/found-items")
+@token_required
+async def get_found_items(current_user_id):
+    """Get all found items"""
+    items = await FoundItem.find_all()
+    return jsonify([serialize_found_item(item) for item in items])
+
+
+# Claims routes
+@api_bp.post("/claims/<claim_id>/verify")
+@token_required
+async def verify_claim(current_user_id, claim_id):
+    await Claim.update_status(claim_id, "verified")
+    return jsonify({"message": "Claim verified successfully"})
+
+
+@api_bp.get("/locations")
+async def get_locations():
+    return jsonify([serialize_location(location) for location in await Location.find_all()])
+
+
+@api_bp.get("/health")
+async def health():
+    return jsonify(status="ok")
+
+
+# Notification stream (Server-Sent Events)
+@api_bp.get("/events")
+@stream_token_required
+async def events_stream(current_user_id):
+    """See :func:`backend.routes.api.events_stream`."""
+    heartbeat = current_app.config["EVENTS_HEARTBEAT_SECONDS"]
+    broker.start(current_app.extensions["sync_app"])
+    subscription = broker.subscribe(current_user_id, AsyncSubscription(broker.queue_size))
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing the idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            broker.unsubscribe(current_user_id, subscription)
+
+    response = await make_response(stream(), 200, {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # The stream stays open for as long as the page does
+    response.timeout = None
+    return response
+
+
+# Search routes
+@api_bp.get("/found-items/search")
+async def search_found_items():
+    query = request.args.get("q") or request.args.get("query")
+    if not query:
+        return jsonify({"message": "Missing query parameter 'q'"}), 400
+
+    limit = int(request.args.get("limit", 20))
+    category = request.args.get("category")
+    location = request.args.get("location")
+
+    facets_param = request.args.get("facets")
+    if facets_param:
+        facets = [f.strip() for f in facets_param.split(",") if f.strip()]
+        unknown = [f for f in facets if f not in FoundItem.FACET_FIELDS]
+        if unknown:
+            return jsonify({"message": f"Unsupported facet(s): {', '.join(unknown)}"}), 400
+        result = await FoundItem.search_with_facets(
+            query, facets, filters={"category": category, "location": await Location.filter_query(location)},
+            limit=limit,
+        )
+        return jsonify({
+            "results": [serialize_basic(item) for item in result["hits"]],
+            "facets": serialize_facets(result, facets),
+        })
+
+    results = []
+    for item in await FoundItem.search(query, limit=limit, where=await Location.filter_query(location)):
+        if item.get("status") == "claimed":
+            continue
+        if category and item.get("category") != category:
+            continue
+        results.append(serialize_basic(item))
+    return jsonify(results)
+
+
+@api_bp.get("/lost-items/search")
+async def search_lost_items():
+    query = request.args.get("q") or request.args.get("query")
+    if not query:
+        return jsonify({"message": "Missing query parameter 'q'"}), 400
+
+    limit = int(request.args.get("limit", 20))
+    category = request.args.get("category")
+    location = request.args.get("location")
+
+    results = []
+    for item in await LostItem.search(query, limit=limit, where=await Location.filter_query(location)):
+        if category and item.get("category") != category:
+            continue
+        results.append(serialize_basic(item))
+    return jsonify(results)
+
+
+# Match suggestions for a given lost item
+@api_bp.get("/lost-items/<lost_id>/matches")
+@token_required
+async def suggest_matches(current_user_id, lost_id):
+    lost = await LostItem.find_by_id(lost_id)
+    if not lost:
+        return jsonify({"message": "Lost item not found"}), 404
+
+    plan = plan_match_query(
+        lost,
+        max_terms=current_app.config["MATCH_MAX_TERMS"],
+        date_tolerance_days=current_app.config["MATCH_DATE_TOLERANCE_DAYS"],
+        location=await Location.filter_query(request.args.get("location")),
+    )
+    serial = (lost.get("serial_number") or "").strip()
+    cursor = FoundItem.find_match_candidates(plan, limit=20)
+    want_explain = request.args.get("explain") == "1"
+
+    # Serial, passkey and planner queries run concurrently; results keep the
+    # sync API's priority order (serial, then passkey, then keywords).
+    by_serial, by_passkey, by_keywords, explain = await asyncio.gather(
+        FoundItem.find_by_serial_number(serial) if serial else _none(),
+        FoundItem.find_by_passkey(lost["passkey"]) if lost.get("passkey") else _none(),
+        cursor.to_list(),
+        FoundItem.find_match_candidates(plan, limit=20).explain() if want_explain else _none(),
+    )
+
+    suggestions = []
+    seen = set()
+    for item in [*(by_serial or []), *([by_passkey] if by_passkey else []), *by_keywords]:
+        sid = str(item.get("_id"))
+        if sid in seen or item.get("status") == "claimed":
+            continue
+        suggestions.append(serialize_basic(item))
+        seen.add(sid)
+
+    if want_explain:
+        return jsonify({"matches": suggestions, "plan": {**plan.to_dict(), "mongo": summarize_explain(explain)}})
+    return jsonify(suggestions)
+
+
+# Create a claim manually from a suggested match
+@api_bp.post("/claims")
+@token_required
+async def create_claim(current_user_id):
+    data = await request.get_json() or {}
+    lost_item_id = data.get("lost_item_id")
+    found_item_id = data.get("found_item_id")
+    if not lost_item_id or not found_item_id:
+        return jsonify({"message": "lost_item_id and found_item_id are required"}), 400
+
+    claim_id, created = await Claim.create(lost_item_id=lost_item_id, found_item_id=found_item_id,
+                                           student_id=current_user_id)
+    if not created:
+        return jsonify({
+            "message": "You have already claimed this item",
+            "existing_claim_id": str(claim_id)
+        }), 409
+
+    return jsonify({"message": "Claim created", "claim_id": str(claim_id)}), 201
+
+
+# Admin endpoints
+@api_bp.get("/admin/claims")
+@admin_required
+async def admin_get_claims(current_user_id):
+    """Get all claims for admin review"""
+    claims = await Claim.find_all(limit=100)
+
+    async def details(claim):
+        lost_item, found_item, student = await asyncio.gather(
+            *_claim_items(claim),
+            Student.find_by_id(str(claim["student_id"])) if claim.get("student_id") else _none(),
+        )
+        return serialize_admin_claim(claim, lost_item, found_item, student)
+
+    return jsonify(await asyncio.gather(*(details(claim) for claim in claims)))
+
+
+@api_bp.post("/admin/claims/<claim_id>/approve")
+@admin_required
+async def admin_approve_claim(current_user_id, claim_id):
+    """Approve a claim"""
+    claim = await Claim.find_by_id(claim_id)
+    if not claim:
+        return jsonify({"message": "Claim not found"}), 404
+
+    updates = [Claim.update_status(claim_id, "approved")]
+    if claim.get("found_item_id"):
+        updates.append(FoundItem.update_status(str(claim["found_item_id"]), "claimed"))
+    if claim.get("lost_item_id"):
+        updates.append(LostItem.update_status(str(claim["lost_item_id"]), "found"))
+    await asyncio.gather(*updates)
+
+    return jsonify({"message": "Claim approved"})
+
+
+@api_bp.post("/admin/claims/<claim_id>/reject")
+@admin_required
+async def admin_reject_claim(current_user_id, claim_id):
+    """Reject a claim"""
+    await Claim.update_status(claim_id, "rejected")
+    return jsonify({"message": "Claim rejected"})
+
+
+# Retrieval endpoints
+@api_bp.post("/admin/retrievals")
+@admin_required
+async def create_retrieval(current_user_id):
+    """Record a physical item retrieval"""
+    data = await request.get_json()
+    claim_id = data.get("claim_id")
+    notes = data.get("notes", "")
+    retrieval_location = data.get("retrieval_location", "Main Office")
+
+    if not claim_id:
+        return jsonify({"message": "claim_id is required"}), 400
+
+    claim, existing = await asyncio.gather(Claim.find_by_id(claim_id), Retrieval.find_by_claim_id(claim_id))
+    if not claim:
+        return jsonify({"message": "Claim not found"}), 404
+    if claim.get("status") != "approved":
+        return jsonify({"message": "Claim must be approved before retrieval"}), 400
+    if existing:
+        return jsonify({"message": "Retrieval already recorded for this claim"}), 409
+
+    retrieval = await Retrieval.create(
+        claim_id=claim_id,
+        student_id=str(claim["student_id"]),
+        admin_id=current_user_id,
+        retrieval_location=retrieval_location,
+        notes=notes
+    )
+    await Claim.update_status(claim_id, "retrieved")
+
+    return jsonify({
+        "message": "Retrieval recorded successfully",
+        "retrieval_id": str(retrieval.inserted_id)
+    }), 201
+
+
+async def _retrieval_details(retrieval, with_student: bool):
+    """The claim's items plus the admin (and student) of a retrieval, fetched concurrently."""
+    claim, admin, student = await asyncio.gather(
+        Claim.find_by_id(str(retrieval["claim_id"])),
+        Student.find_by_id(str(retrieval["admin_id"])),
+        Student.find_by_id(str(retrieval["student_id"])) if with_student else _none(),
+    )
+    lost_item, found_item = await asyncio.gather(*_claim_items(claim)) if claim else (None, None)
+    return admin, student, lost_item, found_item
+
+
+@api_bp.get("/admin/retrievals")
+@admin_required
+async def get_retrievals(current_user_id):
+    """Get all retrieval records"""
+    limit = int(request.args.get("limit", 100))
+    retrievals = await Retrieval.find_all(limit=limit)
+
+    async def details(retrieval):
+        admin, student, lost_item, found_item = await _retrieval_details(retrieval, with_student=True)
+        return serialize_admin_retrieval(retrieval, student, admin, lost_item, found_item)
+
+    return jsonify(await asyncio.gather(*(details(r) for r in retrievals)))
+
+
+@api_bp.get("/retrievals/my")
+@token_required
+async def get_my_retrievals(current_user_id):
+    """Get retrieval records for current user"""
+    retrievals = await Retrieval.find_by_student(current_user_id)
+
+    async def details(retrieval):
+        admin, _, lost_item, found_item = await _retrieval_details(retrieval, with_student=False)
+        return serialize_own_retrieval(retrieval, admin, lost_item, found_item)
+
+    return jsonify(await asyncio.gather(*(details(r) for r in retrievals)))
+
+
+@api_bp.patch("/admin/retrievals/<retrieval_id>")
+@admin_required
+async def update_retrieval(current_user_id, retrieval_id):
+    """Update retrieval notes"""
+    data = await request.get_json()
+    notes = data.get("notes")
+
+    if notes is None:
+        return jsonify({"message": "notes field is required"}), 400
+
+    await Retrieval.update_notes(retrieval_id, notes)
+    return jsonify({"message": "Retrieval notes updated successfully"})
+
+
+# Admin statistics
+_stats_reconciling = set()
+
+
+def _reconcile_stats_in_background():
+    """Recompute the counters off the request path; at most one run per campus and process."""
+    campus = current_campus()
+    if campus in _stats_reconciling:
+        return
+    _stats_reconciling.add(campus)
+    app = current_app._get_current_object()
+
+    async def run():
+        # Background tasks get a fresh app context, so the campus is set again
+        try:
+            set_campus(campus)
+            await Stats.reconcile()
+        except Exception as exc:  # pragma: no cover
+            app.logger.warning(f"Stats reconciliation failed: {exc}")
+        finally:
+            _stats_reconciling.discard(campus)
+
+    app.add_background_task(run)
+
+
+@api_bp.get("/admin/stats")
+@admin_required
+async def admin_get_stats(current_user_id):
+    """Counts by status/category/location plus match and retrieval rates"""
+    counters = await Stats.get()
+    if counters is None or "reconciled_at" not in counters:
+        counters = await Stats.reconcile()
+    else:
+        age = (datetime.utcnow() - counters["reconciled_at"]).total_seconds()
+        if age > current_app.config["STATS_RECONCILE_SECONDS"]:
+            _reconcile_stats_in_background()
+
+    return jsonify(serialize_stats(counters, Stats.BREAKDOWNS))
+
+
+# User Management endpoints
+@api_bp.get("/admin/users")
+@admin_required
+async def get_all_users(current_user_id):
+    """Get all users for admin"""
+    try:
+        return jsonify([serialize_user(user) for user in await Student.find_all()])
+    except Exception as e:
+        return jsonify({"message": str(e)}), 500
+
+
+@api_bp.patch("/admin/users/<user_id>/role")
+@admin_required
+async def update_user_role(current_user_id, user_id):
+    """Update user role"""
+    data = await request.get_json()
+    role = data.get("role")
+
+    if role not in ["student", "admin"]:
+        return jsonify({"message": "Invalid role. Must be 'student' or 'admin'"}), 400
+
+    await Student.update_role(user_id, role)
+    return jsonify({"message": "User role updated successfully"})
+
+
+@api_bp.delete("/admin/users/<user_id>")
+@admin_required
+async def delete_user(current_user_id, user_id):
+    """Delete a user"""
+    if user_id == current_user_id:
+        return jsonify({"message": "Cannot delete your own account"}), 400
+
+    await Student.delete(user_id)
+    return jsonify({"message": "User deleted successfully"})
+
+
+# Item Management endpoints
+async def _with_people(items, field):
+    """Pair each item with the student in ``item[field]``, looking them all up concurrently."""
+    people = await asyncio.gather(*(Student.find_by_id(str(item[field])) for item in items))
+    return zip(items, people)
+
+
+@api_bp.get("/admin/lost-items")
+@admin_required
+async def get_all_lost_items(current_user_id):
+    """Get all lost items for admin (pass archived=1 to list the archive)"""
+    limit = int(request.args.get("limit", 100))
+    archived = request.args.get("archived") == "1"
+    items = await LostItem.find_all(limit=limit, archived=archived)
+    return jsonify([
+        serialize_admin_lost_item(item, student) for item, student in await _with_people(items, "student_id")
+    ])
+
+
+@api_bp.get("/admin/found-items")
+@admin_required
+async def get_all_found_items(current_user_id):
+    """Get all found items for admin (pass archived=1 to list the archive)"""
+    limit = int(request.args.get("limit", 100))
+    archived = request.args.get("archived") == "1"
+    items = await FoundItem.find_all(limit=limit, archived=archived)
+    return jsonify([
+        serialize_admin_found_item(item, finder) for item, finder in await _with_people(items, "finder_id")
+    ])
+
+
+@api_bp.delete("/admin/lost-items/<item_id>")
+@admin_required
+async def delete_lost_item(current_user_id, item_id):
+    """Delete a lost item"""
+    await LostItem.delete(item_id)
+    return jsonify({"message": "Lost item deleted successfully"})
+
+
+@api_bp.delete("/admin/found-items/<item_id>")
+@admin_required
+async def delete_found_item(current_user_id, item_id):
+    """Delete a found item"""
+    await FoundItem.delete(item_id)
+    return jsonify({"message": "Found item deleted successfully"})
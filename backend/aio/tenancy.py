@@ -0,0 +1,39 @@
+"""Campus scoping for the async models; mirrors :mod:`backend.utils.tenancy` on Quart's globals."""
+from quart import current_app, g, request
+
+from backend.utils.tenancy import CAMPUS_FIELD, UnknownCampusError
+
+
+def current_campus() -> str:
+    return g.get("campus") or current_app.config["DEFAULT_CAMPUS"]
+
+
+def set_campus(campus: str) -> None:
+    if campus not in current_app.config["CAMPUSES"]:
+        raise UnknownCampusError(f"Unknown campus '{campus}'")
+    g.campus = campus
+
+
+async def campus_from_request() -> str:
+    """Campus named by an anonymous request, falling back to the default campus."""
+    body = await request.get_json(silent=True) if request.is_json else None
+    return (
+        request.headers.get("X-Campus")
+        or request.args.get("campus")
+        or (body or {}).get("campus")
+        or current_app.config["DEFAULT_CAMPUS"]
+    )
+
+
+def database(campus: str | None = None):
+    """The async database holding ``campus``'s collections (the current campus by default)."""
+    client = current_app.extensions["mongo"]
+    name = client.get_default_database().name
+    if current_app.config["CAMPUS_PARTITIONING"] == "database":
+        name = f"{name}_{campus or current_campus()}"
+    return client[name]
+
+
+def scoped(query: dict | None = None) -> dict:
+    """``query`` restricted to the current campus."""
+    return {CAMPUS_FIELD: current_campus(), **(query or {})}
@@ -0,0 +1,189 @@
+"""Maintenance commands, available through the Flask CLI.
+
+Example:
+    flask --app backend.app archive-items --days 180
+
+Commands that touch campus data run for every configured campus unless
+``--campus`` names one.
+"""
+import json
+from pathlib import Path
+
+import click
+from flask import Flask, current_app
+
+from .utils.tenancy import campus_context
+
+campus_option = click.option(
+    "--campus", "campuses", multiple=True,
+    help="Campus to process; repeat for several (default: all configured campuses).",
+)
+
+
+def _each_campus(campuses: tuple[str, ...]):
+    """Yield each selected campus with model calls scoped to it."""
+    for campus in campuses or current_app.config["CAMPUSES"]:
+        with campus_context(campus):
+            yield campus
+
+
+def register_commands(app: Flask) -> None:
+    """Attach the maintenance commands to ``app.cli``."""
+
+    @app.cli.command("archive-items")
+    @click.option("--days", type=int, default=None,
+                  help="Archive items resolved more than this many days ago (default: ARCHIVE_AFTER_DAYS).")
+    @click.option("--batch-size", type=int, default=500, show_default=True)
+    @campus_option
+    def archive_items(days: int | None, batch_size: int, campuses: tuple[str, ...]) -> None:
+        """Move long-resolved lost/found items into the *_archive collections."""
+        from .models.models import archive_resolved_items
+
+        days = days if days is not None else current_app.config["ARCHIVE_AFTER_DAYS"]
+        for campus in _each_campus(campuses):
+            moved = archive_resolved_items(days, batch_size=batch_size)
+            for name, count in moved.items():
+                click.echo(f"[{campus}] {name}: archived {count} item(s) resolved more than {days} day(s) ago")
+
+    @app.cli.command("reconcile-stats")
+    @campus_option
+    def reconcile_stats(campuses: tuple[str, ...]) -> None:
+        """Recompute the admin statistics counters from the collections."""
+        from .models.models import Stats
+
+        for campus in _each_campus(campuses):
+            counters = Stats.reconcile()
+            for name in Stats.BREAKDOWNS:
+                click.echo(f"[{campus}] {name}: {counters[name]['total']}")
+
+    @app.cli.command("reconcile-matches")
+    @click.option("--top-k", type=click.IntRange(min=1), default=None,
+                  help="Candidates kept per lost item (default: MATCH_TOP_K).")
+    @click.option("--block-size", type=click.IntRange(min=1), default=None,
+                  help="Lost items compared per block; bounds memory (default: MATCH_BLOCK_SIZE).")
+    @campus_option
+    def reconcile_matches_command(top_k: int | None, block_size: int | None, campuses: tuple[str, ...]) -> None:
+        """Recompute match candidates for every pending lost item."""
+        from .models.models import MatchRun
+        from .utils.matching import reconcile_matches
+
+        config = current_app.config
+        for campus in _each_campus(campuses):
+            run_id = MatchRun.create().inserted_id
+            result = reconcile_matches(
+                top_k=top_k or config["MATCH_TOP_K"],
+                block_size=block_size or config["MATCH_BLOCK_SIZE"],
+                date_tolerance_days=config["MATCH_DATE_TOLERANCE_DAYS"],
+                run_id=run_id,
+            )
+            MatchRun.finish(run_id, result=result)
+            click.echo(
+                f"[{campus}] {result['lost_items']} lost x {result['found_items']} found items: "
+                f"{result['written']} updated, {result['removed']} removed in {result['seconds']}s"
+            )
+
+    @app.cli.command("assign-campus")
+    @click.argument("campus")
+    def assign_campus_command(campus: str) -> None:
+        """Tag documents created before campuses existed with CAMPUS."""
+        from .models.models import assign_campus
+
+        if campus not in current_app.config["CAMPUSES"]:
+            raise click.BadParameter(f"'{campus}' is not in CAMPUSES")
+        for name, count in assign_campus(campus).items():
+            click.echo(f"{name}: {count} document(s) assigned to {campus}")
+
+    @app.cli.command("load-locations")
+    @click.argument("registry", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+    @campus_option
+    def load_locations(registry: Path, campuses: tuple[str, ...]) -> None:
+        """Replace the location registry with REGISTRY (JSON) and re-resolve item locations."""
+        from .models.models import Location
+        from .utils.locations import RegistryError, build_registry
+
+        try:
+            documents = build_registry(json.loads(registry.read_text()))
+        except (json.JSONDecodeError, RegistryError) as exc:
+            raise click.ClickException(f"{registry}: {exc}")
+        for campus in _each_campus(campuses):
+            click.echo(f"[{campus}] {Location.replace_all(documents)} location(s) loaded")
+            for name, count in Location.backfill().items():
+                click.echo(f"[{campus}] {name}: {count} item location(s) updated")
+
+    @app.cli.command("shard-collections")
+    def shard_collections() -> None:
+        """Shard every campus collection on a campus-prefixed key (sharded clusters only)."""
+        from . import mongo
+        from .utils.tenancy import partition_databases
+
+        # Collections with a unique index are sharded on its key so it stays enforceable
+        shard_keys = {
+            "students": {"campus": 1, "email": 1},
+            "claims": {"campus": 1, "found_item_id": 1, "student_id": 1},
+        }
+        collections = ["students", "lost_items", "found_items", "lost_items_archive", "found_items_archive",
+                       "claims", "retrievals", "match_candidates", "locations"]
+        for db in partition_databases():
+            mongo.cx.admin.command("enableSharding", db.name)
+            for name in collections:
+                key = shard_keys.get(name, {"campus": 1, "_id": 1})
+                mongo.cx.admin.command("shardCollection", f"{db.name}.{name}", key=key)
+                click.echo(f"{db.name}.{name} sharded on {key}")
+
+    @app.cli.command("advise-indexes")
+    @click.option("--max-ratio", type=float, default=10.0, show_default=True,
+                  help="Flag queries examining more than this many keys/documents per returned document.")
+    @click.option("--baseline", type=click.Path(dir_okay=False, path_type=Path),
+                  help="Fail if any query shape is worse than in this baseline file.")
+    @click.option("--update-baseline", is_flag=True, help="Write the results to --baseline instead of checking.")
+    @click.option("--tolerance", type=float, default=2.0, show_default=True,
+                  help="How many times a flagged ratio may grow over the baseline before failing.")
+    @campus_option
+    def advise_indexes(max_ratio: float, baseline: Path | None, update_baseline: bool, tolerance: float,
+                       campuses: tuple[str, ...]) -> None:
+        """Explain every model query shape and propose missing indexes."""
+        from .utils.index_advisor import advise, baseline_entry, regressions
+
+        if update_baseline and baseline is None:
+            raise click.UsageError("--update-baseline needs --baseline")
+        config = current_app.config
+        expected = json.loads(baseline.read_text()) if baseline and not update_baseline else None
+        recorded, problems = {}, []
+        for campus in _each_campus(campuses):
+            results = advise(max_ratio=max_ratio, max_terms=config["MATCH_MAX_TERMS"],
+                             date_tolerance_days=config["MATCH_DATE_TOLERANCE_DAYS"],
+                             archive_after_days=config["ARCHIVE_AFTER_DAYS"])
+            for name, result in results.items():
+                if "skipped" in result:
+                    click.echo(f"[{campus}] {name:<52} skipped ({result['skipped']})")
+                    continue
+                verdict = ", ".join(result["findings"]) or "ok"
+                click.echo(
+                    f"[{campus}] {name:<52} {'+'.join(result['indexes']) or '-':<40} "
+                    f"docs {result['docs_examined']} keys {result['keys_examined']} "
+                    f"returned {result['returned']}  {verdict}"
+                )
+                proposal = result.get("proposed_index")
+                if proposal:
+                    keys = ", ".join(f"{field}: {direction}" for field, direction in proposal["keys"])
+                    if proposal["existing"]:
+                        click.echo(f"    index {{{keys}}} exists ({proposal['existing']}) but the plan does not use it "
+                                   f"well: check the predicate (unanchored or case-insensitive regex, or a "
+                                   f"partial filter the query does not match)")
+                    else:
+                        click.echo(f"    propose: db.{result['collection']}.createIndex({{{keys}}})")
+                entry = recorded.setdefault(name, baseline_entry(result))
+                # A shape's baseline holds the findings of every campus
+                entry["findings"] = sorted(set(entry["findings"]) | set(result["findings"]))
+                entry["ratio"] = max(entry["ratio"], result["ratio"])
+            if expected is not None:
+                problems += [f"[{campus}] {problem}" for problem in regressions(results, expected, tolerance)]
+
+        if update_baseline:
+            baseline.write_text(json.dumps(recorded, indent=2, sort_keys=True) + "\n")
+            click.echo(f"Baseline written to {baseline}")
+        elif problems:
+            click.echo("\nRegressions against the baseline:", err=True)
+            for problem in problems:
+                click.echo(f"  {problem}", err=True)
+            raise SystemExit(1)
@@ -1,27 +1,108 @@
-from datetime import datetime
-from backend import mongo
+from datetime import datetime, timedelta
+from flask import current_app
 from bson import ObjectId
-from pymongo import ASCENDING, TEXT
+from pymongo import ASCENDING, DESCENDING, TEXT, DeleteMany, ReplaceOne, ReturnDocument
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+from backend.storage import storage
+from backend.utils.events import claim_events, notify, retrieval_events
+from backend.utils.loader import loader
+from backend.utils.locations import best_match, phrases
+from backend.utils.tenancy import (
+    campus_context, configured_campuses, current_campus, database, partition_databases, scoped,
+)
+
+# Only items in these statuses are part of the hot working set; everything
+# else is resolved and eventually moved to the *_archive collections.
+FOUND_ACTIVE_STATUS = "unclaimed"
+LOST_ACTIVE_STATUS = "pending"
+
+
+def _db():
+    """Database of the current campus (see :mod:`backend.utils.tenancy`)."""
+    return database()
+
+
+def ids_query(ids) -> dict:
+    """Filter of the batched id lookups behind the ``load`` methods, also explained by the index advisor."""
+    return {"_id": {"$in": list(ids)}}
+
+
+def _find_by_ids(collection: str, ids: list, include_archived: bool = False) -> dict:
+    """``{_id: document}`` for ``ids`` in one query (plus one on the archive for ids not found)."""
+    found = {doc["_id"]: doc for doc in _db()[collection].find(scoped(ids_query(ids)))}
+    missing = [_id for _id in ids if _id not in found]
+    if missing and include_archived:
+        archive = _db()[f"{collection}_archive"].find(scoped(ids_query(missing)))
+        found.update((doc["_id"], doc) for doc in archive)
+    return found
+
 
 class Student:
     @staticmethod
-    def create(email: str, name: str, password_hash: str, role: str = "student"):
+    def create(email: str, name: str, password_hash: str, role: str = "student", student_id: ObjectId | None = None):
         student = {
+            "_id": student_id or ObjectId(),
             "email": email,
             "name": name,
             "password": password_hash,
             "role": role,  # "student" or "admin"
+            "campus": current_campus(),
             "created_at": datetime.utcnow()
         }
-        return mongo.db.students.insert_one(student)
+        return _db().students.insert_one(student)
+
+    @staticmethod
+    def register(email: str, name: str, password_hash: str):
+        """Create an account; the first account of the campus becomes its admin.
+
+        The id is chosen first and the first-admin marker claimed with it, so the
+        account is inserted with its final role in one write. The unique email
+        index rejects duplicates, so concurrent registrations of one email cannot
+        both succeed; a marker claimed for a rejected duplicate is released again.
+        A marker left behind by a registration that never inserted its account
+        is repaired at startup (see :func:`_ensure_first_admin_markers`).
+        Returns ``(student_id, role)``, or ``None`` when the email is already registered.
+        """
+        if Student.find_by_email(email) is not None:
+            return None
+        student_id = ObjectId()
+        role = "admin" if Marker.claim(Marker.FIRST_ADMIN, student_id) else "student"
+        try:
+            Student.create(email, name, password_hash, role, student_id)
+        except DuplicateKeyError:
+            if role == "admin":
+                Marker.release(Marker.FIRST_ADMIN, student_id)
+            return None
+        return student_id, role
 
     @staticmethod
     def find_by_email(email: str):
-        return mongo.db.students.find_one({"email": email})
+        return _db().students.find_one(scoped({"email": email}))
 
     @staticmethod
     def find_by_id(student_id: str):
-        return mongo.db.students.find_one({"_id": ObjectId(student_id)})
+        return _db().students.find_one(scoped({"_id": ObjectId(student_id)}))
+
+    @staticmethod
+    def load(student_id):
+        """Batched, request-cached :meth:`find_by_id` (see :mod:`backend.utils.loader`)."""
+        return loader("students", lambda ids: _find_by_ids("students", ids)).load(student_id)
+
+    @staticmethod
+    def exists_any() -> bool:
+        return _db().students.find_one(scoped(), {"_id": 1}) is not None
+
+    @staticmethod
+    def find_all():
+        return _db().students.find(scoped()).sort("created_at", -1)
+
+    @staticmethod
+    def update_role(student_id: str, role: str):
+        return _db().students.update_one(scoped({"_id": ObjectId(student_id)}), {"$set": {"role": role}})
+
+    @staticmethod
+    def delete(student_id: str):
+        return _db().students.delete_one(scoped({"_id": ObjectId(student_id)}))
 
 class LostItem:
     @staticmethod
@@ -32,46 +113,83 @@ class LostItem:
             "description": description,
             "category": category,
             "location": location,
+            "location_id": Location.resolve(location),
             "date_lost": date_lost,
             "student_id": ObjectId(student_id),
             "passkey": passkey,
             "serial_number": serial_number,
             "status": "pending",
+            "campus": current_campus(),
             "created_at": datetime.utcnow()
         }
-        return mongo.db.lost_items.insert_one(item)
+        result = _db().lost_items.insert_one(item)
+        Stats.record_created("lost_items", item)
+        return result
 
     @staticmethod
     def find_by_passkey(passkey: str):
-        return mongo.db.lost_items.find_one({"passkey": passkey})
+        return _db().lost_items.find_one(scoped({"passkey": passkey}))
 
     @staticmethod
     def find_by_student(student_id: str):
-        return mongo.db.lost_items.find({"student_id": ObjectId(student_id)})
+        return _db().lost_items.find(scoped({"student_id": ObjectId(student_id)}))
+
+    @staticmethod
+    def find_by_id(item_id: str, include_archived: bool = False):
+        item = _db().lost_items.find_one(scoped({"_id": ObjectId(item_id)}))
+        if item is None and include_archived:
+            item = _db().lost_items_archive.find_one(scoped({"_id": ObjectId(item_id)}))
+        return item
 
     @staticmethod
-    def find_by_id(item_id: str):
-        return mongo.db.lost_items.find_one({"_id": ObjectId(item_id)})
+    def load(item_id, include_archived: bool = False):
+        """Batched, request-cached :meth:`find_by_id`."""
+        name = "lost_items+archive" if include_archived else "lost_items"
+        return loader(name, lambda ids: _find_by_ids("lost_items", ids, include_archived)).load(item_id)
 
     @staticmethod
-    def search(query: str, limit: int = 20):
-        """Text search lost items by query string."""
-        return mongo.db.lost_items.find(
-            {"$text": {"$search": query}},
-            {"score": {"$meta": "textScore"}}
-        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    def find_all(limit: int = 100, archived: bool = False):
+        """Find the most recent lost items, from the archive if requested."""
+        collection = _db().lost_items_archive if archived else _db().lost_items
+        return collection.find(scoped()).sort("created_at", -1).limit(limit)
+
+    @staticmethod
+    def search_query(query: str, limit: int = 20, where: dict | None = None) -> dict:
+        """Filter, projection, sort and limit of :meth:`search`, also explained by the index advisor."""
+        return {
+            "filter": {"$text": {"$search": query}, **(where or {})},
+            "projection": {"score": {"$meta": "textScore"}},
+            "sort": [("score", {"$meta": "textScore"})],
+            "limit": limit,
+        }
+
+    @staticmethod
+    def search(query: str, limit: int = 20, where: dict | None = None):
+        """Text search lost items by query string, restricted by ``where`` (e.g. :meth:`Location.filter_query`)."""
+        spec = LostItem.search_query(query, limit, where)
+        return _db().lost_items.find(scoped(spec["filter"]), spec["projection"]).sort(spec["sort"]).limit(spec["limit"])
 
     @staticmethod
     def find_by_serial_number(serial_number: str):
         """Find lost items by exact serial number match."""
-        return mongo.db.lost_items.find({"serial_number": {"$regex": serial_number, "$options": "i"}})
+        return _db().lost_items.find(scoped({"serial_number": {"$regex": serial_number, "$options": "i"}}))
+
+    @staticmethod
+    def delete(item_id: str):
+        return _db().lost_items.delete_one(scoped({"_id": ObjectId(item_id)}))
 
     @staticmethod
     def update_status(item_id: str, status: str):
-        return mongo.db.lost_items.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        """Set the status and return the item as it was before the update."""
+        previous = _db().lost_items.find_one_and_update(
+            scoped({"_id": ObjectId(item_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE,
         )
+        if previous is not None:
+            Stats.record_status_change("lost_items", previous.get("status"), status)
+        return previous
 
 class FoundItem:
     @staticmethod
@@ -82,90 +200,220 @@ class FoundItem:
             "description": description,
             "category": category,
             "location": location,
+            "location_id": Location.resolve(location),
             "finder_id": ObjectId(finder_id),
             "passkey": passkey,
             "serial_number": serial_number,
             "status": "unclaimed",
+            "campus": current_campus(),
             "created_at": datetime.utcnow()
         }
-        return mongo.db.found_items.insert_one(item)
+        result = _db().found_items.insert_one(item)
+        Stats.record_created("found_items", item)
+        return result
 
     @staticmethod
     def find_by_passkey(passkey: str):
-        return mongo.db.found_items.find_one({
+        return _db().found_items.find_one(scoped({
             "passkey": passkey,
-            "status": {"$ne": "claimed"}  # Exclude claimed items
-        })
+            "status": FOUND_ACTIVE_STATUS  # Exclude claimed items
+        }))
 
     @staticmethod
-    def find_by_id(item_id: str):
-        return mongo.db.found_items.find_one({"_id": ObjectId(item_id)})
+    def find_by_id(item_id: str, include_archived: bool = False):
+        item = _db().found_items.find_one(scoped({"_id": ObjectId(item_id)}))
+        if item is None and include_archived:
+            item = _db().found_items_archive.find_one(scoped({"_id": ObjectId(item_id)}))
+        return item
 
     @staticmethod
-    def find_all():
-        """Find all found items."""
-        return mongo.db.found_items.find().sort("created_at", -1)
+    def load(item_id, include_archived: bool = False):
+        """Batched, request-cached :meth:`find_by_id`."""
+        name = "found_items+archive" if include_archived else "found_items"
+        return loader(name, lambda ids: _find_by_ids("found_items", ids, include_archived)).load(item_id)
+
+    @staticmethod
+    def find_all(limit: int = 0, archived: bool = False):
+        """Find all found items (newest first), from the archive if requested."""
+        collection = _db().found_items_archive if archived else _db().found_items
+        return collection.find(scoped()).sort("created_at", -1).limit(limit)
+
+    @staticmethod
+    def delete(item_id: str):
+        return _db().found_items.delete_one(scoped({"_id": ObjectId(item_id)}))
 
     @staticmethod
     def update_status(item_id: str, status: str):
-        return mongo.db.found_items.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": {"status": status}}
+        """Set the status and return the item as it was before the update."""
+        previous = _db().found_items.find_one_and_update(
+            scoped({"_id": ObjectId(item_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE,
         )
+        if previous is not None:
+            Stats.record_status_change("found_items", previous.get("status"), status)
+        return previous
 
     @staticmethod
-    def search(query: str, limit: int = 20):
-        """Text search found items by query string, excluding claimed items."""
-        return mongo.db.found_items.find(
-            {
+    def search_query(query: str, limit: int = 20, where: dict | None = None) -> dict:
+        """Filter, projection, sort and limit of :meth:`search`, also explained by the index advisor."""
+        return {
+            "filter": {
                 "$text": {"$search": query},
-                "status": {"$ne": "claimed"}  # Exclude claimed items
+                "status": FOUND_ACTIVE_STATUS,  # Exclude claimed items
+                **(where or {}),
             },
-            {"score": {"$meta": "textScore"}}
-        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            "projection": {"score": {"$meta": "textScore"}},
+            "sort": [("score", {"$meta": "textScore"})],
+            "limit": limit,
+        }
+
+    @staticmethod
+    def search(query: str, limit: int = 20, where: dict | None = None):
+        """Text search found items by query string, excluding claimed items."""
+        spec = FoundItem.search_query(query, limit, where)
+        return _db().found_items.find(scoped(spec["filter"]), spec["projection"]).sort(spec["sort"]).limit(spec["limit"])
+
+    @staticmethod
+    def find_match_candidates(plan, limit: int = 20):
+        """Run a :class:`~backend.utils.match_planner.MatchPlan` against unclaimed found items."""
+        if plan.strategy == "text":
+            return _db().found_items.find(
+                scoped({"$text": {"$search": plan.text_query}, **plan.filter}),
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        return _db().found_items.find(scoped(plan.filter)).sort("created_at", -1).limit(limit)
+
+    # Fields the search can be faceted (and filtered) on
+    FACET_FIELDS = ("category", "location")
+
+    @staticmethod
+    def facets_pipeline(match: dict, facets: list[str], filters: dict = None, limit: int = 20) -> list:
+        """The aggregation behind :meth:`search_with_facets`; ``match`` selects the searched items.
+
+        A filter value is either the required value of the facet field or a
+        query fragment (a dict, e.g. from :meth:`Location.filter_query`).
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+
+        def conditions(skip: str | None = None) -> dict:
+            query = {}
+            for facet, value in filters.items():
+                if facet != skip:
+                    query.update(value if isinstance(value, dict) else {facet: value})
+            return query
+
+        branches = {
+            "hits": [
+                {"$match": conditions()},
+                {"$sort": {"score": -1}},
+                {"$limit": limit},
+            ],
+        }
+        for facet in facets:
+            branches[facet] = [
+                {"$match": conditions(skip=facet)},
+                {"$group": {"_id": f"${facet}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ]
+        return [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+            {"$facet": branches},
+        ]
+
+    @staticmethod
+    def facets_query(query: str) -> dict:
+        """The ``$match`` of :meth:`search_with_facets`, also explained by the index advisor."""
+        return {"$text": {"$search": query}, "status": FOUND_ACTIVE_STATUS}
+
+    @staticmethod
+    def search_with_facets(query: str, facets: list[str], filters: dict = None, limit: int = 20):
+        """Text search plus per-facet counts in a single ``$facet`` aggregation.
+
+        ``filters`` maps facet fields to required values. Each facet's counts
+        apply every filter except its own, so the UI can offer the alternatives
+        ("Electronics (42)") next to the current selection.
+        Returns ``{"hits": [...], "<facet>": [{"_id": value, "count": n}, ...]}``.
+        """
+        pipeline = FoundItem.facets_pipeline(scoped(FoundItem.facets_query(query)), facets, filters, limit)
+        return next(_db().found_items.aggregate(pipeline), {"hits": []})
 
     @staticmethod
     def find_by_serial_number(serial_number: str):
         """Find found items by exact serial number match, excluding claimed items."""
-        return mongo.db.found_items.find({
+        return _db().found_items.find(scoped({
             "serial_number": {"$regex": serial_number, "$options": "i"},
-            "status": {"$ne": "claimed"}  # Exclude claimed items
-        })
+            "status": FOUND_ACTIVE_STATUS  # Exclude claimed items
+        }))
 
 class Claim:
     @staticmethod
     def create(lost_item_id: str, found_item_id: str, student_id: str):
-        claim = {
+        """Create a pending claim unless the student already claimed this found item.
+
+        A single upsert on the unique (campus, found item, student) index, so
+        concurrent duplicate requests yield one claim. Returns ``(claim_id, created)``;
+        for a duplicate, ``claim_id`` is the existing claim.
+        """
+        key = scoped({"found_item_id": ObjectId(found_item_id), "student_id": ObjectId(student_id)})
+        fields = {
+            "_id": ObjectId(),
             "lost_item_id": ObjectId(lost_item_id),
-            "found_item_id": ObjectId(found_item_id),
-            "student_id": ObjectId(student_id),
             "status": "pending",
             "created_at": datetime.utcnow()
         }
-        return mongo.db.claims.insert_one(claim)
+        try:
+            existing = _db().claims.find_one_and_update(
+                key, {"$setOnInsert": fields}, projection={"_id": 1}, upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # Lost the race to a concurrent upsert of the same claim
+            existing = Claim.find_existing_claim(found_item_id, student_id)
+        if existing is not None:
+            return existing["_id"], False
+
+        claim = {**key, **fields}
+        Stats.record_created("claims", claim)
+        notify(claim_events(claim, None))
+        return claim["_id"], True
 
     @staticmethod
     def update_status(claim_id: str, status: str):
-        return mongo.db.claims.update_one(
-            {"_id": ObjectId(claim_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        """Set the status and return the claim as it was before the update."""
+        previous = _db().claims.find_one_and_update(
+            scoped({"_id": ObjectId(claim_id)}),
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"status": 1, "student_id": 1, "lost_item_id": 1, "found_item_id": 1},
+            return_document=ReturnDocument.BEFORE,
         )
+        if previous is not None:
+            Stats.record_status_change("claims", previous.get("status"), status)
+            notify(claim_events(previous, status))
+        return previous
 
     @staticmethod
     def find_all(limit: int = 50):
-        return mongo.db.claims.find().sort("created_at", -1).limit(limit)
+        return _db().claims.find(scoped()).sort("created_at", -1).limit(limit)
 
     @staticmethod
     def find_by_id(claim_id: str):
-        return mongo.db.claims.find_one({"_id": ObjectId(claim_id)})
+        return _db().claims.find_one(scoped({"_id": ObjectId(claim_id)}))
+
+    @staticmethod
+    def load(claim_id):
+        """Batched, request-cached :meth:`find_by_id`."""
+        return loader("claims", lambda ids: _find_by_ids("claims", ids)).load(claim_id)
 
     @staticmethod
     def find_existing_claim(found_item_id: str, student_id: str):
         """Check if a user has already claimed this found item."""
-        return mongo.db.claims.find_one({
+        return _db().claims.find_one(scoped({
             "found_item_id": ObjectId(found_item_id),
             "student_id": ObjectId(student_id)
-        })
+        }))
 
 class Retrieval:
     @staticmethod
@@ -178,73 +426,659 @@ class Retrieval:
             "retrieval_location": retrieval_location,
             "notes": notes,
             "retrieval_date": datetime.utcnow(),
+            "campus": current_campus(),
             "created_at": datetime.utcnow()
         }
-        return mongo.db.retrievals.insert_one(retrieval)
+        result = _db().retrievals.insert_one(retrieval)
+        Stats.record_created("retrievals", retrieval)
+        notify(retrieval_events(retrieval))
+        return result
 
     @staticmethod
     def find_by_claim_id(claim_id: str):
         """Find retrieval record by claim ID."""
-        return mongo.db.retrievals.find_one({"claim_id": ObjectId(claim_id)})
+        return _db().retrievals.find_one(scoped({"claim_id": ObjectId(claim_id)}))
 
     @staticmethod
     def find_by_student(student_id: str):
         """Find all retrievals by a student."""
-        return mongo.db.retrievals.find({"student_id": ObjectId(student_id)}).sort("retrieval_date", -1)
+        return _db().retrievals.find(scoped({"student_id": ObjectId(student_id)})).sort("retrieval_date", -1)
 
     @staticmethod
     def find_by_id(retrieval_id: str):
         """Find retrieval by ID."""
-        return mongo.db.retrievals.find_one({"_id": ObjectId(retrieval_id)})
+        return _db().retrievals.find_one(scoped({"_id": ObjectId(retrieval_id)}))
 
     @staticmethod
     def find_all(limit: int = 50):
         """Find all retrievals."""
-        return mongo.db.retrievals.find().sort("retrieval_date", -1).limit(limit)
+        return _db().retrievals.find(scoped()).sort("retrieval_date", -1).limit(limit)
 
     @staticmethod
     def update_notes(retrieval_id: str, notes: str):
         """Update retrieval notes."""
-        return mongo.db.retrievals.update_one(
-            {"_id": ObjectId(retrieval_id)},
+        return _db().retrievals.update_one(
+            scoped({"_id": ObjectId(retrieval_id)}),
             {"$set": {"notes": notes, "updated_at": datetime.utcnow()}}
         )
 
 
+class MatchRun:
+    """Bookkeeping for batch match reconciliation runs."""
+
+    @staticmethod
+    def create(triggered_by: str = None):
+        run = {
+            "status": "running",
+            "triggered_by": ObjectId(triggered_by) if triggered_by else None,
+            "campus": current_campus(),
+            "started_at": datetime.utcnow(),
+        }
+        return _db().match_runs.insert_one(run)
+
+    @staticmethod
+    def finish(run_id, result: dict = None, error: str = None):
+        return _db().match_runs.update_one(
+            scoped({"_id": ObjectId(run_id)}),
+            {"$set": {
+                "status": "failed" if error else "completed",
+                "result": result,
+                "error": error,
+                "finished_at": datetime.utcnow(),
+            }}
+        )
+
+    @staticmethod
+    def find_by_id(run_id: str):
+        return _db().match_runs.find_one(scoped({"_id": ObjectId(run_id)}))
+
+
+class RequestProfile:
+    """Request profiles (see :mod:`backend.utils.profiling`).
+
+    They live in the capped ``request_profiles`` collection of the main
+    database, so the oldest are overwritten once the buffer is full and every
+    worker can serve every profile.
+    """
+
+    COLLECTION = "request_profiles"
+    SUMMARY_FIELDS = {"pstats": 0, "collapsed": 0, "mongo.commands": 0}
+
+    @staticmethod
+    def create(profile: dict):
+        profile = {**profile, "campus": current_campus()}
+        return storage().db[RequestProfile.COLLECTION].insert_one(profile)
+
+    @staticmethod
+    def find_by_id(profile_id: str):
+        return storage().db[RequestProfile.COLLECTION].find_one(scoped({"_id": ObjectId(profile_id)}))
+
+    @staticmethod
+    def find_recent(limit: int = 50):
+        """Newest first, without the profile data itself."""
+        return storage().db[RequestProfile.COLLECTION].find(
+            scoped(), RequestProfile.SUMMARY_FIELDS
+        ).sort("$natural", DESCENDING).limit(limit)
+
+
+class Location:
+    """The campus location registry (see :mod:`backend.utils.locations`)."""
+
+    @staticmethod
+    def replace_all(documents: list[dict]) -> int:
+        """Make ``documents`` (from ``build_registry``) the current campus's registry."""
+        campus = current_campus()
+        requests = [
+            ReplaceOne({"_id": f"{campus}:{doc['location_id']}"}, {**doc, "campus": campus}, upsert=True)
+            for doc in documents
+        ]
+        requests.append(DeleteMany(scoped({"location_id": {"$nin": [doc["location_id"] for doc in documents]}})))
+        _db().locations.bulk_write(requests, ordered=True)
+        return len(documents)
+
+    @staticmethod
+    def find_all_query() -> dict:
+        """Filter, projection and sort of :meth:`find_all`, also explained by the index advisor."""
+        return {"filter": {}, "projection": {"aliases": 0}, "sort": [("location_id", ASCENDING)]}
+
+    @staticmethod
+    def resolve_query(candidates: list[str]) -> dict:
+        """Filter and projection of :meth:`resolve`, also explained by the index advisor."""
+        return {"filter": {"aliases": {"$in": candidates}}, "projection": {"location_id": 1, "aliases": 1, "path": 1}}
+
+    @staticmethod
+    def expand_query(location_id: str) -> dict:
+        """Filter and projection of :meth:`expand`, also explained by the index advisor."""
+        return {"filter": {"path": location_id}, "projection": {"location_id": 1}}
+
+    @staticmethod
+    def find_all():
+        spec = Location.find_all_query()
+        return _db().locations.find(scoped(spec["filter"]), spec["projection"]).sort(spec["sort"])
+
+    @staticmethod
+    def resolve(text: str | None) -> str | None:
+        """Canonical id for free text such as "library 2nd floor", or ``None``; one indexed query."""
+        candidates = phrases(text)
+        if not candidates:
+            return None
+        spec = Location.resolve_query(candidates)
+        matches = _db().locations.find(scoped(spec["filter"]), spec["projection"])
+        return best_match(text, list(matches))
+
+    @staticmethod
+    def expand(location_id: str) -> list[str]:
+        """``location_id`` and every location below it (a building's floors and rooms)."""
+        spec = Location.expand_query(location_id)
+        return [doc["location_id"] for doc in _db().locations.find(scoped(spec["filter"]), spec["projection"])]
+
+    @staticmethod
+    def filter_query(text: str | None) -> dict | None:
+        """Query fragment selecting items at ``text`` or anywhere below it.
+
+        Text that names no registered location falls back to exact equality on
+        the free-text ``location``.
+        """
+        if not text:
+            return None
+        location_id = Location.resolve(text)
+        if location_id is None:
+            return {"location": text}
+        return {"location_id": {"$in": Location.expand(location_id)}}
+
+    @staticmethod
+    def backfill() -> dict:
+        """Re-resolve ``location_id`` of every item (after the registry changed); counts per collection."""
+        updated = {}
+        for name in ("lost_items", "found_items", "lost_items_archive", "found_items_archive"):
+            collection = _db()[name]
+            updated[name] = 0
+            # Few distinct spellings: resolve each once and update its items together
+            for text in collection.distinct("location", scoped()):
+                result = collection.update_many(
+                    scoped({"location": text}), {"$set": {"location_id": Location.resolve(text)}}
+                )
+                updated[name] += result.modified_count
+        return updated
+
+
+class Marker:
+    """One-time facts of a campus, each settled by whoever inserts its marker document first."""
+
+    FIRST_ADMIN = "first_admin"
+    CAMPUS_BACKFILL = "campus_backfill"
+
+    @staticmethod
+    def _doc_id(name: str) -> str:
+        return f"{name}:{current_campus()}"
+
+    @staticmethod
+    def claim(name: str, value) -> bool:
+        """Settle ``name`` with ``value``; True only for the caller that settled it.
+
+        Settled markers are remembered per app, so once a marker exists this
+        costs no round trip.
+        """
+        settled = current_app.extensions.setdefault("settled_markers", set())
+        doc_id = Marker._doc_id(name)
+        if (_db().name, doc_id) in settled:
+            return False
+        try:
+            result = _db().markers.update_one(
+                {"_id": doc_id},
+                {"$setOnInsert": {"value": value, "campus": current_campus(), "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            result = None  # Settled concurrently
+        settled.add((_db().name, doc_id))
+        return result is not None and result.upserted_id is not None
+
+    @staticmethod
+    def release(name: str, value) -> bool:
+        """Unsettle ``name`` if it still holds ``value``, so the next :meth:`claim` can settle it.
+
+        Other processes that saw the marker settled keep treating it as such
+        until they restart.
+        """
+        doc_id = Marker._doc_id(name)
+        current_app.extensions.setdefault("settled_markers", set()).discard((_db().name, doc_id))
+        return _db().markers.delete_one({"_id": doc_id, "value": value}).deleted_count == 1
+
+    @staticmethod
+    def find(name: str):
+        return _db().markers.find_one({"_id": Marker._doc_id(name)})
+
+
+class Stats:
+    """Running counters for the admin dashboard, kept in a single ``stats`` document.
+
+    Writes bump the counters with ``$inc`` as they happen; ``reconcile`` recomputes
+    them from the collections to correct any drift (e.g. from deleted items).
+    """
+
+    DOC_ID = "counters"
+    # Recounts tried by reconcile while writes keep moving the stored counters
+    RECONCILE_ATTEMPTS = 3
+    # Which fields are broken down for each counted collection
+    BREAKDOWNS = {
+        "lost_items": {"status": "status", "category": "category", "location": "location"},
+        "found_items": {"status": "status", "category": "category", "location": "location"},
+        "claims": {"status": "status"},
+        "retrievals": {"location": "retrieval_location"},
+    }
+
+    @staticmethod
+    def _doc_id() -> str:
+        return f"{Stats.DOC_ID}:{current_campus()}"
+
+    @staticmethod
+    def _key(value) -> str:
+        """Make a stored value usable as a field name in the counters document."""
+        if value is None or value == "":
+            return "unknown"
+        return str(value).replace(".", "_").replace("$", "_")
+
+    @staticmethod
+    def record_created(collection: str, doc: dict):
+        inc = {f"{collection}.total": 1}
+        for facet, field in Stats.BREAKDOWNS[collection].items():
+            inc[f"{collection}.{facet}.{Stats._key(doc.get(field))}"] = 1
+        return _db().stats.update_one({"_id": Stats._doc_id()}, {"$inc": inc}, upsert=True)
+
+    @staticmethod
+    def record_status_change(collection: str, old_status: str, new_status: str):
+        if old_status == new_status:
+            return None
+        return _db().stats.update_one(
+            {"_id": Stats._doc_id()},
+            {"$inc": {
+                f"{collection}.status.{Stats._key(old_status)}": -1,
+                f"{collection}.status.{Stats._key(new_status)}": 1,
+            }},
+            upsert=True,
+        )
+
+    @staticmethod
+    def get():
+        return _db().stats.find_one({"_id": Stats._doc_id()})
+
+    @staticmethod
+    def reconcile_pipeline(collection: str, campus_filter: dict) -> list:
+        """One ``$facet`` aggregation computing every counter of ``collection`` for one campus."""
+        pipeline = [{"$match": campus_filter}]
+        if collection in ("lost_items", "found_items"):
+            # Archived items still count towards the totals
+            pipeline.append({"$unionWith": {"coll": f"{collection}_archive", "pipeline": [{"$match": campus_filter}]}})
+        pipeline.append({"$facet": {
+            "total": [{"$count": "n"}],
+            **{
+                facet: [{"$group": {"_id": f"${field}", "n": {"$sum": 1}}}]
+                for facet, field in Stats.BREAKDOWNS[collection].items()
+            },
+        }})
+        return pipeline
+
+    @staticmethod
+    def counters_from_result(collection: str, result: dict) -> dict:
+        total = result.get("total") or [{"n": 0}]
+        counters = {"total": total[0]["n"]}
+        for facet in Stats.BREAKDOWNS[collection]:
+            buckets = {}
+            for bucket in result.get(facet, []):
+                key = Stats._key(bucket["_id"])
+                buckets[key] = buckets.get(key, 0) + bucket["n"]
+            counters[facet] = buckets
+        return counters
+
+    @staticmethod
+    def _flatten(counters: dict, prefix: str = "") -> dict:
+        flat = {}
+        for key, value in counters.items():
+            if isinstance(value, dict):
+                flat.update(Stats._flatten(value, f"{prefix}{key}."))
+            elif isinstance(value, (int, float)):
+                flat[f"{prefix}{key}"] = value
+        return flat
+
+    @staticmethod
+    def stored_counters(stored: dict | None) -> dict:
+        """The counters of a stored ``stats`` document, flattened to dotted field names."""
+        return Stats._flatten({c: (stored or {}).get(c, {}) for c in Stats.BREAKDOWNS})
+
+    @staticmethod
+    def reconcile_update(counters: dict, stored: dict | None) -> dict:
+        """The update that corrects the ``stored`` counters to the recomputed ``counters``.
+
+        The difference is applied with ``$inc`` rather than by replacing the
+        document, so counter updates from writes that land meanwhile are kept.
+        """
+        wanted = Stats._flatten({c: counters[c] for c in Stats.BREAKDOWNS})
+        current = Stats.stored_counters(stored)
+        inc = {key: wanted.get(key, 0) - current.get(key, 0) for key in wanted.keys() | current.keys()}
+        update = {"$set": {"campus": counters["campus"], "reconciled_at": counters["reconciled_at"]}}
+        inc = {key: delta for key, delta in inc.items() if delta}
+        if inc:
+            update["$inc"] = inc
+        return update
+
+    @staticmethod
+    def reconcile():
+        """Recompute every counter with one aggregation per collection and correct the stored ones.
+
+        The correction is computed against counters read before the recount. A
+        write whose ``$inc`` lands during the recount would be corrected for as
+        well as counted by its own ``$inc``, so the counters are read again
+        afterwards and the recount repeated if they moved, up to
+        ``RECONCILE_ATTEMPTS`` times; after that the last correction is applied
+        anyway. A write whose document is counted but whose ``$inc`` lands after
+        the second read is still counted twice, until the next reconcile.
+        """
+        for _ in range(Stats.RECONCILE_ATTEMPTS):
+            stored = Stats.get()
+            counters = {}
+            for collection in Stats.BREAKDOWNS:
+                result = next(_db()[collection].aggregate(Stats.reconcile_pipeline(collection, scoped())), {})
+                counters[collection] = Stats.counters_from_result(collection, result)
+            if Stats.stored_counters(Stats.get()) == Stats.stored_counters(stored):
+                break
+
+        counters["campus"] = current_campus()
+        counters["reconciled_at"] = datetime.utcnow()
+        _db().stats.update_one({"_id": Stats._doc_id()}, Stats.reconcile_update(counters, stored), upsert=True)
+        return {"_id": Stats._doc_id(), **counters}
+
+
+def _ensure_index(collection, keys, name: str, **options) -> None:
+    """Create an index, replacing an existing one of the same name whose definition changed.
+
+    ``create_index`` refuses to redefine an index in place (e.g. to make it
+    partial), so a stale definition is dropped first.
+    """
+    existing = collection.index_information().get(name)
+    if existing is not None:
+        wanted_partial = options.get("partialFilterExpression")
+        if existing.get("partialFilterExpression") != wanted_partial or bool(existing.get("unique")) != bool(options.get("unique")):
+            collection.drop_index(name)
+    collection.create_index(keys, name=name, **options)
+
+
+# Indexes dropped at startup: from before every index was prefixed with the campus field, or no longer used
+_LEGACY_INDEXES = {
+    "students": ["unique_email_idx"],
+    "lost_items": ["lost_passkey_idx", "lost_serial_idx", "lost_items_text_index", "lost_status_updated_idx",
+                   # Lost items are only filtered by location in $text searches, which use the text index
+                   "campus_lost_location_created_idx"],
+    "found_items": ["found_passkey_idx", "found_serial_idx", "found_items_text_index",
+                    "found_category_created_idx", "found_status_updated_idx"],
+    "lost_items_archive": ["lost_archive_created_idx"],
+    "found_items_archive": ["found_archive_created_idx"],
+    "claims": ["claims_lost_idx", "claims_found_idx", "claims_student_idx", "claims_found_student_idx"],
+    "retrievals": ["retrievals_claim_idx"],
+    "match_candidates": ["match_candidates_student_idx"],
+}
+
+
 def ensure_indexes() -> None:
-    """Create required MongoDB indexes if they do not exist."""
-    # Students: unique email
-    mongo.db.students.create_index([("email", ASCENDING)], unique=True, name="unique_email_idx")
+    """Create required MongoDB indexes if they do not exist.
+
+    Every index is prefixed with ``campus``, so each campus is a separate index
+    partition (and the prefix doubles as a shard key). In per-campus database
+    mode the same indexes are created in every campus database.
+    """
+    _backfill_campus()
+    for db in partition_databases():
+        for collection, names in _LEGACY_INDEXES.items():
+            existing = db[collection].index_information()
+            for name in names:
+                if name in existing:
+                    db[collection].drop_index(name)
+        _ensure_campus_indexes(db)
+    _ensure_profile_buffer()
+    _ensure_first_admin_markers()
+
+
+def _backfill_campus() -> None:
+    """Tag documents from before campuses with ``LEGACY_CAMPUS`` once, before they would drop out of scoped queries."""
+    campus = current_app.config["LEGACY_CAMPUS"]
+    with campus_context(campus):
+        if Marker.find(Marker.CAMPUS_BACKFILL) is not None:
+            return
+        counts = assign_campus(campus)
+        if any(counts.values()):
+            current_app.logger.warning(f"Assigned {sum(counts.values())} document(s) from before campuses to '{campus}'")
+            if current_app.config["CAMPUS_PARTITIONING"] == "database":
+                current_app.logger.warning(
+                    f"They stay in {storage().db.name}; move them to {database().name} to serve them"
+                )
+        Marker.claim(Marker.CAMPUS_BACKFILL, counts)
+
+
+# Far beyond any registration's deadline: an account still missing by then was never inserted
+ORPHANED_MARKER_AGE = timedelta(minutes=5)
+
+
+def _ensure_first_admin_markers() -> None:
+    """Settle the first-admin marker of campuses that had accounts before markers existed.
+
+    A marker naming an account that still does not exist ``ORPHANED_MARKER_AGE``
+    after it was claimed belongs to a registration that stopped before
+    inserting it: it is released, and the campus's oldest account, if any,
+    becomes the admin in its place.
+    """
+    orphaned_before = datetime.utcnow() - ORPHANED_MARKER_AGE
+    for campus in configured_campuses():
+        with campus_context(campus):
+            marker = Marker.find(Marker.FIRST_ADMIN)
+            if (marker is not None and marker["value"] is not None and marker["created_at"] < orphaned_before
+                    and Student.find_by_id(marker["value"]) is None):
+                Marker.release(Marker.FIRST_ADMIN, marker["value"])
+                oldest = _db().students.find_one(scoped(), {"_id": 1}, sort=[("created_at", ASCENDING)])
+                if oldest is not None and Marker.claim(Marker.FIRST_ADMIN, oldest["_id"]):
+                    Student.update_role(str(oldest["_id"]), "admin")
+            elif Student.exists_any():
+                Marker.claim(Marker.FIRST_ADMIN, None)
+
+
+def _ensure_profile_buffer() -> None:
+    """Create the capped collection request profiles are kept in.
+
+    Resizing an existing buffer means dropping the collection (its profiles are lost).
+    """
+    if RequestProfile.COLLECTION in storage().db.list_collection_names():
+        return
+    try:
+        storage().db.create_collection(
+            RequestProfile.COLLECTION,
+            capped=True,
+            size=current_app.config["PROFILING_BUFFER_MB"] * 1024 * 1024,
+            max=current_app.config["PROFILING_BUFFER_SIZE"],
+        )
+    except CollectionInvalid:
+        pass  # Created concurrently by another process
+
+
+def _sharded_key(db, collection: str) -> list[str] | None:
+    """Shard key fields of ``collection``, or ``None`` when it is not sharded."""
+    try:
+        info = db.client["config"].collections.find_one({"_id": f"{db.name}.{collection}", "dropped": {"$ne": True}})
+    except OperationFailure:
+        # Not allowed to read the config database: not a cluster this app manages the sharding of
+        return None
+    return list(info["key"]) if info else None
+
+
+def _has_duplicate_claims(db) -> bool:
+    return bool(list(db.claims.aggregate([
+        {"$group": {"_id": {"campus": "$campus", "found": "$found_item_id", "student": "$student_id"},
+                    "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1},
+    ])))
+
+
+def _ensure_claim_key_index(db, campus) -> None:
+    """The (campus, found item, student) claims index, unique whenever MongoDB allows it.
+
+    It stays non-unique, with a warning, while duplicate claims exist or when
+    ``claims`` is sharded on a key that does not prefix it (a sharded unique
+    index must start with the shard key; see ``shard-collections``). Then
+    concurrent duplicate claim requests can again create two claims.
+    """
+    name = "campus_claims_found_student_idx"
+    claim_key = [campus, ("found_item_id", ASCENDING), ("student_id", ASCENDING)]
+    fields = [field for field, _ in claim_key]
+    shard_key = _sharded_key(db, "claims")
+    if shard_key is not None and shard_key != fields[:len(shard_key)]:
+        reason = f"claims is sharded on {shard_key}; reshard it on {fields}"
+    else:
+        existing = db.claims.index_information().get(name)
+        # Only the degraded state pays for the duplicate check, and it skips a drop and rebuild
+        if existing is not None and not existing.get("unique") and _has_duplicate_claims(db):
+            reason = "duplicate claims (same found item and student) exist; remove them"
+        else:
+            try:
+                _ensure_index(db.claims, claim_key, name, unique=True)
+                return
+            except DuplicateKeyError:
+                reason = "duplicate claims (same found item and student) exist; remove them"
+    current_app.logger.warning(f"The claims index of {db.name} is not unique: {reason}")
+    _ensure_index(db.claims, claim_key, name)
+
+
+def _ensure_campus_indexes(db) -> None:
+    campus = ("campus", ASCENDING)
+
+    # Students: unique email per campus
+    db.students.create_index([campus, ("email", ASCENDING)], unique=True, name="campus_unique_email_idx")
+    # Admin user listing, newest first
+    db.students.create_index([campus, ("created_at", DESCENDING)], name="campus_students_created_idx")
 
     # Lost items: passkey and text index with weights
-    mongo.db.lost_items.create_index([("passkey", ASCENDING)], name="lost_passkey_idx")
-    mongo.db.lost_items.create_index([("serial_number", ASCENDING)], name="lost_serial_idx")
-    mongo.db.lost_items.create_index(
-        [("title", TEXT), ("description", TEXT), ("category", TEXT), ("location", TEXT), ("serial_number", TEXT)],
-        name="lost_items_text_index",
+    db.lost_items.create_index([campus, ("passkey", ASCENDING)], name="campus_lost_passkey_idx")
+    db.lost_items.create_index([campus, ("serial_number", ASCENDING)], name="campus_lost_serial_idx")
+    # A student's own items and the admin listing
+    db.lost_items.create_index([campus, ("student_id", ASCENDING)], name="campus_lost_student_idx")
+    db.lost_items.create_index([campus, ("created_at", DESCENDING)], name="campus_lost_created_idx")
+    db.lost_items.create_index(
+        [campus, ("title", TEXT), ("description", TEXT), ("category", TEXT), ("location", TEXT), ("serial_number", TEXT)],
+        name="campus_lost_items_text_index",
         default_language="english",
         weights={"title": 10, "description": 5, "category": 3, "location": 2, "serial_number": 8},
     )
 
-    # Found items: passkey and text index with weights
-    mongo.db.found_items.create_index([("passkey", ASCENDING)], name="found_passkey_idx")
-    mongo.db.found_items.create_index([("serial_number", ASCENDING)], name="found_serial_idx")
-    mongo.db.found_items.create_index(
-        [("title", TEXT), ("description", TEXT), ("category", TEXT), ("location", TEXT), ("serial_number", TEXT)],
-        name="found_items_text_index",
+    # Found items: every lookup filters on the active status, so the indexes
+    # only cover unclaimed items and stay small as claimed ones pile up.
+    active_found = {"status": FOUND_ACTIVE_STATUS}
+    _ensure_index(db.found_items, [campus, ("passkey", ASCENDING)], "campus_found_passkey_idx",
+                  partialFilterExpression=active_found)
+    _ensure_index(db.found_items, [campus, ("serial_number", ASCENDING)], "campus_found_serial_idx",
+                  partialFilterExpression=active_found)
+    _ensure_index(
+        db.found_items,
+        [campus, ("title", TEXT), ("description", TEXT), ("category", TEXT), ("location", TEXT), ("serial_number", TEXT)],
+        "campus_found_items_text_index",
         default_language="english",
         weights={"title": 10, "description": 5, "category": 3, "location": 2, "serial_number": 8},
+        partialFilterExpression=active_found,
     )
+    # Match planner: category/date window over active items, newest first
+    _ensure_index(db.found_items, [campus, ("category", ASCENDING), ("created_at", DESCENDING)],
+                  "campus_found_category_created_idx", partialFilterExpression=active_found)
+    # Admin listing of every found item, newest first
+    db.found_items.create_index([campus, ("created_at", DESCENDING)], name="campus_found_created_idx")
+    # Match planner with ?location= and no usable keyword: the location expanded to its
+    # sub-locations with one $in, newest first (searches with keywords use the text index)
+    _ensure_index(db.found_items, [campus, ("location_id", ASCENDING), ("created_at", DESCENDING)],
+                  "campus_found_location_created_idx", partialFilterExpression=active_found)
+    # Archival job: resolved items ordered by when they were resolved
+    db.found_items.create_index([campus, ("status", ASCENDING), ("updated_at", ASCENDING)],
+                                name="campus_found_status_updated_idx")
+    db.lost_items.create_index([campus, ("status", ASCENDING), ("updated_at", ASCENDING)],
+                               name="campus_lost_status_updated_idx")
+
+    # Archives: admin listings and read-through by id
+    db.lost_items_archive.create_index([campus, ("created_at", DESCENDING)], name="campus_lost_archive_created_idx")
+    db.found_items_archive.create_index([campus, ("created_at", DESCENDING)], name="campus_found_archive_created_idx")
 
     # Claims: common lookup indexes
-    mongo.db.claims.create_index([("lost_item_id", ASCENDING)], name="claims_lost_idx")
-    mongo.db.claims.create_index([("found_item_id", ASCENDING)], name="claims_found_idx")
-    mongo.db.claims.create_index([("student_id", ASCENDING)], name="claims_student_idx")
-    # Compound index to prevent duplicate claims and improve lookup performance
-    mongo.db.claims.create_index([
-        ("found_item_id", ASCENDING), 
-        ("student_id", ASCENDING)
-    ], name="claims_found_student_idx")
+    db.claims.create_index([campus, ("lost_item_id", ASCENDING)], name="campus_claims_lost_idx")
+    db.claims.create_index([campus, ("found_item_id", ASCENDING)], name="campus_claims_found_idx")
+    db.claims.create_index([campus, ("student_id", ASCENDING)], name="campus_claims_student_idx")
+    # One claim per student and found item; Claim.create relies on it to reject duplicates
+    _ensure_claim_key_index(db, campus)
+    # Admin review queue, newest first
+    db.claims.create_index([campus, ("created_at", DESCENDING)], name="campus_claims_created_idx")
 
     # Retrievals: claim lookup
-    mongo.db.retrievals.create_index([("claim_id", ASCENDING)], name="retrievals_claim_idx")
+    db.retrievals.create_index([campus, ("claim_id", ASCENDING)], name="campus_retrievals_claim_idx")
+    # A student's retrievals and the admin history, newest first
+    db.retrievals.create_index([campus, ("student_id", ASCENDING), ("retrieval_date", DESCENDING)],
+                               name="campus_retrievals_student_date_idx")
+    db.retrievals.create_index([campus, ("retrieval_date", DESCENDING)], name="campus_retrievals_date_idx")
+
+    # Location registry: resolving free text by alias, expanding a location to its subtree,
+    # listing it in id order
+    db.locations.create_index([campus, ("aliases", ASCENDING)], name="campus_locations_aliases_idx")
+    db.locations.create_index([campus, ("path", ASCENDING)], name="campus_locations_path_idx")
+    db.locations.create_index([campus, ("location_id", ASCENDING)], name="campus_locations_id_idx")
+
+    # Batch match candidates (keyed by lost item id): per-student lookups
+    db.match_candidates.create_index([campus, ("student_id", ASCENDING)], name="campus_match_candidates_student_idx")
+
+
+def resolved_query(status: str, cutoff: datetime) -> dict:
+    """Filter of the items :func:`archive_resolved_items` moves, also explained by the index advisor."""
+    return {"status": status, "$or": [
+        {"updated_at": {"$lt": cutoff}},
+        # Items resolved before updated_at was recorded
+        {"updated_at": {"$exists": False}, "created_at": {"$lt": cutoff}},
+    ]}
+
+
+# Status in which each collection's items are resolved, and so archived
+RESOLVED_STATUS = {"found_items": "claimed", "lost_items": "found"}
+
+
+def archive_resolved_items(older_than_days: int, batch_size: int = 500) -> dict:
+    """Move the current campus's items resolved more than ``older_than_days`` ago into the *_archive collections.
+
+    Found items are archived once claimed, lost items once found. Documents are
+    copied with an upsert before being deleted, so an interrupted run can simply
+    be repeated; an item updated between the copy and the delete is kept and its
+    copy removed. Returns the number of documents moved per collection.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    jobs = [(name, scoped(resolved_query(status, cutoff))) for name, status in RESOLVED_STATUS.items()]
+
+    moved = {}
+    for name, query in jobs:
+        source = _db()[name]
+        archive = _db()[f"{name}_archive"]
+        moved[name] = 0
+        while True:
+            batch = list(source.find(query).limit(batch_size))
+            if not batch:
+                break
+            archived_at = datetime.utcnow()
+            archive.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True) for doc in batch],
+                ordered=False,
+            )
+            ids = [doc["_id"] for doc in batch]
+            # Only delete what still matches: an item updated since it was copied stays live
+            deleted = source.delete_many({"$and": [query, {"_id": {"$in": ids}}]}).deleted_count
+            if deleted < len(batch):
+                kept = [doc["_id"] for doc in source.find({"_id": {"$in": ids}}, {"_id": 1})]
+                archive.delete_many({"_id": {"$in": kept}})
+            moved[name] += deleted
+    return moved
+
+
+def assign_campus(campus: str) -> dict:
+    """Tag documents created before campuses existed with ``campus``. Returns counts per collection."""
+    updated = {}
+    for collection in _LEGACY_INDEXES:
+        result = storage().db[collection].update_many({"campus": {"$exists": False}}, {"$set": {"campus": campus}})
+        updated[collection] = result.modified_count
+    return updated
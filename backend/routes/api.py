@@ -1,45 +1,77 @@
-from flask import Blueprint, jsonify, request
+import os
+import queue
+import threading
+from flask import Blueprint, Response, current_app, jsonify, request
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-from bson import ObjectId
-from ..models.models import Student, LostItem, FoundItem, Claim, Retrieval
-from ..utils.auth import token_required, create_token, generate_passkey, match_items, admin_required
-from backend import mongo
+from ..models.models import Student, LostItem, FoundItem, Claim, Location, Retrieval, Stats, MatchRun, RequestProfile
+from .serializers import (
+    serialize_admin_claim, serialize_admin_found_item, serialize_admin_lost_item, serialize_admin_retrieval,
+    serialize_basic, serialize_facets, serialize_found_item, serialize_location, serialize_match_run,
+    serialize_own_lost_item,
+    serialize_own_retrieval, serialize_profile, serialize_stats, serialize_user,
+)
+from ..utils.auth import token_required, create_token, generate_passkey, match_items, admin_required, stream_token_required
+from ..utils.events import broker, format_sse
+from ..utils.matching import reconcile_matches
+from ..utils.match_planner import plan_match_query, summarize_explain
+from ..utils.profiling import top_functions
+from ..utils.tenancy import UnknownCampusError, campus_context, campus_from_request, current_campus, set_campus
+from pymongo.errors import PyMongoError
 
 api_bp = Blueprint("api", __name__)
 
-# Helpers
-def _serialize_basic(item):
-    return {
-        "id": str(item.get("_id")),
-        "title": item.get("title"),
-        "description": item.get("description"),
-        "category": item.get("category"),
-        "location": item.get("location"),
-        "status": item.get("status"),
-        "passkey": item.get("passkey"),
-        "serial_number": item.get("serial_number"),
-        "created_at": item.get("created_at").isoformat() if item.get("created_at") else None,
-    }
+@api_bp.before_request
+def _resolve_campus():
+    """Scope anonymous requests to the campus they name; the auth decorators
+    override this with the campus in the user's token."""
+    try:
+        set_campus(campus_from_request())
+    except UnknownCampusError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+
+@api_bp.before_request
+def _admit():
+    """Reject over-limit requests before they reach MongoDB (see utils.admission)."""
+    return current_app.extensions["admission"].admit()
+
+
+@api_bp.teardown_request
+def _release_admission(exc=None):
+    current_app.extensions["admission"].release(exc)
+
+
+@api_bp.before_request
+def _start_deadline():
+    """Bound every MongoDB operation of the request by its budget (see utils.deadlines)."""
+    current_app.extensions["deadlines"].start()
+
+
+@api_bp.teardown_request
+def _clear_deadline(exc=None):
+    current_app.extensions["deadlines"].finish(exc)
+
+
+@api_bp.errorhandler(PyMongoError)
+def _deadline_exceeded(exc):
+    return current_app.extensions["deadlines"].expired_response(exc)
 
 # Auth routes
 @api_bp.post("/auth/register")
 def register():
     data = request.get_json()
     
-    if Student.find_by_email(data["email"]):
-        return jsonify({"message": "Email already registered"}), 400
-    
-    # Check if this is the first user
-    user_count = mongo.db.students.count_documents({})
-    role = "admin" if user_count == 0 else "student"
-    
     password_hash = generate_password_hash(data["password"])
-    student = Student.create(data["email"], data["name"], password_hash, role)
+    # The first user of the campus becomes its admin
+    registered = Student.register(data["email"], data["name"], password_hash)
+    if registered is None:
+        return jsonify({"message": "Email already registered"}), 400
+    student_id, role = registered
     
     return jsonify({
         "message": "Registration successful",
-        "token": create_token(str(student.inserted_id), role)
+        "token": create_token(str(student_id), role, current_campus())
     }), 201
 
 @api_bp.post("/auth/login")
@@ -53,7 +85,7 @@ def login():
     role = student.get('role', 'student')
     
     return jsonify({
-        "token": create_token(str(student["_id"]), role)
+        "token": create_token(str(student["_id"]), role, current_campus())
     })
 
 # Lost Items routes
@@ -83,17 +115,7 @@ def report_lost_item(current_user_id):
 @token_required
 def get_lost_items(current_user_id):
     items = LostItem.find_by_student(current_user_id)
-    return jsonify([{
-        "id": str(item["_id"]),
-        "title": item["title"],
-        "description": item["description"],
-        "category": item["category"],
-        "location": item["location"],
-        "date_lost": item["date_lost"].isoformat() if item.get("date_lost") else None,
-        "serial_number": item.get("serial_number"),
-        "status": item["status"],
-        "passkey": item["passkey"]
-    } for item in items])
+    return jsonify([serialize_own_lost_item(item) for item in items])
 
 # Found Items routes
 @api_bp.post("/found-items")
@@ -116,7 +138,7 @@ def report_found_item(current_user_id):
     lost_item = LostItem.find_by_passkey(passkey)
     if lost_item:
         # Create a claim automatically
-        claim = Claim.create(
+        Claim.create(
             lost_item_id=str(lost_item["_id"]),
             found_item_id=str(found_item.inserted_id),
             student_id=str(lost_item["student_id"])
@@ -132,16 +154,7 @@ def report_found_item(current_user_id):
 def get_found_items(current_user_id):
     """Get all found items"""
     items = FoundItem.find_all()
-    return jsonify([{
-        "id": str(item["_id"]),
-        "title": item["title"],
-        "description": item["description"],
-        "category": item["category"],
-        "location": item["location"],
-        "date_found": item.get("date_found"),
-        "status": item.get("status", "unclaimed"),
-        "passkey": item["passkey"]
-    } for item in items])
+    return jsonify([serialize_found_item(item) for item in items])
 
 # Claims routes
 @api_bp.post("/claims/<claim_id>/verify")
@@ -150,10 +163,52 @@ def verify_claim(current_user_id, claim_id):
     Claim.update_status(claim_id, "verified")
     return jsonify({"message": "Claim verified successfully"})
 
+# Location registry (see utils.locations), for pickers and the ?location= filters
+@api_bp.get("/locations")
+def get_locations():
+    return jsonify([serialize_location(location) for location in Location.find_all()])
+
 @api_bp.get("/health")
 def health():
     return jsonify(status="ok")
 
+# Notification stream (Server-Sent Events)
+@api_bp.get("/events")
+@stream_token_required
+def events_stream(current_user_id):
+    """Push match, claim and retrieval events for the current user.
+
+    EventSource cannot send headers, so the JWT may also be passed as ``?token=``.
+    Each open stream holds a worker thread, so the stream is refused where
+    threads are the worker pool (``EVENTS_STREAM`` off); the async app serves it.
+    """
+    if not current_app.config["EVENTS_STREAM"]:
+        # Not retried by EventSource, unlike a dropped connection
+        return jsonify({"message": "Live notifications are served by the async app"}), 503
+    user_id = current_user_id
+    heartbeat = current_app.config["EVENTS_HEARTBEAT_SECONDS"]
+    broker.start(current_app._get_current_object())
+    subscription = broker.subscribe(user_id)
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event, data = subscription.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing the idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            broker.unsubscribe(user_id, subscription)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
 # Search routes
 @api_bp.get("/found-items/search")
 def search_found_items():
@@ -165,7 +220,21 @@ def search_found_items():
     category = request.args.get("category")
     location = request.args.get("location")
 
-    cursor = FoundItem.search(query, limit=limit)
+    facets_param = request.args.get("facets")
+    if facets_param:
+        facets = [f.strip() for f in facets_param.split(",") if f.strip()]
+        unknown = [f for f in facets if f not in FoundItem.FACET_FIELDS]
+        if unknown:
+            return jsonify({"message": f"Unsupported facet(s): {', '.join(unknown)}"}), 400
+        result = FoundItem.search_with_facets(
+            query, facets, filters={"category": category, "location": Location.filter_query(location)}, limit=limit
+        )
+        return jsonify({
+            "results": [serialize_basic(item) for item in result["hits"]],
+            "facets": serialize_facets(result, facets),
+        })
+
+    cursor = FoundItem.search(query, limit=limit, where=Location.filter_query(location))
     results = []
     for item in cursor:
         # Skip claimed items
@@ -173,9 +242,7 @@ def search_found_items():
             continue
         if category and item.get("category") != category:
             continue
-        if location and item.get("location") != location:
-            continue
-        results.append(_serialize_basic(item))
+        results.append(serialize_basic(item))
     return jsonify(results)
 
 @api_bp.get("/lost-items/search")
@@ -188,14 +255,12 @@ def search_lost_items():
     category = request.args.get("category")
     location = request.args.get("location")
 
-    cursor = LostItem.search(query, limit=limit)
+    cursor = LostItem.search(query, limit=limit, where=Location.filter_query(location))
     results = []
     for item in cursor:
         if category and item.get("category") != category:
             continue
-        if location and item.get("location") != location:
-            continue
-        results.append(_serialize_basic(item))
+        results.append(serialize_basic(item))
     return jsonify(results)
 
 # Match suggestions for a given lost item
@@ -216,7 +281,7 @@ def suggest_matches(current_user_id, lost_id):
             # Skip claimed items
             if item.get("status") == "claimed":
                 continue
-            suggestions.append(_serialize_basic(item))
+            suggestions.append(serialize_basic(item))
             seen.add(str(item.get("_id")))
 
     # 2) Passkey exact match
@@ -226,25 +291,27 @@ def suggest_matches(current_user_id, lost_id):
         if match and match.get("status") != "claimed":
             sid = str(match.get("_id"))
             if sid not in seen:
-                suggestions.append(_serialize_basic(match))
+                suggestions.append(serialize_basic(match))
                 seen.add(sid)
 
-    # 3) Keyword-based search using the lost item's details
-    parts = [lost.get("title", ""), lost.get("description", ""), lost.get("category", ""), lost.get("location", "")]
-    if serial and serial.strip():
-        parts.append(serial.strip())
-    combined_query = " ".join([p for p in parts if p])
-    if combined_query.strip():
-        for item in FoundItem.search(combined_query, limit=20):
-            sid = str(item.get("_id"))
-            if sid in seen:
-                continue
-            # Additional check to ensure claimed items are filtered out
-            if item.get("status") == "claimed":
-                continue
-            suggestions.append(_serialize_basic(item))
-            seen.add(sid)
+    # 3) Keyword-based search, narrowed by the match planner
+    plan = plan_match_query(
+        lost,
+        max_terms=current_app.config["MATCH_MAX_TERMS"],
+        date_tolerance_days=current_app.config["MATCH_DATE_TOLERANCE_DAYS"],
+        location=Location.filter_query(request.args.get("location")),
+    )
+    cursor = FoundItem.find_match_candidates(plan, limit=20)
+    explain = summarize_explain(cursor.explain()) if request.args.get("explain") == "1" else None
+    for item in cursor:
+        sid = str(item.get("_id"))
+        if sid in seen:
+            continue
+        suggestions.append(serialize_basic(item))
+        seen.add(sid)
 
+    if explain is not None:
+        return jsonify({"matches": suggestions, "plan": {**plan.to_dict(), "mongo": explain}})
     return jsonify(suggestions)
 
 # Create a claim manually from a suggested match
@@ -257,16 +324,15 @@ def create_claim(current_user_id):
     if not lost_item_id or not found_item_id:
         return jsonify({"message": "lost_item_id and found_item_id are required"}), 400
 
-    # Check if user has already claimed this found item
-    existing_claim = Claim.find_existing_claim(found_item_id, current_user_id)
-    if existing_claim:
+    claim_id, created = Claim.create(lost_item_id=lost_item_id, found_item_id=found_item_id, student_id=current_user_id)
+    # The user has already claimed this found item
+    if not created:
         return jsonify({
             "message": "You have already claimed this item",
-            "existing_claim_id": str(existing_claim["_id"])
+            "existing_claim_id": str(claim_id)
         }), 409  # 409 Conflict
 
-    ins = Claim.create(lost_item_id=lost_item_id, found_item_id=found_item_id, student_id=current_user_id)
-    return jsonify({"message": "Claim created", "claim_id": str(ins.inserted_id)}), 201
+    return jsonify({"message": "Claim created", "claim_id": str(claim_id)}), 201
 
 # Admin endpoints
 @api_bp.get("/admin/claims")
@@ -274,28 +340,20 @@ def create_claim(current_user_id):
 def admin_get_claims(current_user_id):
     """Get all claims for admin review"""
     claims = Claim.find_all(limit=100)
-    results = []
-    for claim in claims:
-        # Get item details
-        lost_item = LostItem.find_by_id(str(claim.get("lost_item_id"))) if claim.get("lost_item_id") else None
-        found_item = FoundItem.find_by_id(str(claim.get("found_item_id"))) if claim.get("found_item_id") else None
-        student = Student.find_by_id(str(claim.get("student_id"))) if claim.get("student_id") else None
-        
-        results.append({
-            "id": str(claim.get("_id")),
-            "lost_item_id": str(claim.get("lost_item_id")),
-            "lost_item_title": lost_item.get("title") if lost_item else "Unknown",
-            "lost_item_category": lost_item.get("category") if lost_item else "Unknown",
-            "found_item_id": str(claim.get("found_item_id")),
-            "found_item_title": found_item.get("title") if found_item else "Unknown",
-            "found_item_category": found_item.get("category") if found_item else "Unknown",
-            "student_id": str(claim.get("student_id")),
-            "student_name": student.get("name") if student else "Unknown",
-            "status": claim.get("status"),
-            "created_at": claim.get("created_at").isoformat() if claim.get("created_at") else None,
-            "updated_at": claim.get("updated_at").isoformat() if claim.get("updated_at") else None,
-        })
-    return jsonify(results)
+    # Queue every reference first so each collection is read with one query
+    rows = [
+        (
+            claim,
+            LostItem.load(claim.get("lost_item_id"), include_archived=True),
+            FoundItem.load(claim.get("found_item_id"), include_archived=True),
+            Student.load(claim.get("student_id")),
+        )
+        for claim in claims
+    ]
+    return jsonify([
+        serialize_admin_claim(claim, lost_item.get(), found_item.get(), student.get())
+        for claim, lost_item, found_item, student in rows
+    ])
 
 @api_bp.post("/admin/claims/<claim_id>/approve")
 @admin_required
@@ -369,6 +427,14 @@ def create_retrieval(current_user_id):
         "retrieval_id": str(retrieval.inserted_id)
     }), 201
 
+def _claim_items(claim):
+    """Queue the lost and found item of ``claim`` (which may be ``None``) for batched loading."""
+    claim = claim or {}
+    return (
+        LostItem.load(claim.get("lost_item_id"), include_archived=True),
+        FoundItem.load(claim.get("found_item_id"), include_archived=True),
+    )
+
 @api_bp.get("/admin/retrievals")
 @admin_required
 def get_retrievals(current_user_id):
@@ -376,37 +442,17 @@ def get_retrievals(current_user_id):
     limit = int(request.args.get("limit", 100))
     retrievals = Retrieval.find_all(limit=limit)
     
-    results = []
-    for retrieval in retrievals:
-        # Get claim details
-        claim = Claim.find_by_id(str(retrieval["claim_id"]))
-        student = Student.find_by_id(str(retrieval["student_id"]))
-        admin = Student.find_by_id(str(retrieval["admin_id"]))
-        
-        # Get item details from claim
-        lost_item = None
-        found_item = None
-        if claim:
-            lost_item = LostItem.find_by_id(str(claim.get("lost_item_id"))) if claim.get("lost_item_id") else None
-            found_item = FoundItem.find_by_id(str(claim.get("found_item_id"))) if claim.get("found_item_id") else None
-        
-        results.append({
-            "id": str(retrieval["_id"]),
-            "claim_id": str(retrieval["claim_id"]),
-            "student_id": str(retrieval["student_id"]),
-            "student_name": student.get("name") if student else "Unknown",
-            "student_email": student.get("email") if student else "Unknown",
-            "admin_id": str(retrieval["admin_id"]),
-            "admin_name": admin.get("name") if admin else "Unknown",
-            "item_title": lost_item.get("title") if lost_item else (found_item.get("title") if found_item else "Unknown"),
-            "item_category": lost_item.get("category") if lost_item else (found_item.get("category") if found_item else "Unknown"),
-            "retrieval_location": retrieval.get("retrieval_location"),
-            "notes": retrieval.get("notes"),
-            "retrieval_date": retrieval.get("retrieval_date").isoformat() if retrieval.get("retrieval_date") else None,
-            "created_at": retrieval.get("created_at").isoformat() if retrieval.get("created_at") else None
-        })
-    
-    return jsonify(results)
+    rows = [
+        (retrieval, Claim.load(retrieval["claim_id"]), Student.load(retrieval["student_id"]),
+         Student.load(retrieval["admin_id"]))
+        for retrieval in retrievals
+    ]
+    # Item details come from the claims, one level further down
+    items = [_claim_items(claim.get()) for _, claim, _, _ in rows]
+    return jsonify([
+        serialize_admin_retrieval(retrieval, student.get(), admin.get(), lost_item.get(), found_item.get())
+        for (retrieval, _, student, admin), (lost_item, found_item) in zip(rows, items)
+    ])
 
 @api_bp.get("/retrievals/my")
 @token_required
@@ -414,30 +460,12 @@ def get_my_retrievals(current_user_id):
     """Get retrieval records for current user"""
     retrievals = Retrieval.find_by_student(current_user_id)
     
-    results = []
-    for retrieval in retrievals:
-        admin = Student.find_by_id(str(retrieval["admin_id"]))
-        
-        # Get item details from claim
-        claim = Claim.find_by_id(str(retrieval["claim_id"]))
-        lost_item = None
-        found_item = None
-        if claim:
-            lost_item = LostItem.find_by_id(str(claim.get("lost_item_id"))) if claim.get("lost_item_id") else None
-            found_item = FoundItem.find_by_id(str(claim.get("found_item_id"))) if claim.get("found_item_id") else None
-        
-        results.append({
-            "id": str(retrieval["_id"]),
-            "claim_id": str(retrieval["claim_id"]),
-            "admin_name": admin.get("name") if admin else "Unknown",
-            "item_title": lost_item.get("title") if lost_item else (found_item.get("title") if found_item else "Unknown"),
-            "item_category": lost_item.get("category") if lost_item else (found_item.get("category") if found_item else "Unknown"),
-            "retrieval_location": retrieval.get("retrieval_location"),
-            "notes": retrieval.get("notes"),
-            "retrieval_date": retrieval.get("retrieval_date").isoformat() if retrieval.get("retrieval_date") else None
-        })
-    
-    return jsonify(results)
+    rows = [(retrieval, Claim.load(retrieval["claim_id"]), Student.load(retrieval["admin_id"])) for retrieval in retrievals]
+    items = [_claim_items(claim.get()) for _, claim, _ in rows]
+    return jsonify([
+        serialize_own_retrieval(retrieval, admin.get(), lost_item.get(), found_item.get())
+        for (retrieval, _, admin), (lost_item, found_item) in zip(rows, items)
+    ])
 
 @api_bp.patch("/admin/retrievals/<retrieval_id>")
 @admin_required
@@ -452,22 +480,130 @@ def update_retrieval(current_user_id, retrieval_id):
     Retrieval.update_notes(retrieval_id, notes)
     return jsonify({"message": "Retrieval notes updated successfully"})
 
+# Admin statistics
+_stats_reconcile_lock = threading.Lock()
+_stats_reconciling = set()
+
+def _reconcile_stats_in_background():
+    """Recompute the counters off the request path; at most one run per campus and process."""
+    campus = current_campus()
+    with _stats_reconcile_lock:
+        if campus in _stats_reconciling:
+            return
+        _stats_reconciling.add(campus)
+    app = current_app._get_current_object()
+
+    def run():
+        try:
+            with app.app_context(), campus_context(campus):
+                Stats.reconcile()
+        except Exception as exc:  # pragma: no cover
+            app.logger.warning(f"Stats reconciliation failed: {exc}")
+        finally:
+            with _stats_reconcile_lock:
+                _stats_reconciling.discard(campus)
+
+    threading.Thread(target=run, name="stats-reconcile", daemon=True).start()
+
+@api_bp.get("/admin/stats")
+@admin_required
+def admin_get_stats(current_user_id):
+    """Counts by status/category/location plus match and retrieval rates"""
+    counters = Stats.get()
+    if counters is None or "reconciled_at" not in counters:
+        counters = Stats.reconcile()
+    else:
+        age = (datetime.utcnow() - counters["reconciled_at"]).total_seconds()
+        if age > current_app.config["STATS_RECONCILE_SECONDS"]:
+            _reconcile_stats_in_background()
+
+    return jsonify(serialize_stats(counters, Stats.BREAKDOWNS))
+
+@api_bp.get("/admin/metrics")
+@admin_required
+def admin_get_metrics(current_user_id):
+    """Overload counters of the worker that serves the request (they are per process)"""
+    return jsonify({
+        "pid": os.getpid(),
+        "admission_rejections": current_app.extensions["admission"].rejected,
+        "deadline_expirations": dict(current_app.extensions["deadlines"].expired),
+    })
+
+# Batch match reconciliation
+@api_bp.post("/admin/matches/reconcile")
+@admin_required
+def admin_reconcile_matches(current_user_id):
+    """Start a batch match run in the background; poll the returned run for its result"""
+    run_id = MatchRun.create(triggered_by=current_user_id).inserted_id
+    app = current_app._get_current_object()
+    config = app.config
+    campus = current_campus()
+
+    def run():
+        with app.app_context(), campus_context(campus):
+            try:
+                result = reconcile_matches(
+                    top_k=config["MATCH_TOP_K"],
+                    block_size=config["MATCH_BLOCK_SIZE"],
+                    date_tolerance_days=config["MATCH_DATE_TOLERANCE_DAYS"],
+                    run_id=run_id,
+                )
+                MatchRun.finish(run_id, result=result)
+            except Exception as exc:  # pragma: no cover
+                app.logger.exception("Match reconciliation failed")
+                MatchRun.finish(run_id, error=str(exc))
+
+    threading.Thread(target=run, name="match-reconcile", daemon=True).start()
+    return jsonify({"message": "Match reconciliation started", "run_id": str(run_id)}), 202
+
+@api_bp.get("/admin/matches/runs/<run_id>")
+@admin_required
+def admin_get_match_run(current_user_id, run_id):
+    """Get the status and result of a batch match run"""
+    run = MatchRun.find_by_id(run_id)
+    if not run:
+        return jsonify({"message": "Match run not found"}), 404
+    return jsonify(serialize_match_run(run))
+
+# Request profiles (see utils.profiling)
+@api_bp.get("/admin/profiles")
+@admin_required
+def admin_list_profiles(current_user_id):
+    """List the most recent request profiles"""
+    limit = min(int(request.args.get("limit", 50)), 200)
+    return jsonify([serialize_profile(profile) for profile in RequestProfile.find_recent(limit=limit)])
+
+@api_bp.get("/admin/profiles/<profile_id>")
+@admin_required
+def admin_get_profile(current_user_id, profile_id):
+    """Get a request profile: JSON summary, or the raw profile with format=pstats|collapsed"""
+    profile = RequestProfile.find_by_id(profile_id)
+    if not profile:
+        return jsonify({"message": "Profile not found"}), 404
+
+    fmt = request.args.get("format", "json")
+    if fmt == "json":
+        return jsonify(serialize_profile(profile, top_functions(profile)))
+    if fmt == "pstats" and profile.get("pstats"):
+        return Response(profile["pstats"], mimetype="application/octet-stream", headers={
+            "Content-Disposition": f"attachment; filename=profile-{profile_id}.prof"
+        })
+    if fmt == "collapsed" and profile.get("collapsed") is not None:
+        return Response(profile["collapsed"], mimetype="text/plain", headers={
+            "Content-Disposition": f"attachment; filename=profile-{profile_id}.folded"
+        })
+    return jsonify({"message": f"Profile has no '{fmt}' data (recorded in {profile.get('mode')} mode)"}), 404
+
 # User Management endpoints
 @api_bp.get("/admin/users")
 @admin_required
 def get_all_users(current_user_id):
     """Get all users for admin"""
     try:
-        users = list(mongo.db.students.find().sort("created_at", -1))
+        users = list(Student.find_all())
         results = []
         for user in users:
-            results.append({
-                "id": str(user["_id"]),
-                "name": user.get("name"),
-                "email": user.get("email"),
-                "role": user.get("role", "student"),
-                "created_at": user.get("created_at").isoformat() if user.get("created_at") else None
-            })
+            results.append(serialize_user(user))
         return jsonify(results)
     except Exception as e:
         return jsonify({"message": str(e)}), 500
@@ -482,10 +618,7 @@ def update_user_role(current_user_id, user_id):
     if role not in ["student", "admin"]:
         return jsonify({"message": "Invalid role. Must be 'student' or 'admin'"}), 400
     
-    mongo.db.students.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"role": role}}
-    )
+    Student.update_role(user_id, role)
     return jsonify({"message": "User role updated successfully"})
 
 @api_bp.delete("/admin/users/<user_id>")
@@ -495,71 +628,42 @@ def delete_user(current_user_id, user_id):
     if user_id == current_user_id:
         return jsonify({"message": "Cannot delete your own account"}), 400
     
-    mongo.db.students.delete_one({"_id": ObjectId(user_id)})
+    Student.delete(user_id)
     return jsonify({"message": "User deleted successfully"})
 
 # Item Management endpoints
 @api_bp.get("/admin/lost-items")
 @admin_required
 def get_all_lost_items(current_user_id):
-    """Get all lost items for admin"""
+    """Get all lost items for admin (pass archived=1 to list the archive)"""
     limit = int(request.args.get("limit", 100))
-    items = LostItem.find_all(limit=limit) if hasattr(LostItem, 'find_all') else mongo.db.lost_items.find().sort("created_at", -1).limit(limit)
+    archived = request.args.get("archived") == "1"
+    items = LostItem.find_all(limit=limit, archived=archived)
     
-    results = []
-    for item in items:
-        student = Student.find_by_id(str(item["student_id"]))
-        results.append({
-            "id": str(item["_id"]),
-            "title": item.get("title"),
-            "description": item.get("description"),
-            "category": item.get("category"),
-            "location": item.get("location"),
-            "status": item.get("status"),
-            "passkey": item.get("passkey"),
-            "serial_number": item.get("serial_number"),
-            "student_name": student.get("name") if student else "Unknown",
-            "student_email": student.get("email") if student else "Unknown",
-            "date_lost": item.get("date_lost").isoformat() if item.get("date_lost") else None,
-            "created_at": item.get("created_at").isoformat() if item.get("created_at") else None
-        })
-    return jsonify(results)
+    rows = [(item, Student.load(item["student_id"])) for item in items]
+    return jsonify([serialize_admin_lost_item(item, student.get()) for item, student in rows])
 
 @api_bp.get("/admin/found-items")
 @admin_required
 def get_all_found_items(current_user_id):
-    """Get all found items for admin"""
+    """Get all found items for admin (pass archived=1 to list the archive)"""
     limit = int(request.args.get("limit", 100))
-    items = mongo.db.found_items.find().sort("created_at", -1).limit(limit)
+    archived = request.args.get("archived") == "1"
+    items = FoundItem.find_all(limit=limit, archived=archived)
     
-    results = []
-    for item in items:
-        finder = Student.find_by_id(str(item["finder_id"]))
-        results.append({
-            "id": str(item["_id"]),
-            "title": item.get("title"),
-            "description": item.get("description"),
-            "category": item.get("category"),
-            "location": item.get("location"),
-            "status": item.get("status"),
-            "passkey": item.get("passkey"),
-            "serial_number": item.get("serial_number"),
-            "finder_name": finder.get("name") if finder else "Unknown",
-            "finder_email": finder.get("email") if finder else "Unknown",
-            "created_at": item.get("created_at").isoformat() if item.get("created_at") else None
-        })
-    return jsonify(results)
+    rows = [(item, Student.load(item["finder_id"])) for item in items]
+    return jsonify([serialize_admin_found_item(item, finder.get()) for item, finder in rows])
 
 @api_bp.delete("/admin/lost-items/<item_id>")
 @admin_required
 def delete_lost_item(current_user_id, item_id):
     """Delete a lost item"""
-    mongo.db.lost_items.delete_one({"_id": ObjectId(item_id)})
+    LostItem.delete(item_id)
     return jsonify({"message": "Lost item deleted successfully"})
 
 @api_bp.delete("/admin/found-items/<item_id>")
 @admin_required
 def delete_found_item(current_user_id, item_id):
     """Delete a found item"""
-    mongo.db.found_items.delete_one({"_id": ObjectId(item_id)})
+    FoundItem.delete(item_id)
     return jsonify({"message": "Found item deleted successfully"})
@@ -0,0 +1,227 @@
+"""Response shapes shared by the Flask blueprint and the ASGI app (backend.aio).
+
+Both APIs build their JSON with these functions so they stay interchangeable.
+"""
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def serialize_basic(item):
+    return {
+        "id": str(item.get("_id")),
+        "title": item.get("title"),
+        "description": item.get("description"),
+        "category": item.get("category"),
+        "location": item.get("location"),
+        "location_id": item.get("location_id"),
+        "status": item.get("status"),
+        "passkey": item.get("passkey"),
+        "serial_number": item.get("serial_number"),
+        "created_at": _iso(item.get("created_at")),
+    }
+
+
+def serialize_own_lost_item(item):
+    return {
+        "id": str(item["_id"]),
+        "title": item["title"],
+        "description": item["description"],
+        "category": item["category"],
+        "location": item["location"],
+        "date_lost": _iso(item.get("date_lost")),
+        "serial_number": item.get("serial_number"),
+        "status": item["status"],
+        "passkey": item["passkey"]
+    }
+
+
+def serialize_found_item(item):
+    return {
+        "id": str(item["_id"]),
+        "title": item["title"],
+        "description": item["description"],
+        "category": item["category"],
+        "location": item["location"],
+        "date_found": item.get("date_found"),
+        "status": item.get("status", "unclaimed"),
+        "passkey": item["passkey"]
+    }
+
+
+def serialize_facets(result, facets):
+    return {
+        facet: [{"value": b["_id"], "count": b["count"]} for b in result.get(facet, [])]
+        for facet in facets
+    }
+
+
+def serialize_admin_claim(claim, lost_item, found_item, student):
+    return {
+        "id": str(claim.get("_id")),
+        "lost_item_id": str(claim.get("lost_item_id")),
+        "lost_item_title": lost_item.get("title") if lost_item else "Unknown",
+        "lost_item_category": lost_item.get("category") if lost_item else "Unknown",
+        "found_item_id": str(claim.get("found_item_id")),
+        "found_item_title": found_item.get("title") if found_item else "Unknown",
+        "found_item_category": found_item.get("category") if found_item else "Unknown",
+        "student_id": str(claim.get("student_id")),
+        "student_name": student.get("name") if student else "Unknown",
+        "status": claim.get("status"),
+        "created_at": _iso(claim.get("created_at")),
+        "updated_at": _iso(claim.get("updated_at")),
+    }
+
+
+def _retrieved_item(lost_item, found_item, field):
+    if lost_item:
+        return lost_item.get(field)
+    return found_item.get(field) if found_item else "Unknown"
+
+
+def serialize_admin_retrieval(retrieval, student, admin, lost_item, found_item):
+    return {
+        "id": str(retrieval["_id"]),
+        "claim_id": str(retrieval["claim_id"]),
+        "student_id": str(retrieval["student_id"]),
+        "student_name": student.get("name") if student else "Unknown",
+        "student_email": student.get("email") if student else "Unknown",
+        "admin_id": str(retrieval["admin_id"]),
+        "admin_name": admin.get("name") if admin else "Unknown",
+        "item_title": _retrieved_item(lost_item, found_item, "title"),
+        "item_category": _retrieved_item(lost_item, found_item, "category"),
+        "retrieval_location": retrieval.get("retrieval_location"),
+        "notes": retrieval.get("notes"),
+        "retrieval_date": _iso(retrieval.get("retrieval_date")),
+        "created_at": _iso(retrieval.get("created_at"))
+    }
+
+
+def serialize_own_retrieval(retrieval, admin, lost_item, found_item):
+    return {
+        "id": str(retrieval["_id"]),
+        "claim_id": str(retrieval["claim_id"]),
+        "admin_name": admin.get("name") if admin else "Unknown",
+        "item_title": _retrieved_item(lost_item, found_item, "title"),
+        "item_category": _retrieved_item(lost_item, found_item, "category"),
+        "retrieval_location": retrieval.get("retrieval_location"),
+        "notes": retrieval.get("notes"),
+        "retrieval_date": _iso(retrieval.get("retrieval_date"))
+    }
+
+
+def serialize_user(user):
+    return {
+        "id": str(user["_id"]),
+        "name": user.get("name"),
+        "email": user.get("email"),
+        "role": user.get("role", "student"),
+        "created_at": _iso(user.get("created_at"))
+    }
+
+
+def serialize_admin_lost_item(item, student):
+    return {
+        "id": str(item["_id"]),
+        "title": item.get("title"),
+        "description": item.get("description"),
+        "category": item.get("category"),
+        "location": item.get("location"),
+        "status": item.get("status"),
+        "passkey": item.get("passkey"),
+        "serial_number": item.get("serial_number"),
+        "student_name": student.get("name") if student else "Unknown",
+        "student_email": student.get("email") if student else "Unknown",
+        "date_lost": _iso(item.get("date_lost")),
+        "created_at": _iso(item.get("created_at"))
+    }
+
+
+def serialize_admin_found_item(item, finder):
+    return {
+        "id": str(item["_id"]),
+        "title": item.get("title"),
+        "description": item.get("description"),
+        "category": item.get("category"),
+        "location": item.get("location"),
+        "status": item.get("status"),
+        "passkey": item.get("passkey"),
+        "serial_number": item.get("serial_number"),
+        "finder_name": finder.get("name") if finder else "Unknown",
+        "finder_email": finder.get("email") if finder else "Unknown",
+        "created_at": _iso(item.get("created_at"))
+    }
+
+
+def serialize_location(location):
+    return {
+        "id": location["location_id"],
+        "name": location.get("name"),
+        "kind": location.get("kind"),
+        "parent": location.get("parent"),
+    }
+
+
+def serialize_match_run(run):
+    return {
+        "id": str(run["_id"]),
+        "status": run.get("status"),
+        "result": run.get("result"),
+        "error": run.get("error"),
+        "started_at": _iso(run.get("started_at")),
+        "finished_at": _iso(run.get("finished_at")),
+    }
+
+
+def _rate(numerator: int, denominator: int):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def serialize_stats(counters, breakdowns):
+    """Admin statistics: counts by status/category/location plus match and retrieval rates."""
+    sections = {}
+    for collection, fields in breakdowns.items():
+        section = counters.get(collection, {})
+        sections[collection] = {"total": section.get("total", 0)}
+        for facet in fields:
+            # Reconciliation leaves emptied buckets at 0 instead of removing them
+            sections[collection][facet] = {key: n for key, n in section.get(facet, {}).items() if n}
+
+    lost_status = sections["lost_items"]["status"]
+    found_status = sections["found_items"]["status"]
+    claim_status = sections["claims"]["status"]
+    approved_claims = claim_status.get("approved", 0) + claim_status.get("retrieved", 0)
+
+    return {
+        **sections,
+        "rates": {
+            "match_rate": _rate(lost_status.get("found", 0), sections["lost_items"]["total"]),
+            "claim_rate": _rate(found_status.get("claimed", 0), sections["found_items"]["total"]),
+            "retrieval_rate": _rate(claim_status.get("retrieved", 0), approved_claims),
+        },
+        "reconciled_at": counters["reconciled_at"].isoformat(),
+    }
+
+
+def serialize_profile(profile, top_functions=None):
+    """A request profile without its raw data; ``top_functions`` and the Mongo commands come with the detail view."""
+    result = {
+        "id": str(profile["_id"]),
+        "method": profile.get("method"),
+        "path": profile.get("path"),
+        "endpoint": profile.get("endpoint"),
+        "status": profile.get("status"),
+        "trigger": profile.get("trigger"),
+        "mode": profile.get("mode"),
+        "started_at": _iso(profile.get("started_at")),
+        "duration_ms": profile.get("duration_ms"),
+        "mongo_summary": profile.get("mongo", {}).get("summary", {}),
+        "formats": ["pstats"] if profile.get("mode") == "cprofile" else ["collapsed"],
+    }
+    if profile.get("error"):
+        result["error"] = profile["error"]
+    if top_functions is not None:
+        result["mongo_commands"] = profile.get("mongo", {}).get("commands", [])
+        result["top_functions"] = top_functions
+    return result
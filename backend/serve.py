@@ -0,0 +1,126 @@
+"""Production entry point: run the app under Gunicorn with multiple workers.
+
+Usage:
+    python -m backend.serve --workers 4 --threads 8 --timeout 30
+
+Every option can also be set through the environment (see ``_env_defaults``).
+The app is built once in the master (``preload_app``) so workers fork with the
+code already imported; each worker then opens its own MongoDB connection pool.
+With ``STORAGE_ENGINE=memory`` the data lives in the process, so only a single
+worker is allowed (use ``--threads`` for concurrency); the worker, not the
+master, writes the snapshots. Under thread-per-request workers (``gthread``,
+``sync``) ``/api/events`` answers ``503``: serve it from the async app.
+``SIGHUP`` replaces the workers but, since they fork from the preloaded master,
+not the code; send ``SIGUSR2`` to start a new master from the new code, then
+``SIGWINCH`` and ``SIGQUIT`` to retire the old one.
+"""
+import argparse
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from backend import create_app, init_mongo, mongo
+
+# Worker classes that wait on open connections without holding a thread each
+ASYNC_WORKERS = ("gevent", "eventlet")
+
+
+def _env_defaults() -> dict:
+    return {
+        "bind": f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}",
+        "workers": int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)),
+        "threads": int(os.getenv("WEB_THREADS", 4)),
+        "worker_class": os.getenv("WEB_WORKER_CLASS", "gthread"),
+        "timeout": int(os.getenv("WEB_TIMEOUT", 30)),
+        "graceful_timeout": int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30)),
+        "keepalive": int(os.getenv("WEB_KEEPALIVE", 5)),
+        "max_requests": int(os.getenv("WEB_MAX_REQUESTS", 0)),
+        "max_requests_jitter": int(os.getenv("WEB_MAX_REQUESTS_JITTER", 0)),
+    }
+
+
+def worker_exit(server, worker):
+    """Write the memory engine's final snapshot before the worker goes away."""
+    app = worker.app.application
+    if app is not None and app.config["STORAGE_ENGINE"] == "memory":
+        app.extensions["storage"].snapshot()
+
+
+def post_fork(server, worker):
+    """Give every worker a fresh MongoClient, or the memory engine's snapshots.
+
+    PyMongo clients are not fork-safe: sockets and monitor threads created in the
+    master must not be shared with children. ``create_app`` already ran in the
+    master (and touched the pool while ensuring indexes), so rebuild the client
+    here before the worker serves its first request.
+    """
+    app = worker.app.application
+    if app.config["STORAGE_ENGINE"] != "mongo":
+        # A worker replacing one that exited continues from that worker's final snapshot
+        app.extensions["storage"].reload()
+        app.extensions["storage"].start()
+        server.log.info("Worker %s writes the memory engine snapshots", worker.pid)
+        return
+    init_mongo(app)
+    server.log.info("Worker %s opened its own MongoDB pool", worker.pid)
+
+
+class StandaloneApplication(BaseApplication):
+    """Minimal Gunicorn application wrapping the Flask app factory."""
+
+    def __init__(self, options: dict | None = None):
+        self.options = options or {}
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+        self.cfg.set("preload_app", True)
+        self.cfg.set("post_fork", post_fork)
+        self.cfg.set("worker_exit", worker_exit)
+
+    def load(self):
+        if self.application is None:
+            self.application = create_app()
+            if self.cfg.worker_class_str not in ASYNC_WORKERS:
+                # An open SSE stream would pin one of the worker's few threads for hours
+                self.application.config["EVENTS_STREAM"] = False
+            if self.application.config["STORAGE_ENGINE"] == "mongo":
+                # Drop the master's pooled connections so no socket is inherited by workers
+                mongo.cx.close()
+            elif self.cfg.workers > 1:
+                raise SystemExit("STORAGE_ENGINE=memory keeps data in one process; run with --workers 1")
+            else:
+                # The worker owns the data from the fork on (it reloads the snapshot written here)
+                self.application.extensions["storage"].stop()
+        return self.application
+
+
+def main(argv: list[str] | None = None) -> None:
+    defaults = _env_defaults()
+    parser = argparse.ArgumentParser(description="Run the Lost & Found API with Gunicorn")
+    parser.add_argument("--bind", default=defaults["bind"], help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=defaults["workers"], help="number of worker processes")
+    parser.add_argument("--threads", type=int, default=defaults["threads"], help="threads per worker (gthread)")
+    parser.add_argument("--worker-class", dest="worker_class", default=defaults["worker_class"],
+                        help="gunicorn worker class, e.g. gthread or gevent")
+    parser.add_argument("--timeout", type=int, default=defaults["timeout"],
+                        help="seconds a request may run before its worker is restarted")
+    parser.add_argument("--graceful-timeout", dest="graceful_timeout", type=int,
+                        default=defaults["graceful_timeout"],
+                        help="seconds workers get to finish in-flight requests on reload/shutdown")
+    parser.add_argument("--keepalive", type=int, default=defaults["keepalive"])
+    parser.add_argument("--max-requests", dest="max_requests", type=int, default=defaults["max_requests"],
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", dest="max_requests_jitter", type=int,
+                        default=defaults["max_requests_jitter"])
+    args = parser.parse_args(argv)
+
+    StandaloneApplication(vars(args)).run()
+
+
+if __name__ == "__main__":
+    main()
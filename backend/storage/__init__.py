@@ -0,0 +1,66 @@
+"""Storage engines behind the models.
+
+The models, tenancy helpers and CLI reach data only through the collection
+API (``database()[name].find(...)`` and friends), so that API is the seam
+between them and the engine that holds the data:
+
+- ``mongo`` (default): Flask-PyMongo against ``MONGO_URI``;
+- ``memory``: :mod:`backend.storage.memory`, an indexed in-process engine
+  with optional snapshots to disk, for tests, benchmarks and single-node
+  installs with small datasets.
+
+Pick one with ``STORAGE_ENGINE`` (config or environment).
+"""
+from flask import Flask, current_app
+from pymongo.uri_parser import parse_uri
+
+from backend import init_mongo, mongo
+
+ENGINES = ("mongo", "memory")
+
+
+class MongoStorage:
+    """The Flask-PyMongo connection (``backend.mongo``)."""
+
+    name = "mongo"
+
+    @property
+    def client(self):
+        return mongo.cx
+
+    @property
+    def db(self):
+        return mongo.db
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def init_storage(app: Flask):
+    """Set up the engine selected by ``STORAGE_ENGINE`` as ``app.extensions["storage"]``."""
+    engine = app.config["STORAGE_ENGINE"]
+    if engine == "mongo":
+        init_mongo(app)
+        storage_ = MongoStorage()
+    elif engine == "memory":
+        from .memory import MemoryStorage  # noqa: WPS433
+
+        default_database = parse_uri(app.config["MONGO_URI"]).get("database") or "lostfound"
+        storage_ = MemoryStorage(
+            default_database,
+            snapshot_path=app.config["STORAGE_SNAPSHOT_PATH"],
+            snapshot_seconds=app.config["STORAGE_SNAPSHOT_SECONDS"],
+        )
+        storage_.start()
+    else:
+        raise ValueError(f"STORAGE_ENGINE must be one of {', '.join(ENGINES)}, not '{engine}'")
+    app.extensions["storage"] = storage_
+    return storage_
+
+
+def storage():
+    """The storage engine of the current app."""
+    return current_app.extensions["storage"]
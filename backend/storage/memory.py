@@ -0,0 +1,792 @@
+"""In-process storage engine with the collection API the models use.
+
+Documents live in dicts keyed by ``_id``. Every ``create_index`` builds a
+real index: compound indexes are sorted key lists (equality lookups on
+ids, passkeys or serial numbers are a bisect, ``created_at`` listings walk
+the index in order and stop at the limit) and text indexes are inverted
+token maps. Unique indexes are enforced with ``DuplicateKeyError`` just like
+on a server.
+
+Everything is guarded by one lock per client, so the engine is safe for a
+threaded server but holds data for one process only. ``MemoryStorage``
+optionally snapshots it to a BSON file and loads it back on startup.
+"""
+import atexit
+import bisect
+import os
+import re
+import threading
+
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from .query import (
+    MAX_KEY, apply_update, copy_doc, get_path, is_update, matches, normalize_sort, project,
+    run_pipeline, sort_docs, sort_key, upsert_seed,
+)
+
+# Server error code for "$changeStream is only supported on replica sets"
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def text_tokens(text) -> list[str]:
+    """Lowercase alphanumeric tokens with a trailing plural "s" dropped (a crude stand-in for stemming)."""
+    if not isinstance(text, str):
+        return []
+    return [t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+            for t in _TOKEN_RE.findall(text.lower())]
+
+
+def _id_key(value):
+    return sort_key(value)
+
+
+class _SortedIndex:
+    """A compound index kept as a sorted list of ``(key tuple, _id key, _id)``."""
+
+    def __init__(self, name: str, keys: list[tuple], unique: bool = False, partial: dict | None = None):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, _ in keys]
+        self.unique = unique
+        self.partial = partial
+        self.entries: list[tuple] = []
+
+    def covers(self, doc: dict) -> bool:
+        return self.partial is None or matches(doc, self.partial)
+
+    def keys_of(self, doc: dict) -> list[tuple]:
+        """The document's index keys: one per element of a (non-empty) array field, as a multikey index."""
+        keys = [()]
+        for field in self.fields:
+            value = get_path(doc, field)
+            values = dict.fromkeys(sort_key(v) for v in value) if isinstance(value, list) and value else [sort_key(value)]
+            keys = [key + (v,) for key in keys for v in values]
+        return keys
+
+    def add(self, doc: dict) -> None:
+        if self.covers(doc):
+            for key in self.keys_of(doc):
+                bisect.insort(self.entries, (key, _id_key(doc["_id"]), doc["_id"]))
+
+    def remove(self, doc: dict) -> None:
+        if not self.covers(doc):
+            return
+        for key in self.keys_of(doc):
+            entry = (key, _id_key(doc["_id"]))
+            i = bisect.bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i][:2] == entry:
+                del self.entries[i]
+
+    def conflict(self, doc: dict):
+        """``_id`` of another document with the same unique key, if any."""
+        if not self.unique or not self.covers(doc):
+            return None
+        for key in self.keys_of(doc):
+            i = bisect.bisect_left(self.entries, (key,))
+            while i < len(self.entries) and self.entries[i][0] == key:
+                if self.entries[i][2] != doc["_id"]:
+                    return self.entries[i][2]
+                i += 1
+        return None
+
+    def scan(self, prefix: tuple, low=None, high=None, reverse: bool = False):
+        """``_id``s whose key starts with ``prefix``, optionally bounded on the next field."""
+        start = bisect.bisect_left(self.entries, (prefix + (low,),) if low is not None else (prefix,))
+        end = bisect.bisect_left(self.entries, (prefix + (high,),) if high is not None else (prefix + (MAX_KEY,),))
+        span = range(end - 1, start - 1, -1) if reverse else range(start, end)
+        seen = set()
+        for i in span:
+            _id = self.entries[i][2]
+            # A multikey document has an entry per array element
+            if self.entries[i][1] not in seen:
+                seen.add(self.entries[i][1])
+                yield _id
+
+    def info(self) -> dict:
+        info = {"key": list(self.keys), "v": 2}
+        if self.unique:
+            info["unique"] = True
+        if self.partial is not None:
+            info["partialFilterExpression"] = self.partial
+        return info
+
+
+class _TextIndex:
+    """Inverted index: token -> {_id: weighted term count}."""
+
+    def __init__(self, name: str, keys: list[tuple], weights: dict | None, partial: dict | None,
+                 default_language: str = "english"):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, direction in keys if direction == "text"]
+        self.prefix = [field for field, direction in keys if direction != "text"]
+        self.weights = {field: (weights or {}).get(field, 1) for field in self.fields}
+        self.partial = partial
+        self.default_language = default_language
+        self.unique = False
+        self.postings: dict[str, dict] = {}
+
+    def covers(self, doc: dict) -> bool:
+        return self.partial is None or matches(doc, self.partial)
+
+    def _terms(self, doc: dict) -> dict:
+        terms: dict[str, float] = {}
+        for field, weight in self.weights.items():
+            for token in text_tokens(get_path(doc, field)):
+                terms[token] = terms.get(token, 0) + weight
+        return terms
+
+    def add(self, doc: dict) -> None:
+        if self.covers(doc):
+            for token, weight in self._terms(doc).items():
+                self.postings.setdefault(token, {})[doc["_id"]] = weight
+
+    def remove(self, doc: dict) -> None:
+        if self.covers(doc):
+            for token in self._terms(doc):
+                posting = self.postings.get(token)
+                if posting is not None:
+                    posting.pop(doc["_id"], None)
+                    if not posting:
+                        del self.postings[token]
+
+    def conflict(self, doc: dict):
+        return None
+
+    def search(self, query: str) -> dict:
+        """``{_id: score}`` of documents containing any (non-negated) term of ``query``."""
+        words = query.split()
+        excluded = {t for w in words if w.startswith("-") for t in text_tokens(w[1:])}
+        scores: dict = {}
+        for token in {t for w in words if not w.startswith("-") for t in text_tokens(w)}:
+            for _id, weight in self.postings.get(token, {}).items():
+                scores[_id] = scores.get(_id, 0.0) + weight
+        for token in excluded:
+            for _id in self.postings.get(token, {}):
+                scores.pop(_id, None)
+        return scores
+
+    def info(self) -> dict:
+        info = {"key": [("_fts", "text"), ("_ftsx", 1)], "v": 2, "weights": self.weights,
+                "default_language": self.default_language}
+        if self.partial is not None:
+            info["partialFilterExpression"] = self.partial
+        return info
+
+
+class MemoryCursor:
+    """Lazy result of ``find``; evaluated on first iteration."""
+
+    def __init__(self, collection, filter=None, projection=None, sort=None, limit: int = 0, skip: int = 0):
+        self._collection = collection
+        self._filter = filter or {}
+        self._projection = projection
+        self._sort = normalize_sort(sort)
+        self._limit = limit
+        self._skip = skip
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = [(key_or_list, direction or 1)] if isinstance(key_or_list, str) else normalize_sort(key_or_list)
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def _evaluate(self):
+        if self._results is None:
+            docs, plan = self._collection._select(self._filter, self._projection, self._sort, self._limit, self._skip)
+            self._results, self._plan = iter(docs), plan
+        return self._results
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._evaluate())
+
+    def close(self):
+        self._results = iter(())
+
+    def explain(self):
+        _, plan = self._collection._select(self._filter, self._projection, self._sort, self._limit, self._skip)
+        return {"queryPlanner": {"winningPlan": plan}, "engine": "memory"}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemoryCollection:
+    def __init__(self, database, name: str, capped_max: int | None = None):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self.capped_max = capped_max
+        self._lock = database.client.lock
+        self._docs: dict = {}
+        self._indexes: dict[str, object] = {}
+
+    # Indexes
+    def create_index(self, keys, name: str = None, unique: bool = False, partialFilterExpression: dict = None,
+                     weights: dict = None, default_language: str = "english", **options) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else [tuple(k) for k in keys]
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        with self._lock:
+            existing = self._indexes.get(name)
+            if existing is not None:
+                if list(existing.keys) != keys:
+                    raise OperationFailure(f"An existing index has the same name as the requested index: {name}",
+                                           code=86)
+                return name
+            if any(direction == "text" for _, direction in keys):
+                if any(isinstance(i, _TextIndex) for i in self._indexes.values()):
+                    raise OperationFailure("An equivalent text index already exists", code=85)
+                index = _TextIndex(name, keys, weights, partialFilterExpression, default_language)
+            else:
+                index = _SortedIndex(name, keys, unique, partialFilterExpression)
+            for doc in self._docs.values():
+                if index.conflict(doc) is not None:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {name}",
+                                            11000)
+                index.add(doc)
+            self._indexes[name] = index
+            return name
+
+    def drop_index(self, name: str) -> None:
+        with self._lock:
+            if self._indexes.pop(name, None) is None:
+                raise OperationFailure(f"index not found with name [{name}]", code=27)
+
+    def index_information(self) -> dict:
+        with self._lock:
+            info = {"_id_": {"key": [("_id", 1)], "v": 2}}
+            info.update({name: index.info() for name, index in self._indexes.items()})
+            return info
+
+    def _index_doc(self, doc: dict) -> None:
+        for index in self._indexes.values():
+            index.add(doc)
+
+    def _unindex_doc(self, doc: dict) -> None:
+        for index in self._indexes.values():
+            index.remove(doc)
+
+    def _check_unique(self, doc: dict) -> None:
+        for index in self._indexes.values():
+            other = index.conflict(doc)
+            if other is not None:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name}", 11000,
+                    {"index": index.name, "keyValue": {f: get_path(doc, f) for f in index.fields}},
+                )
+
+    # Query planning
+    def _text_index(self):
+        for index in self._indexes.values():
+            if isinstance(index, _TextIndex):
+                return index
+        raise OperationFailure("text index required for $text query", code=27)
+
+    def _candidates(self, filter: dict, sort: list) -> tuple:
+        """Pick the cheapest access path: returns (iterable of _ids or None for a full scan, sorted?, plan)."""
+        if "_id" in filter and not isinstance(filter["_id"], dict):
+            return [filter["_id"]], True, {"stage": "IDHACK"}
+        if isinstance(filter.get("_id"), dict) and set(filter["_id"]) == {"$in"}:
+            return list(dict.fromkeys(filter["_id"]["$in"])), False, {"stage": "IDHACK"}
+
+        best, best_score = None, (0, 0)
+        for index in self._indexes.values():
+            if not isinstance(index, _SortedIndex):
+                continue
+            if index.partial is not None and not all(
+                filter.get(field) == value for field, value in index.partial.items()
+            ):
+                continue
+            prefix, bounds = [], None
+            for field in index.fields:
+                cond = filter.get(field)
+                if cond is None or isinstance(cond, re.Pattern):
+                    break
+                if isinstance(cond, dict):
+                    ops = set(cond)
+                    if ops and ops <= {"$gt", "$gte", "$lt", "$lte"}:
+                        bounds = (field, cond)
+                    break
+                if isinstance(cond, list):
+                    break
+                prefix.append(sort_key(cond))
+            rest = index.fields[len(prefix):]
+            sort_fields = [field for field, _ in sort]
+            ordered = bool(sort) and rest[:len(sort)] == sort_fields and all(
+                isinstance(d, int) for _, d in sort) and len({d for _, d in sort}) == 1
+            score = (len(prefix) + (1 if bounds else 0), 1 if ordered else 0)
+            if score > best_score:
+                best, best_score = (index, tuple(prefix), bounds, ordered), score
+        if best is None:
+            return None, False, {"stage": "COLLSCAN"}
+
+        index, prefix, bounds, ordered = best
+        low = high = None
+        if bounds is not None:
+            field, cond = bounds
+            for op, value in cond.items():
+                key = sort_key(value)
+                # Bounds stay within the value's type bracket, as on the server
+                if op in ("$gte", "$gt"):
+                    low = key + (MAX_KEY,) if op == "$gt" else key
+                    high = high if high is not None else (key[0] + 0.5,)
+                else:
+                    high = key + (MAX_KEY,) if op == "$lte" else key
+                    low = low if low is not None else (key[0],)
+        reverse = ordered and sort[0][1] == -1
+        plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": index.name,
+                                                  "direction": "backward" if reverse else "forward"}}
+        return index.scan(prefix, low, high, reverse), ordered, plan
+
+    def _select(self, filter: dict, projection, sort: list, limit: int, skip: int) -> tuple:
+        with self._lock:
+            scores = None
+            if "$text" in filter:
+                text_index = self._text_index()
+                scores = text_index.search(filter["$text"]["$search"])
+                ids, ordered = list(scores), False
+                plan = {"stage": "TEXT_MATCH", "inputStage": {"stage": "IXSCAN", "indexName": text_index.name}}
+            elif sort == [("$natural", -1)]:
+                ids, ordered, plan = reversed(list(self._docs)), True, {"stage": "COLLSCAN", "direction": "backward"}
+            else:
+                ids, ordered, plan = self._candidates(filter, [s for s in sort if s[0] != "$natural"])
+                if ids is None:
+                    ids, ordered = self._docs.keys(), not sort or sort == [("$natural", 1)]
+            if sort and not ordered:
+                plan = {"stage": "SORT", "inputStage": plan}
+
+            docs = []
+            for _id in ids:
+                doc = self._docs.get(_id)
+                if doc is None or not matches(doc, filter):
+                    continue
+                docs.append(doc)
+                if ordered and limit and len(docs) >= skip + limit:
+                    break
+            if sort and not ordered:
+                docs = sort_docs(docs, sort, (lambda d: scores.get(d["_id"], 0.0)) if scores else None)
+            docs = docs[skip:skip + limit] if limit else docs[skip:]
+            return [project(doc, projection, scores.get(doc["_id"]) if scores else None) for doc in docs], plan
+
+    # Reads
+    def find(self, filter=None, projection=None, sort=None, limit: int = 0, skip: int = 0, **kwargs):
+        return MemoryCursor(self, filter, projection, sort, limit, skip)
+
+    def find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        return next(MemoryCursor(self, filter, projection, sort, limit=1), None)
+
+    def count_documents(self, filter: dict, **kwargs) -> int:
+        with self._lock:
+            ids, _, _ = self._candidates(filter, []) if "$text" not in filter else (None, False, None)
+            docs = (self._docs.get(i) for i in ids) if ids is not None else self._docs.values()
+            return sum(1 for doc in docs if doc is not None and matches(doc, filter))
+
+    def estimated_document_count(self, **kwargs) -> int:
+        return len(self._docs)
+
+    def distinct(self, key: str, filter: dict = None, **kwargs) -> list:
+        values = {}
+        for doc in self.find(filter or {}, {key: 1}):
+            value = get_path(doc, key)
+            for v in value if isinstance(value, list) else [value]:
+                values.setdefault(sort_key(v), v)
+        return list(values.values())
+
+    def aggregate(self, pipeline: list, **kwargs):
+        with self._lock:
+            scores = None
+            first = pipeline[0].get("$match", {}) if pipeline else {}
+            if "$text" in first:
+                scores = self._text_index().search(first["$text"]["$search"])
+                docs = [copy_doc(self._docs[_id]) for _id in scores if _id in self._docs]
+            else:
+                docs = [copy_doc(doc) for doc in self._docs.values()]
+
+            def resolve(name):
+                return [copy_doc(doc) for doc in self.database[name]._docs.values()]
+
+            result = run_pipeline(docs, pipeline, resolve, (lambda d: scores.get(d["_id"], 0.0)) if scores else None)
+            return iter(result)
+
+    # Writes
+    def _insert(self, doc: dict):
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.full_name} index: _id_ dup key: {{ _id: {doc['_id']!r} }}",
+                11000,
+            )
+        stored = copy_doc(doc)
+        self._check_unique(stored)
+        self._docs[stored["_id"]] = stored
+        self._index_doc(stored)
+        if self.capped_max and len(self._docs) > self.capped_max:
+            oldest = self._docs.pop(next(iter(self._docs)))
+            self._unindex_doc(oldest)
+        self.database.client.dirty = True
+        return stored["_id"]
+
+    def _replace(self, old: dict, new: dict) -> None:
+        """Swap ``old`` for ``new`` (same ``_id``), keeping indexes consistent."""
+        self._unindex_doc(old)
+        try:
+            self._check_unique(new)
+        except DuplicateKeyError:
+            self._index_doc(old)
+            raise
+        self._docs[new["_id"]] = new
+        self._index_doc(new)
+        self.database.client.dirty = True
+
+    def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        with self._lock:
+            return InsertOneResult(self._insert(document), True)
+
+    def insert_many(self, documents, ordered: bool = True, **kwargs) -> InsertManyResult:
+        ids, errors = [], []
+        with self._lock:
+            for i, document in enumerate(documents):
+                try:
+                    ids.append(self._insert(document))
+                except DuplicateKeyError as exc:
+                    errors.append({"index": i, "code": 11000, "errmsg": str(exc), "op": document})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids), "writeConcernErrors": [],
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return InsertManyResult(ids, True)
+
+    def _update(self, filter: dict, update: dict, upsert: bool, multi: bool, replace: bool = False) -> dict:
+        if replace and is_update(update):
+            raise ValueError("replacement can not include $ operators")
+        if not replace and not is_update(update):
+            raise ValueError("update only works with $ operators")
+        matched = modified = 0
+        targets = list(self._select(filter, None, [], 0 if multi else 1, 0)[0])
+        for current in targets:
+            old = self._docs[current["_id"]]
+            if replace:
+                new = {**copy_doc(update), "_id": old["_id"]}
+            else:
+                new = copy_doc(old)
+                apply_update(new, update)
+            matched += 1
+            if new != old:
+                self._replace(old, new)
+                modified += 1
+        result = {"n": matched, "nModified": modified}
+        if not targets and upsert:
+            seed = upsert_seed(filter)
+            if replace:
+                doc = {**copy_doc(update), **({"_id": seed["_id"]} if "_id" in seed else {})}
+            else:
+                doc = seed
+                apply_update(doc, update, inserting=True)
+            result["upserted"] = self._insert(doc)
+            result["n"] = 1
+        return result
+
+    def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        with self._lock:
+            return UpdateResult(self._update(filter, update, upsert, multi=False), True)
+
+    def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        with self._lock:
+            return UpdateResult(self._update(filter, update, upsert, multi=True), True)
+
+    def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        with self._lock:
+            return UpdateResult(self._update(filter, replacement, upsert, multi=False, replace=True), True)
+
+    def find_one_and_update(self, filter: dict, update: dict, projection=None, sort=None, upsert: bool = False,
+                            return_document=ReturnDocument.BEFORE, **kwargs):
+        with self._lock:
+            current = next(iter(self._select(filter, None, normalize_sort(sort), 1, 0)[0]), None)
+            if current is None:
+                if not upsert:
+                    return None
+                upserted = self._update(filter, update, True, multi=False)["upserted"]
+                return project(self._docs[upserted], projection) if return_document == ReturnDocument.AFTER else None
+            self._update({"_id": current["_id"]}, update, False, multi=False)
+            doc = self._docs[current["_id"]] if return_document == ReturnDocument.AFTER else current
+            return project(doc, projection)
+
+    def _delete(self, filter: dict, multi: bool) -> int:
+        targets = self._select(filter, {"_id": 1}, [], 0 if multi else 1, 0)[0]
+        for target in targets:
+            self._unindex_doc(self._docs.pop(target["_id"]))
+        if targets:
+            self.database.client.dirty = True
+        return len(targets)
+
+    def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        with self._lock:
+            return DeleteResult({"n": self._delete(filter, multi=False)}, True)
+
+    def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        with self._lock:
+            return DeleteResult({"n": self._delete(filter, multi=True)}, True)
+
+    def bulk_write(self, requests: list, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        counts = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+                  "writeErrors": [], "writeConcernErrors": []}
+        with self._lock:
+            for i, request in enumerate(requests):
+                try:
+                    if isinstance(request, InsertOne):
+                        self._insert(request._doc)
+                        counts["nInserted"] += 1
+                    elif isinstance(request, (DeleteOne, DeleteMany)):
+                        counts["nRemoved"] += self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                    elif isinstance(request, (ReplaceOne, UpdateOne, UpdateMany)):
+                        result = self._update(request._filter, request._doc, request._upsert,
+                                              multi=isinstance(request, UpdateMany),
+                                              replace=isinstance(request, ReplaceOne))
+                        if "upserted" in result:
+                            counts["nUpserted"] += 1
+                            counts["upserted"].append({"index": i, "_id": result["upserted"]})
+                        else:
+                            counts["nMatched"] += result["n"]
+                            counts["nModified"] += result["nModified"]
+                    else:
+                        raise TypeError(f"{request!r} is not a valid request")
+                except DuplicateKeyError as exc:
+                    counts["writeErrors"].append({"index": i, "code": 11000, "errmsg": str(exc)})
+                    if ordered:
+                        break
+        if counts["writeErrors"]:
+            raise BulkWriteError(counts)
+        return BulkWriteResult(counts, True)
+
+    def drop(self) -> None:
+        self.database.drop_collection(self.name)
+
+    def watch(self, *args, **kwargs):
+        return self.database.watch(*args, **kwargs)
+
+
+class MemoryDatabase:
+    def __init__(self, client, name: str):
+        self.client = client
+        self.name = name
+        self._collections: dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self.client.lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(self, name)
+            return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    def list_collection_names(self, **kwargs) -> list[str]:
+        return list(self._collections)
+
+    def create_collection(self, name: str, capped: bool = False, max: int = None, **options) -> MemoryCollection:
+        with self.client.lock:
+            if name in self._collections:
+                raise CollectionInvalid(f"collection {name} already exists")
+            collection = self._collections[name] = MemoryCollection(self, name, capped_max=max if capped else None)
+            return collection
+
+    def drop_collection(self, name: str) -> None:
+        with self.client.lock:
+            if self._collections.pop(name, None) is not None:
+                self.client.dirty = True
+
+    def command(self, command, value=1, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"Command {name} is not supported by the memory storage engine", code=59)
+
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("The $changeStream stage is not supported by the memory storage engine",
+                               code=CHANGE_STREAMS_UNSUPPORTED)
+
+
+class MemoryClient:
+    """Stand-in for ``MongoClient``: databases created on first access."""
+
+    def __init__(self, default_database: str):
+        self.lock = threading.RLock()
+        self.default_database_name = default_database
+        self.dirty = False
+        self._databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        with self.lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = MemoryDatabase(self, name)
+            return database
+
+    def get_database(self, name: str = None, **kwargs) -> MemoryDatabase:
+        return self[name or self.default_database_name]
+
+    def get_default_database(self, **kwargs) -> MemoryDatabase:
+        return self[self.default_database_name]
+
+    @property
+    def admin(self) -> MemoryDatabase:
+        return self["admin"]
+
+    def list_database_names(self) -> list[str]:
+        return list(self._databases)
+
+    def drop_database(self, name: str) -> None:
+        with self.lock:
+            self._databases.pop(name, None)
+            self.dirty = True
+
+    def server_info(self) -> dict:
+        return {"version": "memory"}
+
+    def watch(self, *args, **kwargs):
+        return self.admin.watch()
+
+    def close(self) -> None:
+        pass
+
+    # Snapshots: a stream of BSON documents, one per collection header and one per document
+    def save(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with self.lock:
+            self._write(tmp)
+            os.replace(tmp, path)
+
+    def _write(self, tmp: str) -> None:
+        with open(tmp, "wb") as out:
+            for db_name, database in self._databases.items():
+                for name, collection in database._collections.items():
+                    indexes = [
+                        {"name": index.name, "keys": [list(k) for k in index.keys], "unique": index.unique,
+                         "partial": index.partial,
+                         "weights": getattr(index, "weights", None)}
+                        for index in collection._indexes.values()
+                    ]
+                    out.write(bson.encode({"db": db_name, "collection": name, "indexes": indexes,
+                                           "capped_max": collection.capped_max}))
+                    for doc in collection._docs.values():
+                        out.write(bson.encode({"db": db_name, "collection": name, "doc": doc}))
+        self.dirty = False
+
+    def load(self, path: str) -> None:
+        with self.lock, open(path, "rb") as snapshot:
+            for record in bson.decode_file_iter(snapshot):
+                database = self[record["db"]]
+                if "doc" in record:
+                    collection = database[record["collection"]]
+                    doc = record["doc"]
+                    collection._docs[doc["_id"]] = doc
+                    collection._index_doc(doc)
+                    continue
+                collection = database[record["collection"]]
+                collection.capped_max = record.get("capped_max")
+                for index in record["indexes"]:
+                    collection.create_index([tuple(k) for k in index["keys"]], name=index["name"],
+                                            unique=index["unique"], partialFilterExpression=index["partial"],
+                                            weights=index["weights"])
+            self.dirty = False
+
+
+class MemoryStorage:
+    """The memory engine for the app: the client plus its optional snapshot file."""
+
+    name = "memory"
+
+    def __init__(self, default_database: str, snapshot_path: str | None = None, snapshot_seconds: float = 60):
+        self.default_database = default_database
+        self.client = MemoryClient(default_database)
+        self.snapshot_path = snapshot_path
+        self.snapshot_seconds = snapshot_seconds
+        self._stop = threading.Event()
+        self._thread = None
+        # Only the process that called start() writes the snapshot
+        self._owner_pid = None
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.client.load(snapshot_path)
+
+    @property
+    def db(self) -> MemoryDatabase:
+        return self.client.get_default_database()
+
+    def start(self) -> None:
+        """Snapshot periodically and at exit from this process, when a snapshot path is configured."""
+        if not self.snapshot_path or self._owner_pid == os.getpid():
+            return
+        self._owner_pid = os.getpid()
+        self._stop = threading.Event()
+        atexit.register(self.snapshot)
+        if self.snapshot_seconds:
+            self._thread = threading.Thread(target=self._run, name="memory-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Write a last snapshot and stop snapshotting from this process.
+
+        A preforking master hands the data to its worker this way: the worker
+        reloads the file, so it must hold what the master's startup (indexes,
+        backfills) changed.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        atexit.unregister(self.snapshot)
+        self.snapshot()
+        # Handed over: nobody writes until a process calls start() again
+        self._owner_pid = 0
+
+    def reload(self) -> None:
+        """Replace the data with the snapshot file (a replacement worker picks up where the last one stopped)."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        client = MemoryClient(self.default_database)
+        client.load(self.snapshot_path)
+        self.client = client
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.snapshot_seconds):
+            if self.client.dirty:
+                self.snapshot()
+
+    def snapshot(self) -> None:
+        # A child forked from the snapshotting process holds a stale copy and must not overwrite the file
+        if self.snapshot_path and self._owner_pid in (None, os.getpid()):
+            self.client.save(self.snapshot_path)
+
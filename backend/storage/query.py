@@ -0,0 +1,353 @@
+"""MongoDB query, update, projection and aggregation semantics for the memory engine.
+
+Only the subset the models use is implemented: comparison, ``$in``/``$nin``,
+``$exists``, ``$regex``, ``$not``, ``$type``, ``$or``/``$and``/``$nor``;
+``$set``/``$unset``/``$inc``/``$setOnInsert``; and the ``$match``,
+``$addFields``, ``$sort``, ``$skip``, ``$limit``, ``$group``, ``$count``,
+``$facet`` and ``$unionWith`` pipeline stages.
+"""
+import re
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+MISSING = object()
+
+# BSON comparison order between types
+_TYPE_RANK = [
+    (type(None), 1), (bool, 8), (int, 2), (float, 2), (str, 3), (dict, 4), (list, 5),
+    (bytes, 6), (ObjectId, 7), (datetime, 9),
+]
+_TYPE_NAMES = {
+    "null": type(None), "bool": bool, "int": int, "long": int, "double": float, "string": str,
+    "object": dict, "array": list, "binData": bytes, "objectId": ObjectId, "date": datetime,
+}
+# Sorts after every encoded value (see sort_key)
+MAX_KEY = (99,)
+
+
+def type_rank(value) -> int:
+    if value is MISSING:
+        return 1
+    for kind, rank in _TYPE_RANK:
+        if isinstance(value, kind):
+            return rank
+    return 50
+
+
+def sort_key(value):
+    """A key that orders values of any type the way MongoDB does."""
+    rank = type_rank(value)
+    if value is MISSING or value is None:
+        return (rank,)
+    if rank in (4, 5, 50):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def get_path(doc, path: str):
+    """Value at a dotted ``path``, or ``MISSING``."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+
+def set_path(doc: dict, path: str, value) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            child = doc[part] = {}
+        doc = child
+    doc[parts[-1]] = value
+
+
+def unset_path(doc: dict, path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def copy_doc(value):
+    """Copy of a document's containers; leaves are immutable BSON values."""
+    if isinstance(value, dict):
+        return {k: copy_doc(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_doc(v) for v in value]
+    return value
+
+
+# Matching
+def _equal(value, expected) -> bool:
+    if expected is None:
+        return value is MISSING or value is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(_equal(v, expected) for v in value)
+    if value is MISSING:
+        return False
+    return type_rank(value) == type_rank(expected) and value == expected
+
+
+def _compare(value, bound, op) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    for v in candidates:
+        if v is MISSING or type_rank(v) != type_rank(bound):
+            continue
+        if op(sort_key(v), sort_key(bound)):
+            return True
+    return False
+
+
+def _regex(pattern, options: str = "") -> re.Pattern:
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option, flag in (("i", re.IGNORECASE), ("m", re.MULTILINE), ("s", re.DOTALL), ("x", re.VERBOSE)):
+        if option in options:
+            flags |= flag
+    return re.compile(pattern, flags)
+
+
+def _regex_match(value, pattern: re.Pattern) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    return any(isinstance(v, str) and pattern.search(v) for v in candidates)
+
+
+def _match_operators(value, cond: dict) -> bool:
+    for op, arg in cond.items():
+        if op == "$eq":
+            ok = _equal(value, arg)
+        elif op == "$ne":
+            ok = not _equal(value, arg)
+        elif op == "$gt":
+            ok = _compare(value, arg, lambda a, b: a > b)
+        elif op == "$gte":
+            ok = _compare(value, arg, lambda a, b: a >= b)
+        elif op == "$lt":
+            ok = _compare(value, arg, lambda a, b: a < b)
+        elif op == "$lte":
+            ok = _compare(value, arg, lambda a, b: a <= b)
+        elif op == "$in":
+            ok = any(_regex_match(value, c) if isinstance(c, re.Pattern) else _equal(value, c) for c in arg)
+        elif op == "$nin":
+            ok = not any(_equal(value, c) for c in arg)
+        elif op == "$exists":
+            ok = (value is not MISSING) == bool(arg)
+        elif op == "$regex":
+            ok = _regex_match(value, _regex(arg, cond.get("$options", "")))
+        elif op == "$options":
+            continue
+        elif op == "$not":
+            ok = not (_regex_match(value, arg) if isinstance(arg, re.Pattern) else _match_operators(value, arg))
+        elif op == "$type":
+            kinds = arg if isinstance(arg, list) else [arg]
+            ok = value is not MISSING and any(
+                isinstance(value, _TYPE_NAMES[k]) and not (k != "bool" and isinstance(value, bool)) for k in kinds
+            )
+        else:
+            raise OperationFailure(f"unknown operator: {op}", code=2)
+        if not ok:
+            return False
+    return True
+
+
+def _is_operator_dict(cond) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def matches(doc: dict, query: dict | None) -> bool:
+    """Whether ``doc`` satisfies ``query`` (``$text`` is resolved by the text index beforehand)."""
+    for key, cond in (query or {}).items():
+        if key == "$and":
+            ok = all(matches(doc, q) for q in cond)
+        elif key == "$or":
+            ok = any(matches(doc, q) for q in cond)
+        elif key == "$nor":
+            ok = not any(matches(doc, q) for q in cond)
+        elif key == "$text":
+            continue
+        else:
+            value = get_path(doc, key)
+            if _is_operator_dict(cond):
+                ok = _match_operators(value, cond)
+            elif isinstance(cond, re.Pattern):
+                ok = _regex_match(value, cond)
+            else:
+                ok = _equal(value, cond)
+        if not ok:
+            return False
+    return True
+
+
+# Updates
+def is_update(update: dict) -> bool:
+    return bool(update) and all(key.startswith("$") for key in update)
+
+
+def apply_update(doc: dict, update: dict, inserting: bool = False) -> None:
+    """Apply update operators to ``doc`` in place."""
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                set_path(doc, path, copy_doc(value))
+            elif op == "$setOnInsert":
+                if inserting:
+                    set_path(doc, path, copy_doc(value))
+            elif op == "$unset":
+                unset_path(doc, path)
+            elif op == "$inc":
+                current = get_path(doc, path)
+                if current is MISSING:
+                    current = 0
+                elif not isinstance(current, (int, float)):
+                    raise OperationFailure(f"Cannot apply $inc to a value of non-numeric type at '{path}'", code=14)
+                set_path(doc, path, current + value)
+            else:
+                raise OperationFailure(f"Unsupported update operator {op}", code=9)
+
+
+def upsert_seed(query: dict) -> dict:
+    """The document an upsert starts from: the query's equality conditions."""
+    seed = {}
+    for key, cond in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if _is_operator_dict(cond):
+            if "$eq" in cond:
+                set_path(seed, key, copy_doc(cond["$eq"]))
+        elif not isinstance(cond, re.Pattern):
+            set_path(seed, key, copy_doc(cond))
+    return seed
+
+
+# Projection
+def project(doc: dict, projection: dict | None, score: float | None = None) -> dict:
+    if not projection:
+        return copy_doc(doc)
+    meta = {k for k, v in projection.items() if isinstance(v, dict) and v.get("$meta") == "textScore"}
+    fields = {k: v for k, v in projection.items() if k not in meta}
+    include_id = bool(fields.pop("_id", True))
+    if fields and any(fields.values()):
+        result = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+        for path in fields:
+            value = get_path(doc, path)
+            if value is not MISSING:
+                set_path(result, path, copy_doc(value))
+    else:
+        result = copy_doc(doc)
+        for path in fields:
+            unset_path(result, path)
+        if not include_id:
+            result.pop("_id", None)
+    for name in meta:
+        result[name] = score if score is not None else 0.0
+    return result
+
+
+# Sorting
+def normalize_sort(sort) -> list[tuple]:
+    if not sort:
+        return []
+    if isinstance(sort, str):
+        return [(sort, 1)]
+    if isinstance(sort, dict):
+        return list(sort.items())
+    return [tuple(item) if not isinstance(item, str) else (item, 1) for item in sort]
+
+
+def sort_docs(docs: list, sort: list[tuple], score_of=None) -> list:
+    """Sort ``docs`` by ``sort`` (stable, one key at a time from the last)."""
+    for field, direction in reversed(sort):
+        if isinstance(direction, dict) and direction.get("$meta") == "textScore":
+            docs.sort(key=lambda d: score_of(d) if score_of else 0.0, reverse=True)
+        else:
+            docs.sort(key=lambda d: sort_key(get_path(d, field)), reverse=direction == -1)
+    return docs
+
+
+# Aggregation
+def _expression(doc: dict, expr, score_of=None):
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = get_path(doc, expr[1:])
+        return None if value is MISSING else value
+    if isinstance(expr, dict):
+        if expr.get("$meta") == "textScore":
+            return score_of(doc) if score_of else 0.0
+        return {k: _expression(doc, v, score_of) for k, v in expr.items()}
+    return expr
+
+
+_ACCUMULATORS = {
+    "$sum": (lambda: 0, lambda acc, v: acc + (v if isinstance(v, (int, float)) and not isinstance(v, bool) else 0)),
+    "$max": (lambda: None, lambda acc, v: v if acc is None or (v is not None and sort_key(v) > sort_key(acc)) else acc),
+    "$min": (lambda: None, lambda acc, v: v if acc is None or (v is not None and sort_key(v) < sort_key(acc)) else acc),
+    "$first": (lambda: MISSING, lambda acc, v: v if acc is MISSING else acc),
+    "$last": (lambda: None, lambda acc, v: v),
+    "$push": (lambda: [], lambda acc, v: acc + [v]),
+}
+
+
+def _group(docs: list, spec: dict) -> list:
+    groups: dict = {}
+    for doc in docs:
+        key = _expression(doc, spec["_id"])
+        group_key = sort_key(key)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = {"_id": key}
+            for field, acc in spec.items():
+                if field != "_id":
+                    group[field] = _ACCUMULATORS[next(iter(acc))][0]()
+        for field, acc in spec.items():
+            if field == "_id":
+                continue
+            op, arg = next(iter(acc.items()))
+            if op not in _ACCUMULATORS:
+                raise OperationFailure(f"Unsupported accumulator {op}", code=15952)
+            group[field] = _ACCUMULATORS[op][1](group[field], _expression(doc, arg))
+    return list(groups.values())
+
+
+def run_pipeline(docs: list, pipeline: list, resolve_collection, score_of=None) -> list:
+    """Evaluate ``pipeline`` over ``docs`` (copies). ``resolve_collection(name)`` serves ``$unionWith``."""
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [d for d in docs if matches(d, spec)]
+        elif name in ("$addFields", "$set"):
+            for doc in docs:
+                for field, expr in spec.items():
+                    set_path(doc, field, _expression(doc, expr, score_of))
+        elif name == "$sort":
+            docs = sort_docs(docs, normalize_sort(spec), score_of)
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$facet":
+            docs = [{
+                facet: run_pipeline([copy_doc(d) for d in docs], sub, resolve_collection, score_of)
+                for facet, sub in spec.items()
+            }]
+        elif name == "$unionWith":
+            coll, sub = (spec, []) if isinstance(spec, str) else (spec["coll"], spec.get("pipeline", []))
+            docs = docs + run_pipeline(resolve_collection(coll), sub, resolve_collection)
+        else:
+            raise OperationFailure(f"Unsupported pipeline stage {name}", code=40324)
+    return docs
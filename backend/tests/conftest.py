@@ -0,0 +1,38 @@
+"""Fixtures: Flask apps on the in-process memory engine, so the tests need no mongod."""
+import pytest
+
+from backend import create_app
+from backend.utils.tenancy import database
+
+
+@pytest.fixture
+def make_app():
+    """Factory for apps with extra config; their storage is stopped after the test."""
+    apps = []
+
+    def make(**config):
+        app = create_app({
+            "STORAGE_ENGINE": "memory",
+            "STORAGE_SNAPSHOT_PATH": None,
+            "EVENTS_BACKEND": "local",
+            "CAMPUSES": ["main", "north"],
+            **config,
+        })
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        app.extensions["storage"].stop()
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def db(app):
+    return database()
@@ -0,0 +1,94 @@
+import pytest
+
+from backend.utils import admission
+from backend.utils.admission import DEFAULT_RULES, MemoryStore, merge_rules
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(clock):
+    store = MemoryStore()
+    assert [store.take("k", rate=2, burst=3)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, retry_after = store.take("k", rate=2, burst=3)
+    assert not allowed and retry_after == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert store.take("k", rate=2, burst=3) == (True, 0.0)
+    assert not store.take("k", rate=2, burst=3)[0]
+    # Buckets are independent, and refill no further than the burst
+    assert store.take("other", rate=2, burst=3)[0]
+    clock.now += 60
+    assert [store.take("k", rate=2, burst=3)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_idle_buckets_are_pruned(clock):
+    store = MemoryStore(max_keys=2)
+    store.take("a", rate=1, burst=1)
+    clock.now += 7200
+    store.take("b", rate=1, burst=1)
+    store.take("c", rate=1, burst=1)
+    assert set(store._buckets) == {"b", "c"}
+
+
+def test_merge_rules_merges_each_endpoint():
+    rules = merge_rules({"api.login": {"rate": 1, "burst": 20}, "api.register": None, "api.custom": {"rate": 5}})
+    assert rules["api.login"] == {**DEFAULT_RULES["api.login"], "rate": 1, "burst": 20}
+    assert "api.register" not in rules
+    assert rules["api.custom"] == {"rate": 5}
+    assert DEFAULT_RULES["api.login"]["rate"] == 5
+
+
+def test_requests_over_the_rate_get_429(make_app, clock):
+    app = make_app(ADMISSION_RULES={"api.login": {"rate": 1, "burst": 2}})
+    client = app.test_client()
+    credentials = {"email": "nobody@example.com", "password": "secret"}
+    statuses = [client.post("/api/auth/login", json=credentials).status_code for _ in range(3)]
+    assert statuses == [401, 401, 429]
+    assert client.post("/api/auth/login", json=credentials).headers["Retry-After"] == "1"
+    assert app.extensions["admission"].rejected["429"] == 2
+
+    clock.now += 1
+    assert client.post("/api/auth/login", json=credentials).status_code == 401
+
+
+def test_anonymous_requests_use_the_anonymous_bucket(make_app, clock):
+    app = make_app(ADMISSION_RULES={
+        "api.search_found_items": {"rate": 1, "burst": 1, "anonymous_rate": 1, "anonymous_burst": 3},
+    })
+    client = app.test_client()
+    statuses = [client.get("/api/found-items/search?q=phone").status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_trusted_proxy_buckets_by_forwarded_address(make_app, clock):
+    app = make_app(TRUSTED_PROXIES=1, ADMISSION_RULES={"api.login": {"rate": 1, "burst": 1}})
+    client = app.test_client()
+    credentials = {"email": "nobody@example.com", "password": "secret"}
+
+    def login(address):
+        return client.post("/api/auth/login", json=credentials,
+                           headers={"X-Forwarded-For": address}).status_code
+
+    assert [login("10.0.0.1"), login("10.0.0.2"), login("10.0.0.1")] == [401, 401, 429]
+
+
+def test_without_trusted_proxies_the_forwarded_address_is_ignored(make_app, clock):
+    app = make_app(ADMISSION_RULES={"api.login": {"rate": 1, "burst": 1}})
+    client = app.test_client()
+    credentials = {"email": "nobody@example.com", "password": "secret"}
+    statuses = [client.post("/api/auth/login", json=credentials, headers={"X-Forwarded-For": address}).status_code
+                for address in ("10.0.0.1", "10.0.0.2")]
+    assert statuses == [401, 429]
@@ -0,0 +1,70 @@
+import threading
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from backend.models import models
+from backend.models.models import Claim
+
+INDEX = "campus_claims_found_student_idx"
+
+
+def _ensure_claim_key_index(db):
+    models._ensure_claim_key_index(db, ("campus", ASCENDING))
+    return db.claims.index_information()[INDEX]
+
+
+def test_a_student_claims_a_found_item_once(app, db):
+    lost_id, found_id, student_id = ObjectId(), ObjectId(), ObjectId()
+    claim_id, created = Claim.create(lost_id, found_id, student_id)
+    assert created
+    assert Claim.create(lost_id, found_id, student_id) == (claim_id, False)
+    assert Claim.create(lost_id, found_id, ObjectId())[1]
+    assert db.claims.count_documents({"found_item_id": found_id}) == 2
+
+
+def test_concurrent_duplicate_claims_create_one(app, db):
+    found_id, student_id = ObjectId(), ObjectId()
+    results, barrier = [], threading.Barrier(8)
+
+    def claim():
+        with app.app_context():
+            barrier.wait()
+            results.append(Claim.create(ObjectId(), found_id, student_id))
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [created for _, created in results].count(True) == 1
+    assert len({claim_id for claim_id, _ in results}) == 1
+    assert db.claims.count_documents({"found_item_id": found_id}) == 1
+
+
+def test_claim_index_stays_non_unique_while_duplicates_exist(app, db, monkeypatch):
+    assert _ensure_claim_key_index(db).get("unique")
+    db.claims.drop_index(INDEX)
+    found_id, student_id = ObjectId(), ObjectId()
+    duplicate = {"campus": "main", "found_item_id": found_id, "student_id": student_id}
+    db.claims.insert_many([dict(duplicate), dict(duplicate)])
+
+    assert not _ensure_claim_key_index(db).get("unique")
+    # Later startups keep the degraded index instead of dropping and rebuilding it
+    drops = []
+    drop_index = type(db.claims).drop_index
+    monkeypatch.setattr(type(db.claims), "drop_index", lambda self, name: (drops.append(name), drop_index(self, name)))
+    assert not _ensure_claim_key_index(db).get("unique")
+    assert drops == []
+
+    db.claims.delete_one({"_id": db.claims.find_one(duplicate)["_id"]})
+    assert _ensure_claim_key_index(db).get("unique")
+
+
+def test_claim_index_stays_non_unique_on_a_mismatched_shard_key(app, db):
+    sharding = db.client["config"].collections
+    sharding.insert_one({"_id": f"{db.name}.claims", "key": {"campus": 1, "_id": 1}})
+    assert not _ensure_claim_key_index(db).get("unique")
+
+    sharding.replace_one({"_id": f"{db.name}.claims"}, {"key": {"campus": 1, "found_item_id": 1, "student_id": 1}})
+    assert _ensure_claim_key_index(db).get("unique")
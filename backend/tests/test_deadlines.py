@@ -0,0 +1,35 @@
+from pymongo.errors import ExecutionTimeout
+
+from backend.models.models import FoundItem
+from backend.utils.deadlines import HEADER
+
+
+def test_a_timed_out_request_gets_a_504(make_app, monkeypatch):
+    app = make_app()
+
+    def search(*args, **kwargs):
+        # The memory engine ignores pymongo.timeout; raise what mongod would
+        raise ExecutionTimeout("operation exceeded time limit", code=50)
+
+    monkeypatch.setattr(FoundItem, "search", search)
+    response = app.test_client().get("/api/found-items/search?q=umbrella", headers={HEADER: "50"})
+    assert response.status_code == 504
+    body = response.get_json()
+    assert body["message"] == "Request deadline exceeded"
+    assert body["deadline_ms"] == 50
+    assert body["elapsed_ms"] >= 0
+    assert app.extensions["deadlines"].expired == {"api.search_found_items": 1}
+
+
+def test_budgets(make_app):
+    app = make_app(REQUEST_DEADLINE_MS=1000, REQUEST_DEADLINE_MAX_MS=8000)
+    deadlines = app.extensions["deadlines"]
+    with app.test_request_context("/api/found-items/search"):
+        assert deadlines.budget_ms() == 3000
+    with app.test_request_context("/api/lost-items", headers={HEADER: "60000"}):
+        assert deadlines.budget_ms() == 8000
+    with app.test_request_context("/api/lost-items", headers={HEADER: "soon"}):
+        assert deadlines.budget_ms() == 1000
+    # The event stream stays open for as long as the client listens
+    with app.test_request_context("/api/events", headers={HEADER: "500"}):
+        assert deadlines.budget_ms() is None
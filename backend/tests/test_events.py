@@ -0,0 +1,33 @@
+from bson import ObjectId
+
+from backend.utils.auth import create_token
+from backend.utils.events import broker
+
+
+def _token(app, user_id):
+    with app.app_context():
+        return create_token(str(user_id))
+
+
+def test_stream_delivers_the_users_events(make_app):
+    app = make_app()
+    user_id = ObjectId()
+    response = app.test_client().get(f"/api/events?token={_token(app, user_id)}", buffered=False)
+    assert response.status_code == 200
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 5000\n\n"
+
+    broker.publish(str(user_id), "claim_created", {"claim_id": "c1"})
+    assert next(chunks) == b'event: claim_created\ndata: {"claim_id": "c1"}\n\n'
+    response.close()
+    assert str(user_id) not in broker._subscribers
+
+
+def test_stream_needs_a_token(make_app):
+    assert make_app().test_client().get("/api/events").status_code == 401
+
+
+def test_stream_is_refused_where_threads_are_the_worker_pool(make_app):
+    app = make_app(EVENTS_STREAM=False)
+    response = app.test_client().get(f"/api/events?token={_token(app, ObjectId())}")
+    assert response.status_code == 503
@@ -0,0 +1,48 @@
+from bson import ObjectId
+
+from backend.models.models import FoundItem
+
+ITEMS = [
+    ("Black phone", "Electronics", "Library"),
+    ("Phone charger", "Electronics", "Gym"),
+    ("Phone case", "Accessories", "Library"),
+    ("Blue phone", "Electronics", "Library"),
+]
+
+
+def _seed():
+    finder_id = str(ObjectId())
+    for title, category, location in ITEMS:
+        FoundItem.create(title, "found it", category, location, finder_id, "k")
+
+
+def _counts(bucket):
+    return {entry["_id"]: entry["count"] for entry in bucket}
+
+
+def test_facets_pipeline_skips_each_facets_own_filter():
+    pipeline = FoundItem.facets_pipeline(
+        {"status": "unclaimed"}, ["category", "location"],
+        filters={"category": "Electronics", "location": {"location_id": {"$in": ["library"]}}, "status": None},
+        limit=5,
+    )
+    assert pipeline[0] == {"$match": {"status": "unclaimed"}}
+    branches = pipeline[-1]["$facet"]
+    assert branches["hits"][0] == {"$match": {"category": "Electronics", "location_id": {"$in": ["library"]}}}
+    assert branches["hits"][-1] == {"$limit": 5}
+    assert branches["category"][0] == {"$match": {"location_id": {"$in": ["library"]}}}
+    assert branches["location"][0] == {"$match": {"category": "Electronics"}}
+
+
+def test_search_with_facets_counts_alternatives(app):
+    _seed()
+    result = FoundItem.search_with_facets("phone", ["category", "location"], filters={"category": "Electronics"})
+    assert {hit["title"] for hit in result["hits"]} == {"Black phone", "Phone charger", "Blue phone"}
+    # The category counts ignore the category filter; the location counts apply it
+    assert _counts(result["category"]) == {"Electronics": 3, "Accessories": 1}
+    assert _counts(result["location"]) == {"Library": 2, "Gym": 1}
+
+
+def test_search_with_facets_without_hits(app):
+    result = FoundItem.search_with_facets("umbrella", ["category"])
+    assert result["hits"] == []
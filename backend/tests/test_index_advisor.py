@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.models.models import FoundItem, Location, LostItem, archive_resolved_items
+from backend.utils import index_advisor
+from backend.utils.locations import build_registry
+from backend.utils.tenancy import scoped
+
+REGISTRY = {"buildings": [{"id": "library", "name": "Main Library",
+                           "floors": [{"id": "2", "rooms": [{"id": "201"}]}]}]}
+
+
+def _seed():
+    Location.replace_all(build_registry(REGISTRY))
+    student_id = str(ObjectId())
+    for location in ("Main Library", "library floor 2", "Gym"):
+        LostItem.create("Black umbrella", "folding", "Other", location, datetime(2025, 1, 1), student_id, "k")
+        FoundItem.create("Black umbrella", "folding", "Other", location, student_id, "k")
+
+
+def _shape(name):
+    return next(shape for shape in index_advisor.QUERY_SHAPES if shape.name == name)
+
+
+def test_search_shapes_issue_the_model_queries(db):
+    _seed()
+    samples = index_advisor._sample_documents(db)
+    cases = [
+        ("LostItem.search", "lost_items", lambda: LostItem.search("umbrella")),
+        ("LostItem.search(location)", "lost_items",
+         lambda: LostItem.search("umbrella", where=Location.filter_query("library"))),
+        ("FoundItem.search", "found_items", lambda: FoundItem.search("umbrella")),
+        ("FoundItem.search(location)", "found_items",
+         lambda: FoundItem.search("umbrella", where=Location.filter_query("library"))),
+    ]
+    for name, collection, model_query in cases:
+        query = _shape(name).build(samples)
+        explained = db[collection].find(scoped(query["filter"]), query["projection"]).limit(query["limit"])
+        assert {doc["_id"] for doc in explained} == {doc["_id"] for doc in model_query()}, name
+    # The location variants are narrowed to the library and everything below it
+    where = index_advisor._location_filter(samples)
+    assert sorted(where["location_id"]["$in"]) == ["library", "library/2", "library/2/201"]
+    assert len(list(LostItem.search("umbrella", where=where))) == 2
+
+
+def test_lookup_and_aggregation_shapes_issue_the_model_queries(db):
+    _seed()
+    samples = index_advisor._sample_documents(db)
+    facets = _shape("FoundItem.search_with_facets").build(samples)
+    expected = FoundItem.search_with_facets("umbrella", list(FoundItem.FACET_FIELDS), {"category": "Other"})
+    assert next(db.found_items.aggregate(facets["pipeline"])) == expected
+    assert facets["filter"] == FoundItem.facets_query("umbrella")
+
+    listed = _shape("Location.find_all").build(samples)
+    assert list(db.locations.find(scoped(listed["filter"]), listed["projection"]).sort(listed["sort"])) == list(
+        Location.find_all())
+    expand = _shape("Location.expand").build(samples)
+    assert sorted(doc["location_id"] for doc in db.locations.find(scoped(expand["filter"]))) == sorted(
+        Location.expand("library"))
+
+    loaded = _shape("FoundItem.load").build(samples)
+    assert [doc["_id"] for doc in db.found_items.find(scoped(loaded["filter"]))] == [samples["found"]["_id"]]
+
+
+def test_archive_shapes_select_what_the_archival_job_moves(db):
+    _seed()
+    db.found_items.update_many({}, {"$set": {"status": "claimed", "updated_at": datetime(2020, 1, 1)}})
+    shapes = {shape.name: shape for shape in index_advisor._archive_shapes(180)}
+    query = shapes["archive_resolved_items(found_items)"].build({})
+    selected = {doc["_id"] for doc in db.found_items.find(scoped(query["filter"]))}
+    assert len(selected) == 3
+    assert archive_resolved_items(180)["found_items"] == 3
+    assert {doc["_id"] for doc in db.found_items_archive.find()} == selected
+
+
+def test_regressions_report_new_findings_and_lost_shapes():
+    entry = {"findings": [], "ratio": 1.0, "indexes": ["campus_lost_items_text_index"]}
+    baseline = {"LostItem.search": entry, "Claim.find_all": entry, "Removed.shape": entry}
+    results = {
+        "LostItem.search": {"findings": ["COLLSCAN"], "ratio": 1.0},
+        "Claim.find_all": {"skipped": "no sample claim"},
+    }
+    problems = index_advisor.regressions(results, baseline)
+    assert problems == [
+        "Claim.find_all: skipped (no sample claim) but checked in baseline",
+        "Removed.shape: in baseline but no longer checked",
+        "LostItem.search: COLLSCAN (not in baseline)",
+    ]
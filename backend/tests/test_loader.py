@@ -0,0 +1,68 @@
+from bson import ObjectId
+
+from backend.models.models import Student
+from backend.utils.loader import BatchLoader, loader
+from backend.utils.tenancy import campus_context
+
+
+class RecordingFetch:
+    def __init__(self, documents):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.calls = []
+
+    def __call__(self, ids):
+        self.calls.append(sorted(ids))
+        return {_id: self.documents[_id] for _id in ids if _id in self.documents}
+
+
+def test_queued_ids_are_fetched_in_one_batch():
+    docs = [{"_id": ObjectId()} for _ in range(3)]
+    fetch = RecordingFetch(docs)
+    batch = BatchLoader(fetch)
+    missing = ObjectId()
+    deferred = [batch.load(doc["_id"]) for doc in docs] + [batch.load(str(docs[0]["_id"])), batch.load(missing)]
+
+    assert [d.get() for d in deferred] == docs + [docs[0], None]
+    assert fetch.calls == [sorted([doc["_id"] for doc in docs] + [missing])]
+
+
+def test_results_are_cached_and_none_keys_never_fetched():
+    doc = {"_id": ObjectId()}
+    fetch = RecordingFetch([doc])
+    batch = BatchLoader(fetch)
+    assert batch.load(doc["_id"]).get() is doc
+    assert batch.load(doc["_id"]).get() is doc
+    assert batch.load(None).get() is None
+    assert len(fetch.calls) == 1
+
+
+def test_ids_queued_after_a_dispatch_form_the_next_batch():
+    docs = [{"_id": ObjectId()} for _ in range(2)]
+    fetch = RecordingFetch(docs)
+    batch = BatchLoader(fetch)
+    first = batch.load(docs[0]["_id"])
+    assert first.get() is docs[0]
+    second = batch.load(docs[1]["_id"])
+    assert second.get() is docs[1]
+    assert fetch.calls == [[docs[0]["_id"]], [docs[1]["_id"]]]
+
+
+def test_loaders_are_per_request_and_campus(app):
+    # Like a served request, each one gets its own app context (and flask.g)
+    with app.app_context(), app.test_request_context():
+        first = loader("students", RecordingFetch([]))
+        assert loader("students", RecordingFetch([])) is first
+        with campus_context("north"):
+            assert loader("students", RecordingFetch([])) is not first
+    with app.app_context(), app.test_request_context():
+        assert loader("students", RecordingFetch([])) is not first
+
+
+def test_model_load_reads_the_current_campus(app):
+    student_id = Student.create("a@example.com", "A", "hash").inserted_id
+    with app.test_request_context():
+        students = [Student.load(student_id), Student.load(None)]
+        assert students[0].get()["email"] == "a@example.com"
+        assert students[1].get() is None
+        with campus_context("north"):
+            assert Student.load(student_id).get() is None
@@ -0,0 +1,66 @@
+import pytest
+
+from backend.models.models import Location
+from backend.utils.locations import RegistryError, best_match, build_registry, normalize
+
+REGISTRY = {"buildings": [
+    {"id": "library", "name": "Main Library", "aliases": ["lib"],
+     "floors": [{"id": "2", "name": "2nd floor", "aliases": ["reading room"],
+                 "rooms": [{"id": "201", "name": "Group study 201"}]}]},
+    {"id": "gym", "name": "Sports Hall", "floors": [{"id": "2", "name": "2nd floor"}]},
+]}
+
+
+@pytest.fixture
+def registry():
+    return build_registry(REGISTRY)
+
+
+def test_build_registry_ids_and_paths(registry):
+    by_id = {doc["location_id"]: doc for doc in registry}
+    assert list(by_id) == ["library", "library/2", "library/2/201", "gym", "gym/2"]
+    assert by_id["library/2/201"]["path"] == ["library", "library/2", "library/2/201"]
+    assert by_id["library/2/201"]["parent"] == "library/2"
+    assert by_id["library"]["kind"] == "building" and by_id["library"]["parent"] is None
+
+
+def test_floor_names_are_only_aliases_with_a_building(registry):
+    floor = next(doc for doc in registry if doc["location_id"] == "library/2")
+    assert "2 floor lib" in floor["aliases"] and "main library floor 2" in floor["aliases"]
+    assert "reading room" in floor["aliases"]
+    # "2nd floor" exists in every building
+    assert all(normalize("2nd floor") not in doc["aliases"] for doc in registry)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Library", "library"),
+    ("main library", "library"),
+    ("left it in the library 2nd floor", "library/2"),
+    ("Second floor, Main Library", "library/2"),
+    ("lib room 201", "library/2/201"),
+    ("sports hall 2nd floor", "gym/2"),
+    ("2nd floor", None),
+    ("cafeteria", None),
+    (None, None),
+])
+def test_best_match(registry, text, expected):
+    assert best_match(text, registry) == expected
+
+
+@pytest.mark.parametrize("data", [
+    {"buildings": [{"name": "No id"}]},
+    {"buildings": [{"id": "library"}, {"id": "library"}]},
+    {"buildings": [{"id": "library", "floors": [{"id": "1"}, {"id": "1"}]}]},
+])
+def test_build_registry_rejects_invalid_files(data):
+    with pytest.raises(RegistryError):
+        build_registry(data)
+
+
+def test_filter_query_expands_to_every_location_below(app, registry):
+    Location.replace_all(registry)
+    assert sorted(Location.filter_query("main library")["location_id"]["$in"]) == [
+        "library", "library/2", "library/2/201",
+    ]
+    assert Location.filter_query("cafeteria") == {"location": "cafeteria"}
+    assert Location.filter_query("") is None
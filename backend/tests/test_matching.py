@@ -0,0 +1,47 @@
+import queue
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.utils.events import broker
+from backend.utils.matching import reconcile_matches
+
+
+def _found(db, title):
+    return db.found_items.insert_one({"campus": "main", "status": "unclaimed", "title": title,
+                                      "description": "", "category": "Accessories",
+                                      "created_at": datetime.utcnow()}).inserted_id
+
+
+def _events(q):
+    events = []
+    while True:
+        try:
+            events.append(q.get_nowait())
+        except queue.Empty:
+            return events
+
+
+def test_only_new_candidates_are_notified(app, db):
+    student_id = ObjectId()
+    lost_id = db.lost_items.insert_one({"campus": "main", "status": "pending", "student_id": student_id,
+                                        "title": "black umbrella", "description": "", "category": "Accessories",
+                                        "date_lost": datetime(2025, 1, 1)}).inserted_id
+    first = _found(db, "black umbrella")
+    q = broker.subscribe(str(student_id))
+    try:
+        assert reconcile_matches()["written"] == 1
+        assert _events(q) == [("new_match", {"lost_item_id": str(lost_id), "found_item_ids": [str(first)]})]
+
+        second = _found(db, "umbrella")
+        assert reconcile_matches()["written"] == 1
+        assert _events(q) == [("new_match", {"lost_item_id": str(lost_id), "found_item_ids": [str(second)]})]
+
+        # Unchanged: not rewritten; shrunk: rewritten without a notification
+        assert reconcile_matches()["written"] == 0
+        db.found_items.delete_one({"_id": second})
+        assert reconcile_matches()["written"] == 1
+        assert _events(q) == []
+        assert db.match_candidates.find_one({"_id": lost_id})["found_item_ids"] == [first]
+    finally:
+        broker.unsubscribe(str(student_id), q)
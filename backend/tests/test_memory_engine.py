@@ -0,0 +1,241 @@
+"""Behaviour of the memory engine that the models rely on.
+
+The tests taking ``engine_db`` also run against a real mongod when
+``TEST_MONGODB_URI`` is set (a throwaway database is created and dropped),
+so the two engines are checked against the same expectations.
+"""
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from backend.storage.memory import MemoryClient, MemoryStorage, _SortedIndex
+from backend.storage.query import sort_key
+
+ENGINES = ["memory"] + (["mongo"] if os.getenv("TEST_MONGODB_URI") else [])
+
+
+@pytest.fixture(params=ENGINES)
+def engine_db(request):
+    if request.param == "memory":
+        yield MemoryClient("test")["test"]
+        return
+    from pymongo import MongoClient
+
+    client = MongoClient(os.environ["TEST_MONGODB_URI"])
+    name = f"memory_engine_test_{ObjectId()}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+
+def _ids(cursor):
+    return [doc["_id"] for doc in cursor]
+
+
+# _SortedIndex
+
+def _index(docs, keys, **options):
+    index = _SortedIndex("idx", keys, **options)
+    for doc in docs:
+        index.add(doc)
+    return index
+
+
+def test_sorted_index_scans_a_prefix_and_range_in_order():
+    docs = [{"_id": i, "campus": campus, "n": n}
+            for i, (campus, n) in enumerate([("a", 3), ("a", 1), ("b", 2), ("a", 2), ("a", "text")])]
+    index = _index(docs, [("campus", 1), ("n", 1)])
+    prefix = (sort_key("a"),)
+    assert list(index.scan(prefix)) == [1, 3, 0, 4]
+    assert list(index.scan(prefix, reverse=True)) == [4, 0, 3, 1]
+    # Bounds on the next field; numbers and strings sort in separate brackets
+    assert list(index.scan(prefix, low=sort_key(2), high=sort_key(3))) == [3]
+    assert list(index.scan(prefix, low=sort_key(2), high=(sort_key(0)[0] + 0.5,))) == [3, 0]
+
+
+def test_sorted_index_multikey_entries_are_scanned_once():
+    index = _index([{"_id": 1, "tags": ["x", "y"]}, {"_id": 2, "tags": "x"}], [("tags", 1)])
+    assert len(index.entries) == 3
+    assert list(index.scan(())) == [1, 2]
+    index.remove({"_id": 1, "tags": ["x", "y"]})
+    assert list(index.scan(())) == [2]
+
+
+def test_sorted_index_unique_and_partial():
+    index = _index([{"_id": 1, "k": "a", "s": "on"}], [("k", 1)], unique=True, partial={"s": "on"})
+    assert index.conflict({"_id": 2, "k": "a", "s": "on"}) == 1
+    assert index.conflict({"_id": 1, "k": "a", "s": "on"}) is None
+    # Outside the partial filter: neither indexed nor checked
+    assert index.conflict({"_id": 3, "k": "a", "s": "off"}) is None
+    index.add({"_id": 3, "k": "a", "s": "off"})
+    assert list(index.scan(())) == [1]
+
+
+# Queries and indexes
+
+def test_find_filters_sorts_and_limits(engine_db):
+    engine_db.items.create_index([("campus", ASCENDING), ("created_at", DESCENDING)], name="campus_created_idx")
+    engine_db.items.insert_many([
+        {"_id": i, "campus": "main" if i % 2 else "north", "created_at": datetime(2025, 1, i + 1),
+         "status": "open" if i < 6 else "closed", "tags": ["t" + str(i % 3)]}
+        for i in range(10)
+    ])
+    assert _ids(engine_db.items.find({"campus": "main"}).sort("created_at", -1).limit(3)) == [9, 7, 5]
+    assert _ids(engine_db.items.find({"campus": "main", "created_at": {"$gte": datetime(2025, 1, 4),
+                                                                       "$lt": datetime(2025, 1, 8)}})
+                .sort("created_at", 1)) == [3, 5]
+    assert _ids(engine_db.items.find({"$or": [{"status": "closed"}, {"_id": {"$in": [0, 1]}}]}).sort("_id", 1)) == [
+        0, 1, 6, 7, 8, 9]
+    assert _ids(engine_db.items.find({"tags": "t1", "_id": {"$nin": [1]}}).sort("_id", 1)) == [4, 7]
+    assert _ids(engine_db.items.find({"missing": {"$exists": False}, "_id": {"$lt": 2}}).sort("_id", 1)) == [0, 1]
+    assert engine_db.items.find_one({"_id": 3}, {"status": 1}) == {"_id": 3, "status": "open"}
+    assert engine_db.items.count_documents({"status": "open"}) == 6
+
+
+def test_indexed_listing_reads_the_index_in_order():
+    db = MemoryClient("test")["test"]
+    db.items.create_index([("campus", ASCENDING), ("created_at", DESCENDING)], name="campus_created_idx")
+    db.items.insert_many([{"campus": "main", "created_at": datetime(2025, 1, d)} for d in range(1, 6)])
+    plan = db.items.find({"campus": "main"}).sort("created_at", -1).limit(2).explain()["queryPlanner"]["winningPlan"]
+    assert plan["inputStage"]["stage"] == "IXSCAN" and plan["inputStage"]["indexName"] == "campus_created_idx"
+    assert db.items.find({"other": 1}).explain()["queryPlanner"]["winningPlan"]["stage"] == "COLLSCAN"
+
+
+def test_unique_indexes_reject_duplicates(engine_db):
+    engine_db.students.create_index([("campus", 1), ("email", 1)], unique=True, name="campus_unique_email_idx")
+    engine_db.students.insert_one({"campus": "main", "email": "a@example.com"})
+    engine_db.students.insert_one({"campus": "north", "email": "a@example.com"})
+    with pytest.raises(DuplicateKeyError):
+        engine_db.students.insert_one({"campus": "main", "email": "a@example.com"})
+    other = engine_db.students.insert_one({"campus": "main", "email": "b@example.com"}).inserted_id
+    with pytest.raises(DuplicateKeyError):
+        engine_db.students.update_one({"_id": other}, {"$set": {"email": "a@example.com"}})
+    assert engine_db.students.find_one({"_id": other})["email"] == "b@example.com"
+    with pytest.raises(DuplicateKeyError):
+        engine_db.students.create_index([("campus", 1)], unique=True, name="campus_only_idx")
+
+
+def test_partial_unique_index_only_constrains_matching_documents(engine_db):
+    engine_db.claims.create_index([("found_item_id", 1)], unique=True, name="approved_idx",
+                                  partialFilterExpression={"status": "approved"})
+    found_id = ObjectId()
+    engine_db.claims.insert_many([{"found_item_id": found_id, "status": "pending"} for _ in range(2)])
+    engine_db.claims.insert_one({"found_item_id": found_id, "status": "approved"})
+    with pytest.raises(DuplicateKeyError):
+        engine_db.claims.insert_one({"found_item_id": found_id, "status": "approved"})
+    assert engine_db.claims.index_information()["approved_idx"]["partialFilterExpression"] == {"status": "approved"}
+
+
+def test_find_one_and_update_upsert(engine_db):
+    key = {"campus": "main", "found_item_id": 1, "student_id": 2}
+    before = engine_db.claims.find_one_and_update(
+        key, {"$setOnInsert": {"status": "pending"}}, upsert=True, return_document=ReturnDocument.BEFORE)
+    assert before is None
+    stored = engine_db.claims.find_one(key)
+    assert stored["status"] == "pending" and stored["campus"] == "main"
+
+    again = engine_db.claims.find_one_and_update(
+        key, {"$setOnInsert": {"status": "other"}}, upsert=True, return_document=ReturnDocument.BEFORE)
+    assert again["_id"] == stored["_id"] and again["status"] == "pending"
+    after = engine_db.claims.find_one_and_update(
+        {"_id": stored["_id"]}, {"$set": {"status": "approved"}}, projection={"status": 1},
+        return_document=ReturnDocument.AFTER)
+    assert after == {"_id": stored["_id"], "status": "approved"}
+    assert engine_db.claims.count_documents({}) == 1
+
+
+def test_updates_and_bulk_writes(engine_db):
+    engine_db.stats.update_one({"_id": "c"}, {"$inc": {"lost.total": 2, "lost.status.open": 1}}, upsert=True)
+    engine_db.stats.update_one({"_id": "c"}, {"$inc": {"lost.total": -1}, "$set": {"at": 1}})
+    assert engine_db.stats.find_one({"_id": "c"}) == {"_id": "c", "lost": {"total": 1, "status": {"open": 1}}, "at": 1}
+
+    result = engine_db.items.bulk_write([
+        InsertOne({"_id": 1, "n": 1}),
+        InsertOne({"_id": 2, "n": 2}),
+        UpdateOne({"_id": 1}, {"$set": {"n": 10}}),
+        UpdateOne({"_id": 3}, {"$set": {"n": 3}}, upsert=True),
+    ])
+    assert (result.inserted_count, result.modified_count, result.upserted_count) == (2, 1, 1)
+    assert engine_db.items.delete_many({"n": {"$gte": 3}}).deleted_count == 2
+    assert _ids(engine_db.items.find()) == [2]
+
+
+def test_text_search_scores_by_field_weight(engine_db):
+    engine_db.items.create_index([("campus", 1), ("title", TEXT), ("description", TEXT)],
+                                 weights={"title": 10, "description": 1}, name="text_idx")
+    engine_db.items.insert_many([
+        {"_id": 1, "campus": "main", "title": "umbrella", "description": "black"},
+        {"_id": 2, "campus": "main", "title": "bag", "description": "umbrella inside"},
+        {"_id": 3, "campus": "main", "title": "phone", "description": "black"},
+        {"_id": 4, "campus": "north", "title": "umbrella", "description": ""},
+    ])
+    score = {"$meta": "textScore"}
+    hits = list(engine_db.items.find({"campus": "main", "$text": {"$search": "umbrella"}}, {"score": score})
+                .sort([("score", score)]))
+    assert [hit["_id"] for hit in hits] == [1, 2]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+    assert _ids(engine_db.items.find({"campus": "main", "$text": {"$search": "black -phone"}})) == [1]
+    assert _ids(engine_db.items.find({"$text": {"$search": "umbrellas"}}).sort("_id", 1)) == [1, 2, 4]
+
+
+def test_aggregation_facet_group_count_and_union(engine_db):
+    engine_db.items.insert_many([{"category": c, "campus": "main"} for c in ("a", "a", "b")])
+    engine_db.items_archive.insert_many([{"category": "b", "campus": "main"}, {"category": "c", "campus": "north"}])
+    result = next(engine_db.items.aggregate([
+        {"$match": {"campus": "main"}},
+        {"$unionWith": {"coll": "items_archive", "pipeline": [{"$match": {"campus": "main"}}]}},
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "category": [{"$group": {"_id": "$category", "n": {"$sum": 1}}}, {"$sort": {"n": -1, "_id": 1}}],
+            "first": [{"$sort": {"category": 1}}, {"$skip": 1}, {"$limit": 1}],
+        }},
+    ]))
+    assert result["total"] == [{"n": 4}]
+    assert result["category"] == [{"_id": "a", "n": 2}, {"_id": "b", "n": 2}]
+    assert [doc["category"] for doc in result["first"]] == ["a"]
+    assert list(engine_db.items.aggregate([{"$match": {"campus": "none"}}, {"$count": "n"}])) == []
+
+
+# Snapshots
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "data.bson")
+    storage = MemoryStorage("app", snapshot_path=path, snapshot_seconds=0)
+    db = storage.db
+    db.items.create_index([("campus", 1), ("k", 1)], unique=True, name="campus_k_idx",
+                          partialFilterExpression={"live": True})
+    db.items.create_index([("title", TEXT)], weights={"title": 5}, name="text_idx")
+    doc = {"_id": ObjectId(), "campus": "main", "k": 1, "live": True, "title": "black umbrella",
+           "at": datetime(2025, 1, 2, 3, 4, 5), "nested": {"list": [1, "two"]}}
+    db.items.insert_one(doc)
+    storage.client["other"].things.insert_one({"_id": 1})
+    storage.snapshot()
+
+    loaded = MemoryStorage("app", snapshot_path=path).db
+    assert loaded.items.find_one() == doc
+    assert loaded.items.index_information() == db.items.index_information()
+    assert _ids(loaded.items.find({"$text": {"$search": "umbrella"}})) == [doc["_id"]]
+    with pytest.raises(DuplicateKeyError):
+        loaded.items.insert_one({"campus": "main", "k": 1, "live": True})
+    assert MemoryStorage("app", snapshot_path=path).client["other"].things.find_one() == {"_id": 1}
+
+
+def test_stop_writes_the_state_a_reloading_worker_sees(tmp_path):
+    path = str(tmp_path / "data.bson")
+    storage = MemoryStorage("app", snapshot_path=path, snapshot_seconds=0)
+    storage.start()
+    storage.db.items.insert_one({"_id": 1})
+    storage.snapshot()
+    # Startup work of a preforking master after the last periodic snapshot
+    storage.db.items.create_index("k", name="k_idx")
+    storage.stop()
+    storage.db.items.insert_one({"_id": 2})
+    storage.snapshot()  # Handed over: the master no longer writes
+
+    storage.reload()
+    assert _ids(storage.db.items.find()) == [1]
+    assert "k_idx" in storage.db.items.index_information()
@@ -0,0 +1,19 @@
+from backend.models.models import Student
+from backend.utils.auth import create_token
+
+
+def _profiled(client, token):
+    return "X-Profile-Id" in client.get("/api/health", headers={"X-Profile": token}).headers
+
+
+def test_profiling_on_request_needs_a_stored_admin_role(app, db):
+    student_id = Student.create("a@example.com", "A", "hash").inserted_id
+    client = app.test_client()
+    # The role claim of the token is not trusted
+    assert not _profiled(client, create_token(student_id, role="admin"))
+    db.students.update_one({"_id": student_id}, {"$set": {"role": "admin"}})
+    assert _profiled(client, create_token(student_id, role="student"))
+    # Tokens of other campuses, unknown users and garbage are ignored
+    assert not _profiled(client, create_token(student_id, role="admin", campus="north"))
+    assert not _profiled(client, create_token("not-an-id", role="admin"))
+    assert not _profiled(client, "garbage")
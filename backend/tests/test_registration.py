@@ -0,0 +1,61 @@
+import threading
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from backend.models import models
+from backend.models.models import Marker, Student
+
+
+def _register(email):
+    return Student.register(email, "Name", "hash")
+
+
+def test_the_first_account_of_a_campus_is_its_admin(app, db):
+    admin_id, role = _register("a@example.com")
+    assert role == "admin"
+    assert _register("b@example.com")[1] == "student"
+    assert _register("a@example.com") is None
+    assert db.students.find_one({"_id": admin_id})["role"] == "admin"
+    assert Marker.find(Marker.FIRST_ADMIN)["value"] == admin_id
+
+
+def test_concurrent_first_registrations_make_one_admin(app, db):
+    results, barrier = [], threading.Barrier(8)
+
+    def register(i):
+        with app.app_context():
+            barrier.wait()
+            results.append(_register(f"user{i}@example.com"))
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(role for _, role in results) == ["admin"] + ["student"] * 7
+    assert db.students.count_documents({"role": "admin"}) == 1
+
+
+def test_a_duplicate_email_releases_the_claimed_marker(app, db, monkeypatch):
+    # The email is taken between the lookup and the insert
+    db.students.insert_one({"campus": "main", "email": "a@example.com", "role": "student"})
+    monkeypatch.setattr(Student, "find_by_email", staticmethod(lambda email: None))
+    assert _register("a@example.com") is None
+    assert Marker.find(Marker.FIRST_ADMIN) is None
+    assert _register("b@example.com")[1] == "admin"
+
+
+def test_startup_repairs_a_marker_whose_account_was_never_inserted(app, db):
+    db.markers.insert_one({"_id": "first_admin:main", "value": ObjectId(), "campus": "main",
+                           "created_at": datetime.utcnow() - timedelta(hours=1)})
+    db.markers.insert_one({"_id": "first_admin:north", "value": ObjectId(), "campus": "north",
+                           "created_at": datetime.utcnow()})
+    oldest = Student.create("a@example.com", "A", "hash").inserted_id
+    Student.create("b@example.com", "B", "hash")
+    models._ensure_first_admin_markers()
+    assert db.students.find_one({"_id": oldest})["role"] == "admin"
+    assert db.students.count_documents({"role": "admin"}) == 1
+    assert Marker.find(Marker.FIRST_ADMIN)["value"] == oldest
+    # A recent marker may belong to a registration still in flight
+    assert db.markers.find_one({"_id": "first_admin:north"}) is not None
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.models.models import LostItem, Stats
+
+
+def _report():
+    LostItem.create("Black umbrella", "folding", "Other", "Gym", datetime(2025, 1, 1), str(ObjectId()), "k")
+
+
+def test_reconcile_corrects_drift(db):
+    for _ in range(2):
+        _report()
+    db.stats.update_one({"_id": Stats._doc_id()}, {"$set": {"lost_items.total": 7, "lost_items.status.pending": 0}})
+    Stats.reconcile()
+    stored = Stats.get()["lost_items"]
+    assert stored["total"] == 2 and stored["status"] == {"pending": 2}
+
+
+def test_reconcile_recounts_when_a_write_lands_during_the_recount(db, monkeypatch):
+    _report()
+    counters_from_result = Stats.counters_from_result
+    recounted = []
+
+    def during_recount(collection, result):
+        if collection == "lost_items":
+            recounted.append(collection)
+            if len(recounted) == 1:
+                _report()  # Missed by this recount, but its $inc moves the stored counters
+        return counters_from_result(collection, result)
+
+    monkeypatch.setattr(Stats, "counters_from_result", staticmethod(during_recount))
+    Stats.reconcile()
+    assert len(recounted) == 2
+    assert Stats.get()["lost_items"]["total"] == 2
@@ -0,0 +1,187 @@
+"""Admission control for the API blueprint.
+
+Two independent checks run before each request:
+
+- a per-route concurrency limit (in-process semaphore): when every slot is
+  busy the request is rejected at once with ``503`` instead of queueing for a
+  MongoDB connection;
+- a per-user (or per-IP for anonymous requests) token bucket per route:
+  clients that exceed their rate get ``429``.
+
+Both responses carry ``Retry-After``. Bucket state lives in a pluggable store:
+``memory://`` (per process) or ``redis://...`` so limits hold across workers.
+"""
+import math
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+from jose import jwt
+
+# Per-endpoint limits. "concurrency" caps in-flight requests per process,
+# "rate"/"burst" configure the token bucket (tokens per second / capacity).
+# Anonymous requests are bucketed per client IP, which a campus NAT shares
+# between hundreds of students, so they get "anonymous_rate"/"anonymous_burst"
+# when set (login and registration are always anonymous).
+DEFAULT_RULES = {
+    "api.login": {"concurrency": 16, "rate": 5, "burst": 100},
+    "api.register": {"concurrency": 8, "rate": 1, "burst": 30},
+    "api.search_found_items": {"concurrency": 32, "rate": 2, "burst": 20, "anonymous_rate": 20, "anonymous_burst": 200},
+    "api.search_lost_items": {"concurrency": 32, "rate": 2, "burst": 20, "anonymous_rate": 20, "anonymous_burst": 200},
+    "api.suggest_matches": {"concurrency": 16, "rate": 1, "burst": 10},
+}
+
+
+class MemoryStore:
+    """Token buckets kept in this process."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # Idle long enough to be full again: dropping the entry changes nothing
+        idle = [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]
+        for key in idle:
+            del self._buckets[key]
+
+
+class RedisStore:
+    """Token buckets shared by every worker through Redis (atomic Lua script)."""
+
+    _SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "admission:"):
+        try:
+            import redis  # Only needed when a shared store is configured
+        except ImportError as exc:
+            raise RuntimeError("ADMISSION_STORAGE_URI points at Redis; install the redis package") from exc
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self._SCRIPT)
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        allowed, tokens = self._take(keys=[self.prefix + key], args=[rate, burst, time.time(), cost])
+        allowed = bool(int(allowed))
+        return allowed, 0.0 if allowed else (cost - float(tokens)) / rate
+
+
+def create_store(uri: str):
+    if uri.startswith("memory://"):
+        return MemoryStore()
+    if uri.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(uri)
+    raise ValueError(f"Unsupported ADMISSION_STORAGE_URI '{uri}'")
+
+
+class AdmissionController:
+    """Applies the configured rules to requests; installed on the API blueprint."""
+
+    def __init__(self, rules: dict, store):
+        self.rules = rules
+        self.store = store
+        self._semaphores = {
+            endpoint: threading.BoundedSemaphore(rule["concurrency"])
+            for endpoint, rule in rules.items() if rule.get("concurrency")
+        }
+        self.rejected = {"429": 0, "503": 0}
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """``before_request`` hook: returns a rejection response or ``None``."""
+        rule = self.rules.get(request.endpoint)
+        if rule is None:
+            return None
+
+        if rule.get("rate"):
+            identity = _client_identity()
+            rate, burst = rule["rate"], rule.get("burst", rule["rate"])
+            if identity.startswith("ip:"):
+                rate, burst = rule.get("anonymous_rate", rate), rule.get("anonymous_burst", burst)
+            allowed, retry_after = self.store.take(f"{request.endpoint}:{identity}", rate, burst)
+            if not allowed:
+                return self._reject(429, "Too many requests", retry_after)
+
+        semaphore = self._semaphores.get(request.endpoint)
+        if semaphore is not None:
+            if not semaphore.acquire(blocking=False):
+                return self._reject(503, "Server busy, please retry", 1)
+            g.admission_semaphore = semaphore
+        return None
+
+    def release(self, exc=None) -> None:
+        """``teardown_request`` hook: free the concurrency slot taken by ``admit``."""
+        semaphore = g.pop("admission_semaphore", None)
+        if semaphore is not None:
+            semaphore.release()
+
+    def _reject(self, status: int, message: str, retry_after: float):
+        with self._lock:
+            self.rejected[str(status)] += 1
+        response = jsonify({"message": message})
+        response.status_code = status
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+
+
+def _client_identity() -> str:
+    """The user id from a valid bearer token, else the client address (see ``TRUSTED_PROXIES``)."""
+    auth_header = request.headers.get("Authorization", "")
+    if " " in auth_header:
+        try:
+            payload = jwt.decode(auth_header.split(" ")[1], current_app.config["SECRET_KEY"], algorithms=["HS256"])
+            return f"user:{payload['sub']}"
+        except jwt.JWTError:
+            pass
+    return f"ip:{request.remote_addr}"
+
+
+def merge_rules(overrides: dict) -> dict:
+    """:data:`DEFAULT_RULES` with each endpoint's overrides merged in; ``None`` removes an endpoint's limits."""
+    rules = {endpoint: dict(rule) for endpoint, rule in DEFAULT_RULES.items()}
+    for endpoint, override in overrides.items():
+        if override is None:
+            rules.pop(endpoint, None)
+        else:
+            rules[endpoint] = {**rules.get(endpoint, {}), **override}
+    return rules
+
+
+def init_admission(app) -> AdmissionController:
+    """Build the controller from config and register it as ``app.extensions["admission"]``."""
+    rules = merge_rules(app.config.get("ADMISSION_RULES", {}))
+    controller = AdmissionController(rules, create_store(app.config["ADMISSION_STORAGE_URI"]))
+    app.extensions["admission"] = controller
+    return controller
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from jose import jwt
 from datetime import datetime, timedelta
 import secrets
@@ -10,13 +10,14 @@ def generate_passkey(length=8):
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
-def create_token(user_id: str, role: str = 'student') -> str:
+def create_token(user_id: str, role: str = 'student', campus: str = None) -> str:
     """Create a JWT token for authentication"""
     payload = {
         'exp': datetime.utcnow() + timedelta(days=1),
         'iat': datetime.utcnow(),
         'sub': str(user_id),
-        'role': role
+        'role': role,
+        'campus': campus or current_app.config['DEFAULT_CAMPUS']
     }
     return jwt.encode(
         payload,
@@ -24,8 +25,7 @@ def create_token(user_id: str, role: str = 'student') -> str:
         algorithm='HS256'
     )
 
-def token_required(f):
-    """Decorator to protect routes with JWT authentication"""
+def _authenticated(f, allow_query: bool):
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
@@ -35,6 +35,8 @@ def token_required(f):
                 token = auth_header.split(" ")[1]
             except IndexError:
                 return jsonify({'message': 'Invalid token format'}), 401
+        elif allow_query:
+            token = request.args.get('token')
 
         if not token:
             return jsonify({'message': 'Token is missing'}), 401
@@ -46,6 +48,8 @@ def token_required(f):
                 algorithms=['HS256']
             )
             kwargs['current_user_id'] = payload['sub']
+            # Scope every model call in this request to the user's campus
+            g.campus = payload.get('campus', current_app.config['DEFAULT_CAMPUS'])
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired'}), 401
         except jwt.JWTError:
@@ -55,6 +59,14 @@ def token_required(f):
 
     return decorated
 
+def token_required(f):
+    """Decorator to protect routes with JWT authentication"""
+    return _authenticated(f, allow_query=False)
+
+def stream_token_required(f):
+    """Like ``token_required``, but also accepts ``?token=`` (``EventSource`` cannot send headers)"""
+    return _authenticated(f, allow_query=True)
+
 def admin_required(f):
     """Decorator to protect routes requiring admin role"""
     @wraps(f)
@@ -77,6 +89,7 @@ def admin_required(f):
                 algorithms=['HS256']
             )
             user_id = payload['sub']
+            g.campus = payload.get('campus', current_app.config['DEFAULT_CAMPUS'])
             
             # Check if user is admin
             from ..models.models import Student
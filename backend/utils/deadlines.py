@@ -0,0 +1,108 @@
+"""Request deadlines for the API blueprint.
+
+Each request gets a time budget when it enters the blueprint: the endpoint's
+entry in :data:`DEFAULT_BUDGETS` (or ``REQUEST_DEADLINES``), else
+``REQUEST_DEADLINE_MS``. Clients may ask for a different budget with the
+``X-Request-Timeout-Ms`` header, capped at ``REQUEST_DEADLINE_MAX_MS``.
+
+The budget is applied with ``pymongo.timeout``, so every MongoDB operation of
+the request (server selection, connection checkout, socket reads and the
+server-side ``maxTimeMS``) only gets the time that is left. Once it runs out
+the failing operation raises a timeout error, which is turned into a ``504``
+with a JSON body and counted per endpoint. That may be a follow-up write (a
+``Stats`` counter) after the request's main write committed, so a ``504``
+does not guarantee that nothing was stored. The memory engine ignores
+``pymongo.timeout`` altogether.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+import pymongo
+from flask import g, jsonify, request
+
+HEADER = "X-Request-Timeout-Ms"
+
+# Per-endpoint budgets in milliseconds; None means no deadline (long-lived streams)
+DEFAULT_BUDGETS = {
+    "api.events_stream": None,
+    "api.search_found_items": 3000,
+    "api.search_lost_items": 3000,
+    "api.suggest_matches": 5000,
+}
+
+
+class RequestDeadline:
+    """The budget of the request being served (kept on ``flask.g``)."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self._started = time.monotonic()
+        self._stack = ExitStack()
+        self._stack.enter_context(pymongo.timeout(budget_ms / 1000))
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self._started) * 1000
+
+    def close(self) -> None:
+        self._stack.close()
+
+
+class DeadlineController:
+    """Sets the deadline of each request and answers the ones that run out of time."""
+
+    def __init__(self, default_ms: float, max_ms: float, budgets: dict):
+        self.default_ms = default_ms
+        self.max_ms = max_ms
+        self.budgets = budgets
+        self.expired: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def budget_ms(self) -> float | None:
+        budget = self.budgets.get(request.endpoint, self.default_ms)
+        if budget is None:
+            return None
+        try:
+            requested = float(request.headers.get(HEADER, ""))
+        except ValueError:
+            return budget
+        return min(requested, self.max_ms) if requested > 0 else budget
+
+    def start(self) -> None:
+        """``before_request`` hook."""
+        budget = self.budget_ms()
+        if budget:
+            g.request_deadline = RequestDeadline(budget)
+
+    def finish(self, exc=None) -> None:
+        """``teardown_request`` hook."""
+        deadline = g.pop("request_deadline", None)
+        if deadline is not None:
+            deadline.close()
+
+    def expired_response(self, exc):
+        """Error handler for ``PyMongoError``: a ``504`` for timeouts, anything else is re-raised."""
+        deadline = g.get("request_deadline")
+        if deadline is None or not exc.timeout:
+            raise exc
+        with self._lock:
+            self.expired[request.endpoint] += 1
+        response = jsonify({
+            "message": "Request deadline exceeded",
+            "deadline_ms": deadline.budget_ms,
+            "elapsed_ms": round(deadline.elapsed_ms(), 1),
+        })
+        response.status_code = 504
+        return response
+
+
+def init_deadlines(app) -> DeadlineController:
+    """Build the controller from config and register it as ``app.extensions["deadlines"]``."""
+    controller = DeadlineController(
+        app.config["REQUEST_DEADLINE_MS"],
+        app.config["REQUEST_DEADLINE_MAX_MS"],
+        {**DEFAULT_BUDGETS, **app.config.get("REQUEST_DEADLINES", {})},
+    )
+    app.extensions["deadlines"] = controller
+    return controller
@@ -0,0 +1,233 @@
+"""Per-user notification events for the Server-Sent Events stream.
+
+Every process keeps one :class:`EventBroker`. A single background thread tails
+a MongoDB change stream on ``claims``, ``retrievals`` and ``match_candidates``
+and fans events out to the in-memory queues of the connected clients, so an
+idle SSE connection costs a queue, not a database cursor.
+
+Change streams need a replica set. On a standalone ``mongod`` or the memory
+engine the broker is in local mode, decided once at startup by
+:func:`init_events`: the models publish their own writes instead (see
+:func:`notify`), so events only reach clients connected to the same process.
+
+Subscriptions are plain queues for the Flask app and
+:class:`AsyncSubscription` for the async app, which serves ``/events`` from its
+event loop instead of holding a thread per open stream.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.storage import storage
+from backend.utils.tenancy import configured_campuses, database_name
+
+# Collections whose changes produce notifications
+WATCHED_COLLECTIONS = ("claims", "retrievals", "match_candidates")
+
+# Server error code for "$changeStream is only supported on replica sets"
+_CHANGE_STREAMS_UNSUPPORTED = 40573
+
+
+class EventBroker:
+    """Fan-out of events to per-connection queues, keyed by student id."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.local_mode = False
+        self._subscribers: dict[str, set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def subscribe(self, user_id: str, q=None):
+        """Register ``q`` (anything with ``put_nowait``; a new bounded queue by default) for ``user_id``."""
+        if q is None:
+            q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id: str, q) -> None:
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(q)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id: str, event: str, data: dict) -> None:
+        with self._lock:
+            queues = list(self._subscribers.get(str(user_id), ()))
+        for q in queues:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # A client that stopped reading must not hold up everyone else
+                pass
+
+    def configure(self, local_mode: bool) -> None:
+        self.local_mode = local_mode
+
+    def start(self, app) -> None:
+        """Start the change-stream watcher once per process (no-op if already running or in local mode)."""
+        with self._lock:
+            if self._watcher is not None or self.local_mode:
+                return
+            self._watcher = threading.Thread(
+                target=self._watch, args=(app,), name="events-change-stream", daemon=True
+            )
+        self._watcher.start()
+
+    def _watch(self, app) -> None:
+        resume_token = None
+        with app.app_context():
+            databases = sorted({database_name(c) for c in configured_campuses()})
+            pipeline = [{"$match": {
+                "ns.db": {"$in": databases},
+                "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+                "operationType": {"$in": ["insert", "update", "replace"]},
+            }}]
+            # One database: watch just it; per-campus databases: watch the deployment
+            client = storage().client
+            watched = client[databases[0]] if len(databases) == 1 else client
+            while True:
+                try:
+                    with watched.watch(pipeline, full_document="updateLookup",
+                                       resume_after=resume_token) as stream:
+                        for change in stream:
+                            resume_token = stream.resume_token
+                            for user_id, event, data in _events_for_change(change):
+                                self.publish(user_id, event, data)
+                except OperationFailure as exc:
+                    if exc.code == _CHANGE_STREAMS_UNSUPPORTED:
+                        app.logger.info("Change streams unavailable; using in-process events")
+                        self.local_mode = True
+                        return
+                    app.logger.warning(f"Event change stream error: {exc}")
+                    resume_token = None
+                except PyMongoError as exc:
+                    app.logger.warning(f"Event change stream interrupted: {exc}")
+                time.sleep(1.0)
+
+
+broker = EventBroker()
+
+
+class AsyncSubscription:
+    """A subscriber queue read on an event loop; the broker may publish from any thread."""
+
+    def __init__(self, maxsize: int):
+        self._loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def put_nowait(self, item) -> None:
+        self._loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # A client that stopped reading must not hold up everyone else
+            pass
+
+
+def supports_change_streams(client) -> bool:
+    """Whether the deployment behind ``client`` is a replica set or a sharded cluster."""
+    hello = client.admin.command("hello")
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+def init_events(app) -> None:
+    """Decide between change-stream and local events once, from ``EVENTS_BACKEND`` and the deployment."""
+    backend = app.config["EVENTS_BACKEND"]
+    if backend == "auto":
+        if app.config["STORAGE_ENGINE"] != "mongo":
+            local = True
+        else:
+            with app.app_context():
+                try:
+                    local = not supports_change_streams(storage().client)
+                except PyMongoError as exc:
+                    app.logger.warning(f"Could not detect change stream support ({exc}); using change streams")
+                    local = False
+    else:
+        local = backend == "local"
+    broker.configure(local)
+    if local:
+        app.logger.info("Live notifications use in-process events: they only reach clients of the same process")
+
+
+def _events_for_change(change: dict):
+    """Translate one change-stream document into ``(user_id, event, data)`` tuples."""
+    doc = change.get("fullDocument") or {}
+    collection = change["ns"]["coll"]
+    operation = change["operationType"]
+    if collection == "claims":
+        if operation == "insert":
+            yield from claim_events(doc, None)
+        else:
+            updated = change.get("updateDescription", {}).get("updatedFields", {})
+            if "status" in updated or operation == "replace":
+                yield from claim_events(doc, doc.get("status"))
+    elif collection == "retrievals" and operation == "insert":
+        yield from retrieval_events(doc)
+    elif collection == "match_candidates":
+        yield from match_events(doc)
+
+
+def claim_events(claim: dict, new_status: str | None):
+    """Events for a created claim (``new_status`` None) or a claim status change."""
+    if not claim.get("student_id"):
+        return
+    data = {"claim_id": str(claim.get("_id")), "lost_item_id": _str(claim.get("lost_item_id")),
+            "found_item_id": _str(claim.get("found_item_id"))}
+    if new_status is None:
+        yield str(claim["student_id"]), "claim_created", data
+    elif new_status in ("approved", "rejected"):
+        yield str(claim["student_id"]), f"claim_{new_status}", {**data, "status": new_status}
+
+
+def retrieval_events(retrieval: dict):
+    if retrieval.get("student_id"):
+        yield str(retrieval["student_id"]), "retrieval_recorded", {
+            "retrieval_id": str(retrieval.get("_id")),
+            "claim_id": _str(retrieval.get("claim_id")),
+            "retrieval_location": retrieval.get("retrieval_location"),
+        }
+
+
+def match_events(candidates: dict):
+    """A ``new_match`` event for the found items that became candidates in this write (none on reorders)."""
+    if candidates.get("student_id") and candidates.get("new_found_item_ids"):
+        yield str(candidates["student_id"]), "new_match", {
+            "lost_item_id": str(candidates.get("_id")),
+            "found_item_ids": [str(found_id) for found_id in candidates["new_found_item_ids"]],
+        }
+
+
+def notify(events) -> None:
+    """Publish events produced by a local write when change streams are unavailable."""
+    if broker.local_mode:
+        for user_id, event, data in events:
+            broker.publish(user_id, event, data)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n"
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -0,0 +1,330 @@
+"""Explain-plan checks for the query shapes the models issue.
+
+Every shape in :data:`QUERY_SHAPES` mirrors one model query (same filter,
+sort and limit, with values taken from documents in the database); where a
+model exposes its query builder (e.g. ``LostItem.search_query``,
+``ids_query`` of the batched loaders) the shape calls it instead of restating
+the query. Aggregations (``search_with_facets``) are explained as
+``aggregate`` commands and judged by the plan of their leading ``$match``.
+The advisor runs each through ``explain`` with ``executionStats`` verbosity
+and flags:
+
+- ``COLLSCAN``: no index is used;
+- ``SORT``: results are sorted in memory instead of read in index order;
+- ``RATIO``: many more keys or documents are examined than returned.
+
+For flagged shapes it proposes a campus-prefixed compound index in
+equality, sort, range order. Results can be saved as a baseline and later
+runs compared against it, so a new or changed query shape that loses its
+index fails the check (``flask advise-indexes --baseline ...``).
+"""
+from datetime import datetime, timedelta
+
+from pymongo import DESCENDING
+
+from backend.models.models import (
+    FOUND_ACTIVE_STATUS, LOST_ACTIVE_STATUS, RESOLVED_STATUS, FoundItem, LostItem, Location, ids_query,
+    resolved_query,
+)
+from backend.utils.match_planner import plan_match_query, summarize_explain
+from backend.utils.tenancy import CAMPUS_FIELD, database, scoped
+
+TEXT_SCORE = {"$meta": "textScore"}
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$regex", "$exists", "$not"}
+
+
+class QueryShape:
+    """One model query: ``build(samples)`` returns its filter, sort, limit and projection.
+
+    For an aggregation it also returns the ``pipeline``; ``filter`` is then the
+    leading ``$match``, used to propose an index.
+    """
+
+    def __init__(self, name: str, collection: str, build, needs: tuple[str, ...] = ()):
+        self.name = name
+        self.collection = collection
+        self.build = build
+        self.needs = needs
+
+
+def _sample_documents(db) -> dict:
+    """Real documents whose values make the explained queries return results."""
+    return {
+        "student": db.students.find_one(scoped({"role": "student"})),
+        "lost": db.lost_items.find_one(scoped({"status": LOST_ACTIVE_STATUS})),
+        "found": db.found_items.find_one(scoped({"status": FOUND_ACTIVE_STATUS})),
+        "found_serial": db.found_items.find_one(scoped({"status": FOUND_ACTIVE_STATUS,
+                                                        "serial_number": {"$type": "string"}})),
+        "claim": db.claims.find_one(scoped()),
+        "retrieval": db.retrievals.find_one(scoped()),
+        "archived_lost": db.lost_items_archive.find_one(scoped()),
+        "archived_found": db.found_items_archive.find_one(scoped()),
+        "location": db.locations.find_one(scoped({"parent": None})),
+    }
+
+
+def _text_query(doc: dict) -> str:
+    return doc["title"].split()[-1]
+
+
+def _loaded(doc: dict) -> dict:
+    """The batched lookup of a ``load`` method, for a batch holding ``doc``."""
+    return {"filter": ids_query([doc["_id"]])}
+
+
+def _facets(samples: dict) -> dict:
+    """FoundItem.search_with_facets for every facet, narrowed to the sample's category."""
+    found = samples["found"]
+    match = FoundItem.facets_query(_text_query(found))
+    facets = list(FoundItem.FACET_FIELDS)
+    pipeline = FoundItem.facets_pipeline(scoped(match), facets, {"category": found.get("category")})
+    return {"filter": match, "pipeline": pipeline}
+
+
+def _location_filter(samples: dict) -> dict:
+    """The ``where`` the search routes pass for a ``location`` parameter naming a registered location."""
+    return Location.filter_query(samples["location"]["aliases"][0])
+
+
+NEWEST = [("created_at", DESCENDING)]
+
+QUERY_SHAPES = [
+    # Student
+    QueryShape("Student.find_by_email", "students",
+               lambda s: {"filter": {"email": s["student"]["email"]}, "limit": 1}, needs=("student",)),
+    QueryShape("Student.find_by_id", "students",
+               lambda s: {"filter": {"_id": s["student"]["_id"]}, "limit": 1}, needs=("student",)),
+    QueryShape("Student.exists_any", "students",
+               lambda s: {"filter": {}, "projection": {"_id": 1}, "limit": 1}),
+    QueryShape("Student.find_all", "students", lambda s: {"filter": {}, "sort": NEWEST}),
+    QueryShape("Student.load", "students", lambda s: _loaded(s["student"]), needs=("student",)),
+    # LostItem
+    QueryShape("LostItem.find_by_passkey", "lost_items",
+               lambda s: {"filter": {"passkey": s["lost"]["passkey"]}, "limit": 1}, needs=("lost",)),
+    QueryShape("LostItem.find_by_student", "lost_items",
+               lambda s: {"filter": {"student_id": s["lost"]["student_id"]}}, needs=("lost",)),
+    QueryShape("LostItem.find_by_id", "lost_items",
+               lambda s: {"filter": {"_id": s["lost"]["_id"]}, "limit": 1}, needs=("lost",)),
+    QueryShape("LostItem.load", "lost_items", lambda s: _loaded(s["lost"]), needs=("lost",)),
+    QueryShape("LostItem.load(archived)", "lost_items_archive",
+               lambda s: _loaded(s["archived_lost"]), needs=("archived_lost",)),
+    QueryShape("LostItem.find_all", "lost_items", lambda s: {"filter": {}, "sort": NEWEST, "limit": 100}),
+    QueryShape("LostItem.find_all(archived)", "lost_items_archive",
+               lambda s: {"filter": {}, "sort": NEWEST, "limit": 100}, needs=("archived_lost",)),
+    QueryShape("LostItem.search", "lost_items",
+               lambda s: LostItem.search_query(_text_query(s["lost"])), needs=("lost",)),
+    QueryShape("LostItem.search(location)", "lost_items",
+               lambda s: LostItem.search_query(_text_query(s["lost"]), where=_location_filter(s)),
+               needs=("lost", "location")),
+    QueryShape("LostItem.find_by_serial_number", "lost_items",
+               lambda s: {"filter": {"serial_number": {"$regex": s["found_serial"]["serial_number"], "$options": "i"}}},
+               needs=("found_serial",)),
+    # FoundItem
+    QueryShape("FoundItem.find_by_passkey", "found_items",
+               lambda s: {"filter": {"passkey": s["found"]["passkey"], "status": FOUND_ACTIVE_STATUS}, "limit": 1},
+               needs=("found",)),
+    QueryShape("FoundItem.find_by_id", "found_items",
+               lambda s: {"filter": {"_id": s["found"]["_id"]}, "limit": 1}, needs=("found",)),
+    QueryShape("FoundItem.load", "found_items", lambda s: _loaded(s["found"]), needs=("found",)),
+    QueryShape("FoundItem.load(archived)", "found_items_archive",
+               lambda s: _loaded(s["archived_found"]), needs=("archived_found",)),
+    QueryShape("FoundItem.find_all", "found_items", lambda s: {"filter": {}, "sort": NEWEST}),
+    QueryShape("FoundItem.search", "found_items",
+               lambda s: FoundItem.search_query(_text_query(s["found"])), needs=("found",)),
+    QueryShape("FoundItem.search(location)", "found_items",
+               lambda s: FoundItem.search_query(_text_query(s["found"]), where=_location_filter(s)),
+               needs=("found", "location")),
+    QueryShape("FoundItem.search_with_facets", "found_items", _facets, needs=("found",)),
+    QueryShape("FoundItem.find_by_serial_number", "found_items",
+               lambda s: {"filter": {"serial_number": {"$regex": s["found_serial"]["serial_number"], "$options": "i"},
+                                     "status": FOUND_ACTIVE_STATUS}},
+               needs=("found_serial",)),
+    # Claim
+    QueryShape("Claim.find_all", "claims", lambda s: {"filter": {}, "sort": NEWEST, "limit": 50}),
+    QueryShape("Claim.find_by_id", "claims",
+               lambda s: {"filter": {"_id": s["claim"]["_id"]}, "limit": 1}, needs=("claim",)),
+    QueryShape("Claim.load", "claims", lambda s: _loaded(s["claim"]), needs=("claim",)),
+    QueryShape("Claim.find_existing_claim", "claims",
+               lambda s: {"filter": {"found_item_id": s["claim"]["found_item_id"],
+                                     "student_id": s["claim"]["student_id"]}, "limit": 1},
+               needs=("claim",)),
+    # Retrieval
+    QueryShape("Retrieval.find_by_claim_id", "retrievals",
+               lambda s: {"filter": {"claim_id": s["retrieval"]["claim_id"]}, "limit": 1}, needs=("retrieval",)),
+    QueryShape("Retrieval.find_by_student", "retrievals",
+               lambda s: {"filter": {"student_id": s["retrieval"]["student_id"]},
+                          "sort": [("retrieval_date", DESCENDING)]},
+               needs=("retrieval",)),
+    QueryShape("Retrieval.find_by_id", "retrievals",
+               lambda s: {"filter": {"_id": s["retrieval"]["_id"]}, "limit": 1}, needs=("retrieval",)),
+    QueryShape("Retrieval.find_all", "retrievals",
+               lambda s: {"filter": {}, "sort": [("retrieval_date", DESCENDING)], "limit": 50}),
+    # Location
+    QueryShape("Location.find_all", "locations", lambda s: Location.find_all_query()),
+    QueryShape("Location.resolve", "locations",
+               lambda s: Location.resolve_query(s["location"]["aliases"][:3]), needs=("location",)),
+    QueryShape("Location.expand", "locations",
+               lambda s: Location.expand_query(s["location"]["location_id"]), needs=("location",)),
+]
+
+
+def _archive_shapes(archive_after_days: int) -> list[QueryShape]:
+    """The batches read by archive_resolved_items, with the cutoff of ``archive_after_days``."""
+    def resolved(collection):
+        def build(s):
+            cutoff = datetime.utcnow() - timedelta(days=archive_after_days)
+            return {"filter": resolved_query(RESOLVED_STATUS[collection], cutoff), "limit": 500}
+        return QueryShape(f"archive_resolved_items({collection})", collection, build)
+
+    return [resolved(collection) for collection in RESOLVED_STATUS]
+
+
+def _match_candidate_shapes(max_terms: int, date_tolerance_days: int) -> list[QueryShape]:
+    """FoundItem.find_match_candidates in both planner strategies, planned from a real lost item."""
+    def planned(s, location=None):
+        return plan_match_query(s["lost"], max_terms=max_terms, date_tolerance_days=date_tolerance_days,
+                                location=location)
+
+    def recent(s):
+        return {"filter": planned(s).filter, "sort": NEWEST, "limit": 20}
+
+    def recent_at_location(s):
+        return {"filter": planned(s, _location_filter(s)).filter, "sort": NEWEST, "limit": 20}
+
+    def text(s):
+        plan = planned(s)
+        if not plan.terms:
+            return None
+        return {"filter": {"$text": {"$search": plan.text_query}, **plan.filter},
+                "projection": {"score": TEXT_SCORE}, "sort": [("score", TEXT_SCORE)], "limit": 20}
+
+    return [
+        QueryShape("FoundItem.find_match_candidates(recent_in_window)", "found_items", recent, needs=("lost",)),
+        QueryShape("FoundItem.find_match_candidates(recent_in_window, location)", "found_items", recent_at_location,
+                   needs=("lost", "location")),
+        QueryShape("FoundItem.find_match_candidates(text)", "found_items", text, needs=("lost",)),
+    ]
+
+
+def _is_text_sort(sort) -> bool:
+    return any(direction == TEXT_SCORE for _, direction in sort or [])
+
+
+def analyze(explain: dict, query: dict, max_ratio: float) -> dict:
+    """Flags and numbers for one explained query."""
+    stats = explain.get("executionStats", {})
+    plan = summarize_explain(explain)
+    stages = plan["stages"]
+    returned = stats.get("nReturned", 0)
+    examined = max(stats.get("totalDocsExamined", 0), stats.get("totalKeysExamined", 0))
+    ratio = round(examined / max(returned, 1), 2)
+
+    findings = []
+    if "COLLSCAN" in stages:
+        findings.append("COLLSCAN")
+    # Ordering by text score always needs an in-memory sort; no index can provide it
+    if "SORT" in stages and not _is_text_sort(query.get("sort")):
+        findings.append("SORT")
+    if ratio > max_ratio and examined > returned:
+        findings.append("RATIO")
+    return {
+        "stages": stages,
+        "indexes": plan["indexes"],
+        "returned": returned,
+        "docs_examined": stats.get("totalDocsExamined", 0),
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "ratio": ratio,
+        "millis": stats.get("executionTimeMillis"),
+        "findings": findings,
+    }
+
+
+def propose_index(query: dict) -> list[tuple[str, int]] | None:
+    """A campus-prefixed index for ``query``: equality fields, then the sort, then ranges (ESR)."""
+    filter_ = query.get("filter", {})
+    if "$text" in filter_:
+        return None  # Served by the text index; nothing to add
+    equality, ranges = [], []
+    for field, value in filter_.items():
+        if field.startswith("$") or field == CAMPUS_FIELD:
+            continue
+        operators = set(value) if isinstance(value, dict) else set()
+        (ranges if operators & RANGE_OPERATORS else equality).append(field)
+    keys = [(CAMPUS_FIELD, 1)] + [(field, 1) for field in equality]
+    keys += [(field, direction) for field, direction in query.get("sort") or [] if field not in equality]
+    keys += [(field, 1) for field in ranges if field not in dict(keys)]
+    return keys if len(keys) > 1 else None
+
+
+def _matching_index(db, collection: str, keys: list[tuple[str, int]]) -> str | None:
+    for name, info in db[collection].index_information().items():
+        if [(field, direction) for field, direction in info["key"]] == keys:
+            return name
+    return None
+
+
+def explain_shape(db, shape: QueryShape, query: dict) -> dict:
+    if query.get("pipeline"):
+        explain = db.command("explain", {"aggregate": shape.collection, "pipeline": query["pipeline"], "cursor": {}},
+                             verbosity="executionStats")
+        # Unless the whole pipeline runs in the query layer, the $match plan is in the first stage's $cursor
+        return explain["stages"][0]["$cursor"] if "stages" in explain else explain
+    command = {"find": shape.collection, "filter": scoped(query.get("filter", {}))}
+    if query.get("sort"):
+        command["sort"] = dict(query["sort"])
+    if query.get("projection"):
+        command["projection"] = query["projection"]
+    if query.get("limit"):
+        command["limit"] = query["limit"]
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def advise(max_ratio: float = 10.0, max_terms: int = 8, date_tolerance_days: int = 2,
+           archive_after_days: int = 180) -> dict:
+    """Explain every query shape for the current campus; returns ``{shape name: result}``."""
+    db = database()
+    samples = _sample_documents(db)
+    results = {}
+    shapes = QUERY_SHAPES + _match_candidate_shapes(max_terms, date_tolerance_days) + _archive_shapes(archive_after_days)
+    for shape in shapes:
+        missing = [need for need in shape.needs if samples.get(need) is None]
+        query = None if missing else shape.build(samples)
+        if query is None:
+            results[shape.name] = {"skipped": f"no sample {', '.join(missing)}" if missing else "not applicable"}
+            continue
+        result = {"collection": shape.collection, **analyze(explain_shape(db, shape, query), query, max_ratio)}
+        if result["findings"]:
+            keys = propose_index(query)
+            if keys:
+                existing = _matching_index(db, shape.collection, keys)
+                result["proposed_index"] = {"keys": keys, "existing": existing}
+        results[shape.name] = result
+    return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float = 2.0) -> list[str]:
+    """Shapes that are worse than in ``baseline``.
+
+    That is a new finding, a ratio grown beyond ``tolerance``x, or a baseline
+    shape that is no longer checked (removed, renamed or now skipped).
+    """
+    problems = []
+    for name in baseline:
+        if name not in results:
+            problems.append(f"{name}: in baseline but no longer checked")
+        elif "skipped" in results[name]:
+            problems.append(f"{name}: skipped ({results[name]['skipped']}) but checked in baseline")
+    for name, result in results.items():
+        if "skipped" in result:
+            continue
+        before = baseline.get(name)
+        new = sorted(set(result["findings"]) - set(before["findings"] if before else []))
+        if new:
+            problems.append(f"{name}: {', '.join(new)} (not in baseline)")
+        elif before and "RATIO" in result["findings"] and result["ratio"] > before["ratio"] * tolerance:
+            problems.append(f"{name}: examined/returned ratio {before['ratio']} -> {result['ratio']}")
+    return problems
+
+
+def baseline_entry(result: dict) -> dict:
+    return {"findings": result["findings"], "ratio": result["ratio"], "indexes": result["indexes"]}
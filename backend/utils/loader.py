@@ -0,0 +1,72 @@
+"""Request-scoped batching of lookups by id (in the spirit of DataLoader).
+
+``Model.load(id)`` does not query right away: it queues the id and returns a
+:class:`Deferred`. The first ``.get()`` on any deferred of a loader fetches
+every id queued so far with one ``$in`` query, and the results stay cached
+for the rest of the request. A listing therefore resolves its references in a
+constant number of queries by queueing all of them before reading any::
+
+    rows = [(item, Student.load(item["student_id"])) for item in items]
+    return jsonify([serialize_admin_lost_item(item, student.get()) for item, student in rows])
+
+References of references (a retrieval's claim, then the claim's items) take
+one more such pass per level. Loaders live on ``flask.g``, one per
+collection and campus; they do not see writes made later in the request.
+"""
+from bson import ObjectId
+from flask import g
+
+from .tenancy import current_campus
+
+
+class Deferred:
+    """A document that will be fetched with the next batch of its loader."""
+
+    def __init__(self, loader, key):
+        self._loader = loader
+        self._key = key
+
+    def get(self):
+        """The document, or ``None`` if it does not exist."""
+        if self._key is None:
+            return None
+        if self._key not in self._loader.cache:
+            self._loader.dispatch()
+        return self._loader.cache.get(self._key)
+
+
+class BatchLoader:
+    """Batches and caches ``fetch_many(ids) -> {id: document}`` calls."""
+
+    def __init__(self, fetch_many):
+        self.fetch_many = fetch_many
+        self.cache: dict = {}
+        self.pending: dict = {}
+
+    def load(self, key) -> Deferred:
+        if key is not None:
+            key = ObjectId(key)
+            if key not in self.cache:
+                self.pending[key] = None
+        return Deferred(self, key)
+
+    def load_many(self, keys) -> list[Deferred]:
+        return [self.load(key) for key in keys]
+
+    def dispatch(self) -> None:
+        """Fetch every queued id in one call."""
+        keys, self.pending = list(self.pending), {}
+        if not keys:
+            return
+        found = self.fetch_many(keys)
+        for key in keys:
+            self.cache[key] = found.get(key)
+
+
+def loader(name: str, fetch_many) -> BatchLoader:
+    """The current request's loader ``name`` (for the current campus), created on first use."""
+    loaders = g.setdefault("loaders", {})
+    key = (name, current_campus())
+    if key not in loaders:
+        loaders[key] = BatchLoader(fetch_many)
+    return loaders[key]
@@ -0,0 +1,120 @@
+"""Canonical campus locations: building -> floor -> room, with aliases.
+
+The registry of a campus is loaded from a JSON file (``flask load-locations``)::
+
+    {"buildings": [
+        {"id": "library", "name": "Main Library", "aliases": ["lib"],
+         "floors": [
+            {"id": "2", "name": "2nd floor", "aliases": ["reading room"],
+             "rooms": [{"id": "201", "name": "Group study 201"}]}]}]}
+
+Canonical ids are the ``/``-joined path (``library``, ``library/2``,
+``library/2/201``). A building is known by its id, name and aliases. Floors and
+rooms are known by their canonical id and aliases, and by their name and
+generated forms ("floor 2", "room 201") combined with a building alias
+("library 2nd floor", "2nd floor main library"). A bare "2nd floor" exists in
+every building, so it is not an alias on its own.
+
+Free text resolves to the location whose alias covers the longest run of its
+words, preferring the most specific location on ties. "Library", "main
+library" and "library 2nd floor" thus map to ``library``, ``library`` and
+``library/2``.
+"""
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Spellings normalized away before aliases are compared
+SYNONYMS = {
+    "first": "1", "1st": "1", "second": "2", "2nd": "2", "third": "3", "3rd": "3",
+    "fourth": "4", "4th": "4", "fifth": "5", "5th": "5", "ground": "0", "basement": "b",
+    "level": "floor", "fl": "floor", "flr": "floor", "rm": "room", "bldg": "building",
+}
+# Longest phrase of an item's location tried against the aliases
+MAX_PHRASE_WORDS = 6
+
+
+def normalize(text: str | None) -> str:
+    """Lowercase words with punctuation dropped and :data:`SYNONYMS` applied."""
+    if not text:
+        return ""
+    return " ".join(SYNONYMS.get(word, word) for word in _WORD_RE.findall(text.lower()))
+
+
+def phrases(text: str | None) -> list[str]:
+    """Every run of up to :data:`MAX_PHRASE_WORDS` consecutive words of ``text``, normalized."""
+    words = normalize(text).split()
+    return list(dict.fromkeys(
+        " ".join(words[start:end])
+        for start in range(len(words))
+        for end in range(start + 1, min(start + MAX_PHRASE_WORDS, len(words)) + 1)
+    ))
+
+
+def best_match(text: str | None, candidates: list[dict]) -> str | None:
+    """The canonical id among ``candidates`` (registry documents) that best covers ``text``."""
+    found = set(phrases(text))
+    best, best_rank = None, (0, 0)
+    for location in candidates:
+        covered = max((len(alias.split()) for alias in location["aliases"] if alias in found), default=0)
+        if not covered:
+            continue
+        rank = (covered, len(location["path"]))
+        if rank > best_rank:
+            best, best_rank = location["location_id"], rank
+    return best
+
+
+class RegistryError(ValueError):
+    pass
+
+
+def _local_aliases(kind: str, node: dict) -> set[str]:
+    local = {normalize(node.get("name")), normalize(f"{kind} {node['id']}")}
+    if kind == "floor":
+        local.add(normalize(f"{node['id']} floor"))
+    else:
+        local.add(normalize(str(node["id"])))
+    return {alias for alias in local if alias}
+
+
+def build_registry(data: dict) -> list[dict]:
+    """Registry documents (without campus) for a parsed registry file."""
+    documents, seen = [], set()
+
+    def add(kind: str, node: dict, parent: dict | None, global_aliases: set[str]) -> dict:
+        if not node.get("id"):
+            raise RegistryError(f"A {kind} without an id: {node}")
+        location_id = f"{parent['location_id']}/{node['id']}" if parent else str(node["id"])
+        if location_id in seen:
+            raise RegistryError(f"Duplicate location id '{location_id}'")
+        seen.add(location_id)
+        aliases = global_aliases | {normalize(alias) for alias in node.get("aliases", [])}
+        aliases.add(normalize(location_id))
+        doc = {
+            "location_id": location_id,
+            "name": node.get("name") or str(node["id"]),
+            "kind": kind,
+            "parent": parent["location_id"] if parent else None,
+            "path": (parent["path"] if parent else []) + [location_id],
+            "aliases": sorted(alias for alias in aliases if alias),
+        }
+        documents.append(doc)
+        return doc
+
+    for building in data.get("buildings", []):
+        names = {normalize(building.get("name")), normalize(str(building.get("id", "")))}
+        building_doc = add("building", building, None, names)
+        # Aliases of the building that qualify its floors and rooms
+        qualifiers = set(building_doc["aliases"])
+
+        def qualified(local: set[str]) -> set[str]:
+            return {f"{q} {a}" for q in qualifiers for a in local} | {f"{a} {q}" for q in qualifiers for a in local}
+
+        for floor in building.get("floors", []):
+            floor_doc = add("floor", floor, building_doc, qualified(_local_aliases("floor", floor)))
+            for room in floor.get("rooms", []):
+                add("room", room, floor_doc, qualified(_local_aliases("room", room)))
+        for room in building.get("rooms", []):
+            add("room", room, building_doc, qualified(_local_aliases("room", room)))
+    return documents
@@ -0,0 +1,123 @@
+"""Query planning for on-demand match suggestions.
+
+Instead of OR-ing every word of a lost item's description into one ``$text``
+query, the planner keeps the few highest-weighted keywords and prunes the
+candidate set up front: only unclaimed found items in the same or a related
+category, reported no earlier than ``date_lost`` minus a tolerance, and
+optionally at a given location or anywhere below it.
+"""
+from datetime import timedelta
+
+from backend.models.models import FOUND_ACTIVE_STATUS
+from backend.utils.matching import FIELD_WEIGHTS, tokenize
+
+# Categories whose items are often filed under one another
+RELATED_CATEGORIES = [
+    {"Electronics", "Laptops & Tablets", "Audio Equipment"},
+    {"Keys & Cards", "Wallets & Purses", "Documents & IDs"},
+    {"Bags & Backpacks", "Personal Items"},
+    {"Clothing & Accessories", "Watches & Jewelry", "Eyewear"},
+]
+
+# Finders who are unsure pick this, so it is always searched
+FALLBACK_CATEGORY = "Other"
+
+# Category is a filter and the serial number has its own exact-match step,
+# so neither contributes keywords.
+KEYWORD_FIELDS = {f: w for f, w in FIELD_WEIGHTS.items() if f not in ("category", "serial_number")}
+
+
+def related_categories(category: str | None) -> list[str] | None:
+    """The category plus its related ones, or ``None`` when no restriction applies."""
+    if not category or category == FALLBACK_CATEGORY:
+        return None
+    related = {category, FALLBACK_CATEGORY}
+    for group in RELATED_CATEGORIES:
+        if category in group:
+            related |= group
+    return sorted(related)
+
+
+def ranked_keywords(item: dict) -> list[str]:
+    """Keywords ordered by summed field weight (ties keep first-seen order)."""
+    weights: dict[str, int] = {}
+    for field, weight in KEYWORD_FIELDS.items():
+        for token in tokenize(item.get(field)):
+            weights[token] = weights.get(token, 0) + weight
+    return [term for term, _ in sorted(weights.items(), key=lambda kv: -kv[1])]
+
+
+class MatchPlan:
+    """The query the planner chose for one lost item, and why."""
+
+    def __init__(self, terms: list[str], categories: list[str] | None, created_after, dropped_terms: int,
+                 location: dict | None = None):
+        self.terms = terms
+        self.categories = categories
+        self.created_after = created_after
+        self.dropped_terms = dropped_terms
+        # Query fragment from Location.filter_query
+        self.location = location
+
+    @property
+    def strategy(self) -> str:
+        # Without usable keywords, fall back to the newest items in the candidate window
+        return "text" if self.terms else "recent_in_window"
+
+    @property
+    def filter(self) -> dict:
+        query = {"status": FOUND_ACTIVE_STATUS}
+        if self.categories:
+            query["category"] = {"$in": self.categories}
+        if self.created_after:
+            query["created_at"] = {"$gte": self.created_after}
+        if self.location:
+            query.update(self.location)
+        return query
+
+    @property
+    def text_query(self) -> str:
+        return " ".join(self.terms)
+
+    def to_dict(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "terms": self.terms,
+            "dropped_terms": self.dropped_terms,
+            "categories": self.categories,
+            "created_after": self.created_after.isoformat() if self.created_after else None,
+            "location": self.location,
+        }
+
+
+def plan_match_query(lost: dict, max_terms: int = 8, date_tolerance_days: int = 2,
+                     location: dict | None = None) -> MatchPlan:
+    all_terms = ranked_keywords(lost)
+    date_lost = lost.get("date_lost")
+    return MatchPlan(
+        terms=all_terms[:max_terms],
+        categories=related_categories(lost.get("category")),
+        created_after=date_lost - timedelta(days=date_tolerance_days) if date_lost else None,
+        dropped_terms=max(len(all_terms) - max_terms, 0),
+        location=location,
+    )
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Condense a MongoDB explain document to the winning plan's stages and indexes."""
+    stages, indexes = [], []
+    plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    # Slot-based engine wraps the classic tree in queryPlan
+    plan = plan.get("queryPlan", plan)
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not node:
+            continue
+        stages.append(node.get("stage"))
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        pending.extend(node.get("inputStages", []))
+        if node.get("inputStage"):
+            pending.append(node["inputStage"])
+    return {"stages": stages, "indexes": indexes}
@@ -0,0 +1,230 @@
+"""Batch reconciliation of all open lost items against all unclaimed found items.
+
+Both sides are turned into TF-IDF vectors (SciPy sparse matrices) and compared
+block by block, so memory stays bounded by ``block_size x found items`` no
+matter how many lost items there are. Text similarity is combined with
+category, serial number and date-proximity features, and the top-k found items
+per lost item are written to ``match_candidates`` in a single ``bulk_write``.
+"""
+import math
+import re
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+from pymongo import DeleteMany, ReplaceOne
+from scipy import sparse
+
+from backend.models.models import FOUND_ACTIVE_STATUS, LOST_ACTIVE_STATUS
+from backend.utils.events import match_events, notify
+from backend.utils.tenancy import current_campus, database, scoped
+
+# Same relative weights as the MongoDB text indexes
+FIELD_WEIGHTS = {"title": 10, "description": 5, "category": 3, "location": 2, "serial_number": 8}
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not
+now of off on once only or other our out over own same she should so some such than that the their
+them then there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours lost found item items
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Score weights for the combined ranking
+TEXT_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.25
+SERIAL_WEIGHT = 2.0
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase alphanumeric tokens with stopwords and single characters removed."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def weighted_terms(item: dict) -> dict[str, float]:
+    """Term -> summed field weight for one lost/found item."""
+    terms: dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(item.get(field)):
+            terms[token] = terms.get(token, 0.0) + weight
+    return terms
+
+
+def normalize_serial(serial: str | None) -> str | None:
+    if not serial:
+        return None
+    cleaned = re.sub(r"[^0-9a-z]", "", serial.lower())
+    return cleaned or None
+
+
+def _tfidf_matrices(lost_docs: list[dict], found_docs: list[dict]):
+    """Build L2-normalised TF-IDF CSR matrices over a shared vocabulary."""
+    vocabulary: dict[str, int] = {}
+    rows, cols, values = [], [], []
+    for row, doc in enumerate(lost_docs + found_docs):
+        for term, weight in weighted_terms(doc).items():
+            col = vocabulary.setdefault(term, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+            values.append(1.0 + math.log(weight))
+
+    n_docs = len(lost_docs) + len(found_docs)
+    counts = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+        shape=(n_docs, max(len(vocabulary), 1)),
+    )
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = (np.log((1.0 + n_docs) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    weighted = counts.multiply(idf).tocsr()
+
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    weighted = sparse.diags(1.0 / norms).dot(weighted).astype(np.float32).tocsr()
+
+    split = len(lost_docs)
+    return weighted[:split], weighted[split:]
+
+
+def _epoch_seconds(values: list, missing: float) -> np.ndarray:
+    return np.array([v.timestamp() if isinstance(v, datetime) else missing for v in values], dtype=np.float64)
+
+
+def compute_candidates(lost_docs: list[dict], found_docs: list[dict], top_k: int = 10,
+                       block_size: int = 256, date_tolerance_days: int = 2, min_score: float = 0.1):
+    """Yield ``(lost_doc, [candidate, ...])`` with the best found items for every lost item.
+
+    A found item is only a candidate if it was reported no earlier than
+    ``date_lost - date_tolerance_days``.
+    """
+    if not lost_docs or not found_docs:
+        for lost in lost_docs:
+            yield lost, []
+        return
+
+    lost_vectors, found_vectors = _tfidf_matrices(lost_docs, found_docs)
+    found_vectors_t = found_vectors.T.tocsr()
+
+    categories: dict[str, int] = {}
+    def category_code(doc):
+        value = (doc.get("category") or "").strip().lower()
+        return categories.setdefault(value, len(categories)) if value else -1
+    lost_category = np.array([category_code(d) for d in lost_docs])
+    found_category = np.array([category_code(d) for d in found_docs])
+
+    tolerance = timedelta(days=date_tolerance_days).total_seconds()
+    lost_earliest = _epoch_seconds([d.get("date_lost") for d in lost_docs], -np.inf) - tolerance
+    found_created = _epoch_seconds([d.get("created_at") for d in found_docs], np.inf)
+
+    found_by_serial: dict[str, list[int]] = {}
+    for j, doc in enumerate(found_docs):
+        serial = normalize_serial(doc.get("serial_number"))
+        if serial:
+            found_by_serial.setdefault(serial, []).append(j)
+
+    k = min(top_k, len(found_docs))
+    for start in range(0, len(lost_docs), block_size):
+        stop = min(start + block_size, len(lost_docs))
+        text = (lost_vectors[start:stop] @ found_vectors_t).toarray()
+
+        same_category = (lost_category[start:stop, None] == found_category[None, :]) & (lost_category[start:stop, None] >= 0)
+        score = TEXT_WEIGHT * text + CATEGORY_WEIGHT * same_category
+        serial_match = np.zeros_like(same_category)
+        for i in range(start, stop):
+            serial = normalize_serial(lost_docs[i].get("serial_number"))
+            for j in found_by_serial.get(serial, ()) if serial else ():
+                serial_match[i - start, j] = True
+        score += SERIAL_WEIGHT * serial_match
+
+        # Found before it could have been lost, or no textual/serial evidence at all
+        impossible = found_created[None, :] < lost_earliest[start:stop, None]
+        score[impossible | ((text <= 0) & ~serial_match)] = -np.inf
+
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        for row in range(stop - start):
+            order = top[row][np.argsort(-score[row, top[row]])]
+            candidates = [
+                {
+                    "found_item_id": found_docs[j]["_id"],
+                    "score": round(float(score[row, j]), 4),
+                    "text_score": round(float(text[row, j]), 4),
+                    "same_category": bool(same_category[row, j]),
+                    "serial_match": bool(serial_match[row, j]),
+                }
+                for j in order if score[row, j] >= min_score
+            ]
+            yield lost_docs[start + row], candidates
+
+
+def reconcile_matches(top_k: int = 10, block_size: int = 256, date_tolerance_days: int = 2,
+                      run_id: ObjectId | None = None) -> dict:
+    """Recompute ``match_candidates`` for every pending lost item of the current campus.
+
+    Only documents whose candidate list changed are rewritten, and candidates
+    of lost items that are no longer pending are removed, all in one bulk write.
+    Each document records the found items that were not candidates before
+    (``new_found_item_ids``); only those produce ``new_match`` events, so a
+    reordered or shrunk list is stored without notifying the student.
+    """
+    if top_k < 1 or block_size < 1:
+        raise ValueError(f"top_k and block_size must be at least 1, not {top_k} and {block_size}")
+    started = time.monotonic()
+    db = database()
+    text_fields = {field: 1 for field in FIELD_WEIGHTS}
+    lost_docs = list(db.lost_items.find(
+        scoped({"status": LOST_ACTIVE_STATUS}), {**text_fields, "student_id": 1, "date_lost": 1}
+    ))
+    found_docs = list(db.found_items.find(
+        scoped({"status": FOUND_ACTIVE_STATUS}), {**text_fields, "created_at": 1}
+    ))
+    previous = {
+        doc["_id"]: doc.get("found_item_ids", [])
+        for doc in db.match_candidates.find(scoped(), {"found_item_ids": 1})
+    }
+
+    computed_at = datetime.utcnow()
+    operations = []
+    changed = []
+    for lost, candidates in compute_candidates(lost_docs, found_docs, top_k=top_k, block_size=block_size,
+                                               date_tolerance_days=date_tolerance_days):
+        found_item_ids = [c["found_item_id"] for c in candidates]
+        before = previous.get(lost["_id"])
+        if before == found_item_ids:
+            continue
+        known = set(before or ())
+        document = {
+            "student_id": lost.get("student_id"),
+            "campus": current_campus(),
+            "found_item_ids": found_item_ids,
+            "new_found_item_ids": [found_id for found_id in found_item_ids if found_id not in known],
+            "candidates": candidates,
+            "run_id": run_id,
+            "computed_at": computed_at,
+        }
+        operations.append(ReplaceOne({"_id": lost["_id"]}, document, upsert=True))
+        changed.append({"_id": lost["_id"], **document})
+    pending_ids = {doc["_id"] for doc in lost_docs}
+    stale = [lost_id for lost_id in previous if lost_id not in pending_ids]
+    if stale:
+        operations.append(DeleteMany({"_id": {"$in": stale}}))
+
+    written = removed = 0
+    if operations:
+        result = db.match_candidates.bulk_write(operations, ordered=False)
+        written = result.upserted_count + result.modified_count
+        removed = result.deleted_count
+        for document in changed:
+            notify(match_events(document))
+
+    return {
+        "lost_items": len(lost_docs),
+        "found_items": len(found_docs),
+        "written": written,
+        "removed": removed,
+        "seconds": round(time.monotonic() - started, 3),
+    }
@@ -0,0 +1,75 @@
+"""Per-request recording of the MongoDB commands an operation issues.
+
+``command_recorder`` is registered on the app's ``MongoClient``. Outside of a
+:func:`record_commands` block it does nothing beyond a context-variable lookup;
+inside one, every command started in the current thread (or task) is appended
+to the block's list with its duration, so benchmarks and the profiler can
+report "Mongo ops per request".
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from pymongo import monitoring
+
+_active: ContextVar[list | None] = ContextVar("mongo_commands", default=None)
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self):
+        # request_id -> record still waiting for its completion event
+        self._pending: dict[int, dict] = {}
+
+    def started(self, event):
+        commands = _active.get()
+        if commands is None:
+            return
+        record = {
+            "command": event.command_name,
+            "collection": _collection(event),
+            "database": event.database_name,
+            "duration_ms": None,
+            "ok": None,
+        }
+        commands.append(record)
+        self._pending[event.request_id] = record
+
+    def succeeded(self, event):
+        self._finish(event, ok=True)
+
+    def failed(self, event):
+        self._finish(event, ok=False)
+
+    def _finish(self, event, ok: bool):
+        record = self._pending.pop(event.request_id, None)
+        if record is not None:
+            record["duration_ms"] = round(event.duration_micros / 1000, 3)
+            record["ok"] = ok
+
+
+def _collection(event):
+    value = event.command.get(event.command_name)
+    return value if isinstance(value, str) else None
+
+
+command_recorder = CommandRecorder()
+
+
+@contextmanager
+def record_commands():
+    """Collect the commands issued inside the block; yields the (growing) list of records."""
+    commands: list[dict] = []
+    token = _active.set(commands)
+    try:
+        yield commands
+    finally:
+        _active.reset(token)
+
+
+def summarize_commands(commands: list[dict]) -> dict:
+    """Count and total duration per command name, e.g. ``{"find": {"count": 3, "ms": 1.2}}``."""
+    summary: dict[str, dict] = {}
+    for record in commands:
+        entry = summary.setdefault(record["command"], {"count": 0, "ms": 0.0})
+        entry["count"] += 1
+        entry["ms"] = round(entry["ms"] + (record["duration_ms"] or 0.0), 3)
+    return summary
@@ -0,0 +1,248 @@
+"""Opt-in profiling of individual requests.
+
+A request is profiled when it carries an ``X-Profile`` header holding the JWT
+of a user whose stored role is admin, or when it is picked by ``PROFILING_SAMPLE_RATE``. While it runs we
+collect either a cProfile profile (``cprofile`` mode, exact call counts but
+noticeable overhead) or periodic stack samples of the request thread
+(``sample`` mode, cheap enough for sampling in production), plus every MongoDB
+command it issues (see :mod:`backend.utils.mongo_monitor`).
+
+Finished profiles go to the capped ``request_profiles`` collection, a ring
+buffer shared by all workers; the response carries their id in
+``X-Profile-Id`` and admins fetch them from ``/api/admin/profiles/<id>``.
+"""
+import cProfile
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
+from urllib.parse import urlencode
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app, g, request
+from jose import jwt
+
+from .mongo_monitor import record_commands, summarize_commands
+from .tenancy import UnknownCampusError, campus_context
+
+MODES = ("cprofile", "sample")
+# Query parameters never written to a stored profile (the SSE stream takes its JWT as ?token=)
+REDACTED_PARAMS = frozenset({"token"})
+
+
+def _profiled_path() -> str:
+    """The request path and query string, without ``REDACTED_PARAMS``."""
+    query = urlencode([(k, v) for k, v in request.args.items(multi=True) if k not in REDACTED_PARAMS])
+    return f"{request.path}?{query}" if query else request.path
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[_collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        """The samples in the folded format read by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ActiveProfile:
+    """Profiling state of the request being served (kept on ``flask.g``)."""
+
+    def __init__(self, mode: str, trigger: str, sample_interval_s: float):
+        self.id = ObjectId()
+        self.mode = mode
+        self.trigger = trigger
+        self.status = None
+        self._stack = ExitStack()
+        self.commands = self._stack.enter_context(record_commands())
+        self._profiler = None
+        self._sampler = None
+        if mode == "cprofile":
+            self._profiler = cProfile.Profile()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), sample_interval_s)
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.enable()
+        else:
+            self._sampler.start()
+
+    def stop(self) -> dict:
+        """Stop collecting and return the profile document."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        else:
+            self._sampler.stop()
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        self._stack.close()
+
+        doc = {
+            "_id": self.id,
+            "method": request.method,
+            "path": _profiled_path(),
+            "endpoint": request.endpoint,
+            "status": self.status,
+            "trigger": self.trigger,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "duration_ms": round(duration_ms, 3),
+            "mongo": {"commands": self.commands, "summary": summarize_commands(self.commands)},
+        }
+        if self._profiler is not None:
+            self._profiler.create_stats()
+            # Same bytes as Profile.dump_stats(), so the file loads with pstats/snakeviz
+            doc["pstats"] = marshal.dumps(self._profiler.stats)
+        else:
+            doc["collapsed"] = self._sampler.collapsed()
+            doc["samples"] = sum(self._sampler.counts.values())
+        return doc
+
+
+class _LoadedStats:
+    """Adapter letting ``pstats.Stats`` read stats that were already created."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def top_functions(profile: dict, limit: int = 20) -> list[dict]:
+    """The functions a stored profile spent the most time in."""
+    if profile.get("pstats"):
+        stats = pstats.Stats(_LoadedStats(marshal.loads(profile["pstats"])))
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": nc,
+                "own_ms": round(tt * 1000, 3),
+                "cumulative_ms": round(ct * 1000, 3),
+            }
+            for func, (cc, nc, tt, ct, callers) in rows
+        ]
+
+    # Sampled profiles: samples in which each function was running / on the stack
+    own, inclusive = Counter(), Counter()
+    for line in (profile.get("collapsed") or "").splitlines():
+        stack, _, count = line.rpartition(" ")
+        frames = stack.split(";")
+        own[frames[-1]] += int(count)
+        for name in set(frames):
+            inclusive[name] += int(count)
+    return [
+        {"function": name, "samples": samples, "own_samples": own[name]}
+        for name, samples in inclusive.most_common(limit)
+    ]
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores their profiles."""
+
+    def __init__(self, secret_key: str, sample_rate: float, mode: str, sample_interval_ms: float):
+        if mode not in MODES:
+            raise ValueError(f"PROFILING_MODE must be one of {', '.join(MODES)}, not '{mode}'")
+        self.secret_key = secret_key
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.sample_interval_s = sample_interval_ms / 1000
+
+    def _requested_by_admin(self) -> bool:
+        """Whether ``X-Profile`` holds the token of a user who is an admin now, looked up like ``admin_required``."""
+        token = request.headers.get("X-Profile", "").removeprefix("Bearer ").strip()
+        if not token:
+            return False
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
+        except jwt.JWTError:
+            return False
+        from ..models.models import Student  # noqa: WPS433 (models import the app package)
+        try:
+            with campus_context(payload.get("campus", current_app.config["DEFAULT_CAMPUS"])):
+                user = Student.find_by_id(payload["sub"])
+        except (KeyError, TypeError, UnknownCampusError, InvalidId):
+            return False
+        return bool(user) and user.get("role") == "admin"
+
+    def start(self) -> None:
+        if self._requested_by_admin():
+            trigger = "header"
+            mode = request.headers.get("X-Profile-Mode", self.mode)
+            mode = mode if mode in MODES else self.mode
+        elif self.sample_rate and random.random() < self.sample_rate:
+            trigger, mode = "sample", self.mode
+        else:
+            return
+        g.request_profile = ActiveProfile(mode, trigger, self.sample_interval_s)
+
+    def tag(self, response):
+        profile = g.get("request_profile")
+        if profile is not None:
+            profile.status = response.status_code
+            response.headers["X-Profile-Id"] = str(profile.id)
+        return response
+
+    def finish(self, exc=None) -> None:
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return
+        doc = profile.stop()
+        if exc is not None:
+            doc["status"] = 500
+            doc["error"] = repr(exc)
+        from ..models.models import RequestProfile  # noqa: WPS433 (models import the app package)
+
+        try:
+            RequestProfile.create(doc)
+        except Exception as store_exc:  # Never fail the request over its profile
+            current_app.logger.warning(f"Could not store request profile {profile.id}: {store_exc}")
+
+
+def init_profiling(app) -> RequestProfiler:
+    """Register the profiling hooks on ``app`` as ``app.extensions["profiler"]``."""
+    profiler = RequestProfiler(
+        app.config["SECRET_KEY"],
+        sample_rate=app.config["PROFILING_SAMPLE_RATE"],
+        mode=app.config["PROFILING_MODE"],
+        sample_interval_ms=app.config["PROFILING_SAMPLE_INTERVAL_MS"],
+    )
+    app.before_request(profiler.start)
+    app.after_request(profiler.tag)
+    app.teardown_request(profiler.finish)
+    app.extensions["profiler"] = profiler
+    return profiler
@@ -0,0 +1,82 @@
+"""Campus (tenant) scoping for model queries.
+
+Every document carries a ``campus`` field and every index starts with it, so
+each campus is its own index partition and ``campus`` can serve as the shard
+key prefix. With ``CAMPUS_PARTITIONING = "database"`` each campus additionally
+gets its own database (``<db>_<campus>``).
+
+The active campus lives on ``flask.g``: the auth decorators take it from the
+JWT, anonymous requests from the ``X-Campus`` header or ``campus`` parameter,
+and CLI commands / background threads set it with :func:`campus_context`.
+"""
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, request
+
+from backend.storage import storage
+
+CAMPUS_FIELD = "campus"
+
+
+class UnknownCampusError(ValueError):
+    pass
+
+
+def configured_campuses() -> list[str]:
+    return current_app.config["CAMPUSES"]
+
+
+def current_campus() -> str:
+    campus = g.get("campus") if has_app_context() else None
+    return campus or current_app.config["DEFAULT_CAMPUS"]
+
+
+def set_campus(campus: str) -> None:
+    if campus not in configured_campuses():
+        raise UnknownCampusError(f"Unknown campus '{campus}'")
+    g.campus = campus
+
+
+@contextmanager
+def campus_context(campus: str):
+    """Run model calls for ``campus`` outside of a request (CLI, background threads)."""
+    previous = g.get("campus")
+    set_campus(campus)
+    try:
+        yield
+    finally:
+        g.campus = previous
+
+
+def campus_from_request() -> str:
+    """Campus named by an anonymous request, falling back to the default campus."""
+    body = request.get_json(silent=True) if request.is_json else None
+    return (
+        request.headers.get("X-Campus")
+        or request.args.get("campus")
+        or (body or {}).get("campus")
+        or current_app.config["DEFAULT_CAMPUS"]
+    )
+
+
+def database_name(campus: str) -> str:
+    if current_app.config["CAMPUS_PARTITIONING"] == "database":
+        return f"{storage().db.name}_{campus}"
+    return storage().db.name
+
+
+def database(campus: str | None = None):
+    """The database holding ``campus``'s collections (the current campus by default)."""
+    return storage().client[database_name(campus or current_campus())]
+
+
+def partition_databases() -> list:
+    """Every distinct database in use, e.g. for creating indexes."""
+    names = dict.fromkeys(database_name(c) for c in configured_campuses())
+    client = storage().client
+    return [client[name] for name in names]
+
+
+def scoped(query: dict | None = None) -> dict:
+    """``query`` restricted to the current campus."""
+    return {CAMPUS_FIELD: current_campus(), **(query or {})}
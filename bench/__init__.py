@@ -0,0 +1,7 @@
+"""Endpoint benchmarks against a seeded MongoDB dataset.
+
+    python -m bench.run --scale 100k
+    python -m bench.compare bench/results/100k-a1b2c3d.json bench/results/100k-e4f5a6b.json
+
+See backend/README.md ("Benchmarks") for details.
+"""
@@ -0,0 +1,50 @@
+"""Compare two benchmark result files.
+
+    python -m bench.compare bench/results/100k-a1b2c3d.json bench/results/100k-e4f5a6b.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = [("p50", "latency_ms"), ("p95", "latency_ms"), ("p99", "latency_ms"), ("mean", "mongo_ops_per_request")]
+
+
+def _change(before, after) -> str:
+    if before in (None, 0) or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(baseline: dict, candidate: dict) -> list[str]:
+    lines = []
+    for key in ("scale", "seed", "engine", "mongod"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            lines.append(f"warning: {key} differs ({baseline['meta'].get(key)} vs {candidate['meta'].get(key)})")
+    lines.append(f"{'scenario':<20} {'metric':<8} {baseline['meta'].get('commit') or 'baseline':>12} "
+                 f"{candidate['meta'].get('commit') or 'candidate':>12} {'change':>9}")
+    for name, before in baseline["scenarios"].items():
+        after = candidate["scenarios"].get(name)
+        if after is None:
+            lines.append(f"{name:<20} missing from candidate")
+            continue
+        for metric, section in METRICS:
+            label = "ops/req" if section == "mongo_ops_per_request" else metric
+            old, new = before[section][metric], after[section][metric]
+            lines.append(f"{name:<20} {label:<8} {old if old is not None else '-':>12} "
+                         f"{new if new is not None else '-':>12} {_change(old, new):>9}")
+    return lines
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two bench.run result files")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args(argv)
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    sys.stdout.write("\n".join(compare(baseline, candidate)) + "\n")
+
+
+if __name__ == "__main__":
+    main()
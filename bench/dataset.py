@@ -0,0 +1,283 @@
+"""Seeded generator for realistic benchmark datasets.
+
+The same ``scale`` and ``seed`` always produce the same documents (including
+``_id`` values), so results from different commits are comparable. About a
+third of the found items correspond to a lost item (same kind of object,
+often the same serial number or passkey); some of those pairs have claims in
+various states, and retrieved claims have a retrieval record.
+"""
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
+
+from backend.models.models import Marker, Stats, ensure_indexes
+from backend.utils.tenancy import current_campus, database
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Every generated account uses this password
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.example"
+
+COLLECTIONS = ["students", "lost_items", "found_items", "lost_items_archive", "found_items_archive",
+               "claims", "retrievals", "match_candidates", "match_runs", "stats"]
+
+OBJECTS = {
+    "Electronics": ["phone", "power bank", "phone charger", "calculator", "USB drive", "smartwatch"],
+    "Books & Notebooks": ["notebook", "textbook", "lab manual", "sketchbook", "planner"],
+    "Clothing & Accessories": ["jacket", "hoodie", "scarf", "cap", "umbrella", "gloves"],
+    "Bags & Backpacks": ["backpack", "tote bag", "laptop bag", "gym bag", "pencil case"],
+    "Keys & Cards": ["key ring", "student ID card", "access card", "car key", "bike key"],
+    "Documents & IDs": ["passport", "driving licence", "bank card", "certificate folder"],
+    "Laptops & Tablets": ["laptop", "tablet", "e-reader", "laptop charger"],
+    "Audio Equipment": ["earbuds", "headphones", "bluetooth speaker", "earbud case"],
+    "Eyewear": ["glasses", "sunglasses", "glasses case", "contact lens case"],
+    "Watches & Jewelry": ["watch", "bracelet", "necklace", "ring", "earrings"],
+    "Sports Equipment": ["football", "tennis racket", "yoga mat", "water bottle", "cricket bat"],
+    "Personal Items": ["water bottle", "lunch box", "makeup pouch", "toiletry bag"],
+    "Vehicle Items": ["helmet", "bike lock", "parking permit", "bike light"],
+    "Wallets & Purses": ["wallet", "purse", "card holder", "coin pouch"],
+    "Tools & Equipment": ["multimeter", "drawing kit", "scientific calculator", "toolkit"],
+    "Food & Beverages": ["thermos", "coffee mug", "lunch bag"],
+    "Other": ["umbrella", "keychain", "badge", "plushie"],
+}
+BRANDS = ["Apple", "Samsung", "Dell", "HP", "Lenovo", "Sony", "JBL", "Nike", "Adidas", "Casio",
+          "Fossil", "Ray-Ban", "Puma", "Skullcandy", "Boat", "Wildcraft", "American Tourister"]
+COLORS = ["black", "white", "blue", "red", "green", "grey", "silver", "pink", "brown", "navy", "yellow"]
+DETAILS = [
+    "with a cracked corner", "with a name sticker", "in a black case", "with a keychain attached",
+    "slightly scratched", "with initials engraved", "with a blue strap", "almost new",
+    "with a university logo", "with a small dent", "with a torn pocket", "with stickers on the back",
+]
+LOCATIONS = [
+    "Main Library", "Science Block", "Cafeteria", "Gym", "Lecture Hall A", "Lecture Hall B",
+    "Student Union", "Computer Lab 2", "Parking Lot C", "Bus Stop", "Hostel Block D", "Auditorium",
+]
+# Categories whose objects usually carry a serial number
+SERIAL_CATEGORIES = {"Electronics", "Laptops & Tablets", "Audio Equipment", "Watches & Jewelry"}
+
+CLAIM_STATUSES = ["pending", "approved", "rejected", "retrieved"]
+CLAIM_WEIGHTS = [0.35, 0.2, 0.15, 0.3]
+
+BATCH_SIZE = 5_000
+PAIRED_FRACTION = 0.3
+CLAIMED_FRACTION = 1 / 3
+
+
+class _Generator:
+    def __init__(self, n_items: int, seed: int, now: datetime):
+        self.rng = random.Random(seed)
+        self.n_items = n_items
+        self.now = now
+        self.campus = current_campus()
+
+    def object_id(self, when: datetime) -> ObjectId:
+        return ObjectId(int(when.timestamp()).to_bytes(4, "big") + self.rng.randbytes(8))
+
+    def when(self, max_days: int = 365) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(max_days * 86_400))
+
+    def passkey(self) -> str:
+        return "".join(self.rng.choices("ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz23456789", k=8))
+
+    def serial(self) -> str:
+        return f"SN-{self.rng.randrange(16 ** 10):010X}"
+
+    def students(self, count: int, password_hash: str):
+        for i in range(count):
+            created = self.when()
+            yield {
+                "_id": self.object_id(created),
+                "email": ADMIN_EMAIL if i == 0 else f"student{i}@bench.example",
+                "name": "Bench Admin" if i == 0 else f"Student {i}",
+                "password": password_hash,
+                "role": "admin" if i == 0 else "student",
+                "campus": self.campus,
+                "created_at": created,
+            }
+
+    def describe(self, obj: str, color: str, brand: str | None):
+        title = " ".join(p for p in (color.capitalize(), brand, obj) if p)
+        description = (
+            f"{color} {brand + ' ' if brand else ''}{obj} {self.rng.choice(DETAILS)}, "
+            f"{self.rng.choice(DETAILS)}"
+        )
+        return title, description
+
+    def item(self, category: str | None = None, obj: str | None = None, color: str | None = None,
+             brand: str | None = None, location: str | None = None):
+        category = category or self.rng.choice(list(OBJECTS))
+        obj = obj or self.rng.choice(OBJECTS[category])
+        color = color or self.rng.choice(COLORS)
+        if brand is None and self.rng.random() < 0.6:
+            brand = self.rng.choice(BRANDS)
+        title, description = self.describe(obj, color, brand)
+        return {
+            "title": title,
+            "description": description,
+            "category": category,
+            "location": location or self.rng.choice(LOCATIONS),
+            "serial_number": self.serial() if category in SERIAL_CATEGORIES and self.rng.random() < 0.7 else None,
+            "passkey": self.passkey(),
+            "campus": self.campus,
+        }, (category, obj, color, brand)
+
+    def items(self, student_ids: list, admin_id):
+        """Yield ``(lost, found, claim, retrieval)``; claim/retrieval may be ``None``."""
+        for _ in range(self.n_items):
+            lost, traits = self.item()
+            date_lost = self.when()
+            created = min(date_lost + timedelta(hours=self.rng.randrange(1, 48)), self.now)
+            lost.update({
+                "_id": self.object_id(created),
+                "date_lost": date_lost,
+                "student_id": self.rng.choice(student_ids),
+                "status": "pending",
+                "created_at": created,
+            })
+
+            paired = self.rng.random() < PAIRED_FRACTION
+            if paired:
+                # Same object, reported independently by the finder
+                found, _ = self.item(*traits, location=lost["location"] if self.rng.random() < 0.7 else None)
+                if lost["serial_number"] and self.rng.random() < 0.8:
+                    found["serial_number"] = lost["serial_number"]
+                if self.rng.random() < 0.2:
+                    found["passkey"] = lost["passkey"]
+                found_created = min(date_lost + timedelta(hours=self.rng.randrange(1, 96)), self.now)
+            else:
+                found, _ = self.item()
+                found_created = self.when()
+            found.update({
+                "_id": self.object_id(found_created),
+                "finder_id": self.rng.choice(student_ids),
+                "status": "unclaimed",
+                "created_at": found_created,
+            })
+
+            claim = retrieval = None
+            if paired and self.rng.random() < CLAIMED_FRACTION:
+                status = self.rng.choices(CLAIM_STATUSES, CLAIM_WEIGHTS)[0]
+                claimed_at = max(lost["created_at"], found_created) + timedelta(hours=self.rng.randrange(1, 72))
+                claim = {
+                    "_id": self.object_id(claimed_at),
+                    "lost_item_id": lost["_id"],
+                    "found_item_id": found["_id"],
+                    "student_id": lost["student_id"],
+                    "status": status,
+                    "campus": self.campus,
+                    "created_at": claimed_at,
+                }
+                if status != "pending":
+                    claim["updated_at"] = claimed_at + timedelta(hours=self.rng.randrange(1, 48))
+                if status in ("approved", "retrieved"):
+                    lost.update(status="found", updated_at=claim["updated_at"])
+                    found.update(status="claimed", updated_at=claim["updated_at"])
+                if status == "retrieved":
+                    retrieved_at = claim["updated_at"] + timedelta(hours=self.rng.randrange(1, 72))
+                    retrieval = {
+                        "_id": self.object_id(retrieved_at),
+                        "claim_id": claim["_id"],
+                        "student_id": claim["student_id"],
+                        "admin_id": admin_id,
+                        "retrieval_location": self.rng.choice(["Main Office", "Security Desk", "Library Desk"]),
+                        "notes": self.rng.choice(["", "ID checked", "Collected by owner", "Collected by friend"]),
+                        "retrieval_date": retrieved_at,
+                        "campus": self.campus,
+                        "created_at": retrieved_at,
+                    }
+            yield lost, found, claim, retrieval
+
+
+def search_query(rng: random.Random) -> str:
+    """A search like users type: an object, optionally with a colour or brand."""
+    obj = rng.choice(rng.choice(list(OBJECTS.values())))
+    style = rng.random()
+    if style < 0.4:
+        return obj
+    if style < 0.8:
+        return f"{rng.choice(COLORS)} {obj}"
+    return f"{rng.choice(BRANDS)} {obj}"
+
+
+def found_item_payload(rng: random.Random) -> dict:
+    """Request body for ``POST /api/found-items``."""
+    category = rng.choice(list(OBJECTS))
+    obj = rng.choice(OBJECTS[category])
+    color = rng.choice(COLORS)
+    return {
+        "title": f"{color.capitalize()} {obj}",
+        "description": f"{color} {obj} found near the {rng.choice(LOCATIONS).lower()}",
+        "category": category,
+        "location": rng.choice(LOCATIONS),
+    }
+
+
+def lost_item_payload(rng: random.Random, date_lost: datetime) -> dict:
+    """Request body for ``POST /api/lost-items``."""
+    category = rng.choice(list(OBJECTS))
+    obj = rng.choice(OBJECTS[category])
+    color = rng.choice(COLORS)
+    payload = {
+        "title": f"{color.capitalize()} {obj}",
+        "description": f"{color} {obj} {rng.choice(DETAILS)}",
+        "category": category,
+        "location": rng.choice(LOCATIONS),
+        "date_lost": date_lost.isoformat(),
+    }
+    if category in SERIAL_CATEGORIES and rng.random() < 0.5:
+        payload["serialNumber"] = f"SN-{rng.randrange(16 ** 10):010X}"
+    return payload
+
+
+def _flush(db, buffers: dict) -> None:
+    for name, docs in buffers.items():
+        if docs:
+            db[name].insert_many(docs, ordered=False)
+            docs.clear()
+
+
+def generate(scale: str, seed: int = 42) -> dict:
+    """Replace the current campus's data with a generated dataset; returns document counts.
+
+    Must run inside an app context. Drops the benchmark collections first.
+    """
+    n_items = SCALES[scale]
+    db = database()
+    for name in COLLECTIONS:
+        db.drop_collection(name)
+    ensure_indexes()
+
+    generator = _Generator(n_items, seed, now=datetime(2025, 6, 1))
+    password_hash = generate_password_hash(PASSWORD)
+    # One student per ten items; the first account is the admin
+    students = list(generator.students(max(n_items // 10, 10), password_hash))
+    db.students.insert_many(students, ordered=False)
+    Marker.claim(Marker.FIRST_ADMIN, students[0]["_id"])
+    student_ids = [s["_id"] for s in students[1:]]
+
+    counts = {"students": len(students), "lost_items": 0, "found_items": 0, "claims": 0, "retrievals": 0}
+    buffers = {"lost_items": [], "found_items": [], "claims": [], "retrievals": []}
+    for docs in generator.items(student_ids, admin_id=students[0]["_id"]):
+        for name, doc in zip(buffers, docs):
+            if doc is not None:
+                buffers[name].append(doc)
+                counts[name] += 1
+        if len(buffers["lost_items"]) >= BATCH_SIZE:
+            _flush(db, buffers)
+    _flush(db, buffers)
+
+    Stats.reconcile()
+    db.bench_meta.replace_one(
+        {"_id": current_campus()},
+        {"scale": scale, "seed": seed, "counts": counts, "generated_at": datetime.utcnow()},
+        upsert=True,
+    )
+    return counts
+
+
+def existing_dataset() -> dict | None:
+    """Metadata of the dataset generated for the current campus, if any."""
+    return database().bench_meta.find_one({"_id": current_campus()})
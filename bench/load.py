@@ -0,0 +1,295 @@
+"""Mixed concurrent load modelled on real user flows.
+
+    python -m bench.load --duration 60 --users 32 --rate owner=2,finder=3,admin=0.2
+    python -m bench.load --target http://localhost:5000 --duration 60 --users 64
+
+Flows arrive as independent Poisson processes at the given rates (open loop:
+arrivals do not wait for earlier flows to finish) and are executed by up to
+``--users`` concurrent virtual users. Latency is measured per step; a flow's
+latency runs from its scheduled arrival, so time spent waiting for a free
+virtual user is included rather than hidden.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+from .dataset import ADMIN_EMAIL, PASSWORD, found_item_payload, lost_item_payload, search_query
+from .measure import latency_summary
+
+
+class InProcessTarget:
+    """Calls the Flask app through a test client per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: dict | None = None, json: dict | None = None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        try:
+            response = client.open(path, method=method.upper(), headers=headers, json=json)
+        except Exception:
+            return 0, None  # Exceptions propagated by the app count as failed requests
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTarget:
+    """Calls a running server over HTTP with a connection-pooling session per thread."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        import requests  # Only needed for HTTP targets
+
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: dict | None = None, json: dict | None = None):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        try:
+            response = session.request(method, self.base_url + path, headers=headers, json=json, timeout=self.timeout)
+        except self._requests.RequestException:
+            return 0, None  # Connection errors count as failed requests
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+
+class Recorder:
+    """Thread-safe collection of step and flow outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps: dict[str, dict] = {}
+        self.flows: dict[str, dict] = {}
+        self.start_lag_ms: list[float] = []
+
+    def step(self, name: str, status: int, ok: bool, latency_ms: float) -> None:
+        with self._lock:
+            entry = self.steps.setdefault(name, {"latencies": [], "errors": 0, "status_codes": {}})
+            entry["latencies"].append(latency_ms)
+            entry["errors"] += 0 if ok else 1
+            entry["status_codes"][status] = entry["status_codes"].get(status, 0) + 1
+
+    def flow(self, name: str, completed: bool, latency_ms: float, lag_ms: float) -> None:
+        with self._lock:
+            entry = self.flows.setdefault(name, {"latencies": [], "completed": 0, "aborted": 0})
+            entry["latencies"].append(latency_ms)
+            entry["completed" if completed else "aborted"] += 1
+            self.start_lag_ms.append(lag_ms)
+
+    def report(self, elapsed_s: float) -> dict:
+        steps = {}
+        for name, entry in sorted(self.steps.items()):
+            count = len(entry["latencies"])
+            steps[name] = {
+                "count": count,
+                "errors": entry["errors"],
+                "error_rate": round(entry["errors"] / count, 4) if count else None,
+                "throughput_rps": round(count / elapsed_s, 3),
+                "latency_ms": latency_summary(entry["latencies"]),
+                "status_codes": {str(k): v for k, v in sorted(entry["status_codes"].items())},
+            }
+        flows = {
+            name: {
+                "completed": entry["completed"],
+                "aborted": entry["aborted"],
+                "throughput_per_s": round(entry["completed"] / elapsed_s, 3),
+                "latency_ms": latency_summary(entry["latencies"]),
+            }
+            for name, entry in sorted(self.flows.items())
+        }
+        return {"steps": steps, "flows": flows, "start_lag_ms": latency_summary(self.start_lag_ms)}
+
+
+class FlowAborted(Exception):
+    pass
+
+
+class VirtualUser:
+    """One flow execution: issues the steps and records each one."""
+
+    def __init__(self, target, recorder: Recorder, rng: random.Random, flow_id: int):
+        self.target = target
+        self.recorder = recorder
+        self.rng = rng
+        self.flow_id = flow_id
+        self.headers: dict = {}
+
+    def call(self, step: str, method: str, path: str, json: dict | None = None, ok=(200, 201)):
+        started = time.perf_counter()
+        status, body = self.target.request(method, path, headers=self.headers or None, json=json)
+        success = status in ok
+        self.recorder.step(step, status, success, (time.perf_counter() - started) * 1000)
+        if not success:
+            raise FlowAborted(f"{step} returned {status}")
+        return status, body
+
+    def login(self, email: str, password: str) -> None:
+        _, body = self.call("login", "post", "/api/auth/login", json={"email": email, "password": password})
+        self.headers = {"Authorization": f"Bearer {body['token']}"}
+
+
+# Flows
+def owner_flow(vu: VirtualUser) -> None:
+    """A new student reports a lost item, searches, looks at matches and claims one."""
+    email = f"load-{os.getpid()}-{vu.flow_id}-{vu.rng.randrange(10 ** 9)}@load.example"
+    vu.call("register", "post", "/api/auth/register", json={"email": email, "name": "Load User", "password": PASSWORD})
+    vu.login(email, PASSWORD)
+    date_lost = datetime.utcnow() - timedelta(days=vu.rng.randrange(0, 5))
+    _, reported = vu.call("report_lost", "post", "/api/lost-items", json=lost_item_payload(vu.rng, date_lost))
+    _, items = vu.call("my_lost_items", "get", "/api/lost-items")
+    lost = next(item for item in items if item["passkey"] == reported["passkey"])
+    vu.call("search", "get", f"/api/found-items/search?q={quote(search_query(vu.rng))}")
+    _, matches = vu.call("view_matches", "get", f"/api/lost-items/{lost['id']}/matches")
+    if matches:
+        vu.call("claim", "post", "/api/claims", json={"lost_item_id": lost["id"], "found_item_id": matches[0]["id"]},
+                ok=(201, 409))
+
+
+def finder_flow(vu: VirtualUser) -> None:
+    """An existing student reports a found item."""
+    vu.login(f"student{vu.rng.randrange(1, 100)}@bench.example", PASSWORD)
+    vu.call("report_found", "post", "/api/found-items", json=found_item_payload(vu.rng))
+
+
+def admin_flow(vu: VirtualUser) -> None:
+    """The admin reviews claims, approves a pending one and records its retrieval."""
+    vu.login(ADMIN_EMAIL, PASSWORD)
+    _, claims = vu.call("admin_claims", "get", "/api/admin/claims")
+    pending = [claim for claim in claims if claim["status"] == "pending"]
+    if pending:
+        claim = vu.rng.choice(pending)
+        # Another admin flow may have approved it in the meantime
+        vu.call("approve_claim", "post", f"/api/admin/claims/{claim['id']}/approve")
+        vu.call("record_retrieval", "post", "/api/admin/retrievals", json={"claim_id": claim["id"]},
+                ok=(201, 400, 409))
+    vu.call("admin_retrievals", "get", "/api/admin/retrievals")
+
+
+FLOWS = {"owner": owner_flow, "finder": finder_flow, "admin": admin_flow}
+
+
+def arrival_schedule(rates: dict[str, float], duration_s: float, rng: random.Random) -> list[tuple[float, str]]:
+    """Poisson arrivals for every flow over ``duration_s``, sorted by time."""
+    arrivals = []
+    for name, rate in rates.items():
+        t = rng.expovariate(rate) if rate > 0 else duration_s
+        while t < duration_s:
+            arrivals.append((t, name))
+            t += rng.expovariate(rate)
+    return sorted(arrivals)
+
+
+def run_load(target, rates: dict[str, float], duration_s: float, users: int, seed: int) -> dict:
+    recorder = Recorder()
+    schedule = arrival_schedule(rates, duration_s, random.Random(seed))
+
+    def run_flow(flow_id: int, name: str, scheduled_at: float) -> None:
+        lag_ms = (time.perf_counter() - scheduled_at) * 1000
+        vu = VirtualUser(target, recorder, random.Random(seed * 1_000_003 + flow_id), flow_id)
+        completed = True
+        try:
+            FLOWS[name](vu)
+        except FlowAborted:
+            completed = False
+        except Exception as exc:  # A bug in the flow itself should not vanish into the pool
+            print(f"flow {name} #{flow_id} failed: {exc!r}", file=sys.stderr)
+            completed = False
+        recorder.flow(name, completed, (time.perf_counter() - scheduled_at) * 1000, lag_ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix="vu") as pool:
+        for flow_id, (offset, name) in enumerate(schedule):
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run_flow, flow_id, name, started + offset)
+    elapsed = time.perf_counter() - started
+    return {"arrivals": len(schedule), "elapsed_s": round(elapsed, 3), **recorder.report(elapsed)}
+
+
+def _parse_rates(value: str) -> dict[str, float]:
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() not in FLOWS:
+            raise argparse.ArgumentTypeError(f"unknown flow '{name.strip()}' (choose from {', '.join(FLOWS)})")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def _print_report(report: dict) -> None:
+    print(f"{report['arrivals']} flows in {report['elapsed_s']}s; "
+          f"start lag p95 {report['start_lag_ms']['p95']} ms")
+    print(f"{'step':<18} {'count':>7} {'rps':>8} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, step in report["steps"].items():
+        latency = step["latency_ms"]
+        print(f"{name:<18} {step['count']:>7} {step['throughput_rps']:>8.2f} {step['error_rate'] * 100:>5.1f}% "
+              f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}")
+    for name, flow in report["flows"].items():
+        print(f"flow {name:<13} completed {flow['completed']:>6}  aborted {flow['aborted']:>5}  "
+              f"p95 {flow['latency_ms']['p95']} ms")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="inprocess",
+                        help="'inprocess' (Flask test client) or a base URL such as http://localhost:5000")
+    parser.add_argument("--rate", type=_parse_rates, default="owner=2,finder=3,admin=0.2",
+                        help="Arrivals per second for each flow, e.g. owner=2,finder=3,admin=0.2")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of arrivals")
+    parser.add_argument("--users", type=int, default=32, help="Maximum concurrent virtual users")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    in_process = parser.add_argument_group("in-process target")
+    in_process.add_argument("--scale", default="1k", help="Benchmark dataset to load first (see bench.run)")
+    in_process.add_argument("--dataset-seed", type=int, default=42)
+    in_process.add_argument("--mongo-uri", default=os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017/lostfound_bench"))
+    in_process.add_argument("--force", action="store_true", help="Allow a database whose name lacks 'bench'")
+    in_process.add_argument("--engine", choices=("mongo", "memory"), default="mongo", help="Storage engine")
+    args = parser.parse_args(argv)
+
+    if args.target == "inprocess":
+        from .run import create_bench_app, ensure_dataset
+
+        app = create_bench_app(args.mongo_uri, allow_any_database=args.force, engine=args.engine)
+        with app.app_context():
+            ensure_dataset(args.scale, args.dataset_seed)
+        target = InProcessTarget(app)
+    else:
+        # The server needs a bench dataset (admin and student accounts) and
+        # rate limits raised, or throttled requests show up as 429 errors.
+        target = HttpTarget(args.target)
+
+    report = run_load(target, args.rate, args.duration, args.users, args.seed)
+    report["meta"] = {
+        "target": args.target,
+        "rates": args.rate,
+        "duration_s": args.duration,
+        "users": args.users,
+        "seed": args.seed,
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+    }
+    _print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Latency and Mongo-operation summaries shared by the benchmark and load-test tools."""
+import numpy as np
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    """Percentiles, mean and max of a list of latencies (milliseconds)."""
+    if not latencies_ms:
+        return {f"p{p}": None for p in PERCENTILES} | {"mean": None, "max": None}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    summary = {f"p{p}": round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+    summary["mean"] = round(float(values.mean()), 3)
+    summary["max"] = round(float(values.max()), 3)
+    return summary
+
+
+def ops_summary(per_request: list[dict]) -> dict:
+    """Average Mongo commands per request, overall and by command name.
+
+    ``per_request`` holds one :func:`backend.utils.mongo_monitor.summarize_commands`
+    result per request.
+    """
+    if not per_request:
+        return {"mean": None, "max": None, "by_command": {}}
+    totals = [sum(entry["count"] for entry in commands.values()) for commands in per_request]
+    by_command: dict[str, dict] = {}
+    for commands in per_request:
+        for name, entry in commands.items():
+            acc = by_command.setdefault(name, {"count": 0, "ms": 0.0})
+            acc["count"] += entry["count"]
+            acc["ms"] += entry["ms"]
+    n = len(per_request)
+    return {
+        "mean": round(sum(totals) / n, 3),
+        "max": max(totals),
+        "by_command": {
+            name: {"count": round(acc["count"] / n, 3), "ms": round(acc["ms"] / n, 3)}
+            for name, acc in sorted(by_command.items())
+        },
+    }
@@ -0,0 +1,217 @@
+"""Benchmark the hot API endpoints in-process and save the results as JSON.
+
+    python -m bench.run --scale 100k --requests 500
+
+Requests go through the Flask test client (no HTTP overhead), against a
+seeded dataset in a local mongod. For every scenario the latency
+percentiles and the MongoDB commands issued per request are reported.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import pymongo
+
+from .dataset import ADMIN_EMAIL, SCALES, existing_dataset, found_item_payload, generate, search_query
+from .measure import latency_summary, ops_summary
+
+DEFAULT_URI = "mongodb://localhost:27017/lostfound_bench"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def create_bench_app(mongo_uri: str, allow_any_database: bool = False, engine: str = "mongo"):
+    """The Flask app pointed at the benchmark database, with rate limits switched off.
+
+    With ``engine="memory"`` the dataset is generated in process and no mongod is needed.
+    """
+    database_name = pymongo.uri_parser.parse_uri(mongo_uri)["database"] or ""
+    if "bench" not in database_name and not allow_any_database:
+        sys.exit(f"Refusing to use database '{database_name}': its name must contain 'bench' (or pass --force)")
+    os.environ["MONGODB_URI"] = mongo_uri
+
+    from backend import create_app
+    from backend.utils.admission import DEFAULT_RULES
+
+    return create_app({"ADMISSION_RULES": {endpoint: None for endpoint in DEFAULT_RULES}, "STORAGE_ENGINE": engine})
+
+
+def ensure_dataset(scale: str, seed: int, regenerate: bool = False) -> dict:
+    """Generate the dataset unless one with the same scale and seed is already loaded."""
+    meta = existing_dataset()
+    if not regenerate and meta and meta["scale"] == scale and meta["seed"] == seed:
+        return meta["counts"]
+    print(f"Generating the {scale} dataset (seed {seed})...", file=sys.stderr)
+    started = time.monotonic()
+    counts = generate(scale, seed)
+    print(f"  done in {time.monotonic() - started:.1f}s: {counts}", file=sys.stderr)
+    return counts
+
+
+class BenchContext:
+    """Tokens and sample documents the scenarios draw their requests from."""
+
+    def __init__(self, seed: int, sample_size: int = 1000):
+        from backend.models.models import Student
+        from backend.utils.auth import create_token
+        from backend.utils.tenancy import current_campus, database, scoped
+
+        self.rng = random.Random(seed)
+        self._create_token = create_token
+        self.campus = current_campus()
+        admin = Student.find_by_email(ADMIN_EMAIL)
+        self.admin_headers = {"Authorization": f"Bearer {create_token(str(admin['_id']), 'admin', self.campus)}"}
+        # Sorted by _id so the sample is the same for every run on the same dataset
+        self.lost_items = list(database().lost_items.find(
+            scoped({"status": "pending"}), {"student_id": 1}
+        ).sort("_id", 1).limit(sample_size))
+        self.students = [s["_id"] for s in database().students.find(
+            scoped({"role": "student"}), {"_id": 1}
+        ).sort("_id", 1).limit(sample_size)]
+        self._tokens: dict = {}
+
+    def auth(self, student_id) -> dict:
+        token = self._tokens.get(student_id)
+        if token is None:
+            token = self._tokens[student_id] = self._create_token(str(student_id), "student", self.campus)
+        return {"Authorization": f"Bearer {token}"}
+
+# Each scenario returns (method, path, keyword arguments for the test client)
+def search_found_items(ctx: BenchContext):
+    return "get", f"/api/found-items/search?q={quote(search_query(ctx.rng))}", {}
+
+
+def suggest_matches(ctx: BenchContext):
+    lost = ctx.rng.choice(ctx.lost_items)
+    return "get", f"/api/lost-items/{lost['_id']}/matches", {"headers": ctx.auth(lost["student_id"])}
+
+
+def admin_get_claims(ctx: BenchContext):
+    return "get", "/api/admin/claims", {"headers": ctx.admin_headers}
+
+
+def get_retrievals(ctx: BenchContext):
+    return "get", "/api/admin/retrievals", {"headers": ctx.admin_headers}
+
+
+def report_found_item(ctx: BenchContext):
+    finder = ctx.rng.choice(ctx.students)
+    return "post", "/api/found-items", {"headers": ctx.auth(finder), "json": found_item_payload(ctx.rng)}
+
+
+SCENARIOS = {
+    "search_found_items": search_found_items,
+    "suggest_matches": suggest_matches,
+    "admin_get_claims": admin_get_claims,
+    "get_retrievals": get_retrievals,
+    # Writes last, so the read scenarios see the generated dataset unchanged
+    "report_found_item": report_found_item,
+}
+
+
+def run_scenario(client, ctx: BenchContext, scenario, requests: int, warmup: int) -> dict:
+    from backend.utils.mongo_monitor import record_commands, summarize_commands
+
+    for _ in range(warmup):
+        method, path, kwargs = scenario(ctx)
+        getattr(client, method)(path, **kwargs)
+
+    latencies, ops, statuses = [], [], {}
+    for _ in range(requests):
+        method, path, kwargs = scenario(ctx)
+        with record_commands() as commands:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        ops.append(summarize_commands(commands))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    return {
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "latency_ms": latency_summary(latencies),
+        "mongo_ops_per_request": ops_summary(ops),
+    }
+
+
+def _git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                  cwd=Path(__file__).resolve().parent).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo-uri", default=os.getenv("BENCH_MONGODB_URI", DEFAULT_URI))
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--output", type=Path, help="Result file (default: bench/results/<scale>-<commit>.json)")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate the dataset even if it is loaded")
+    parser.add_argument("--force", action="store_true", help="Allow a database whose name lacks 'bench'")
+    parser.add_argument("--engine", choices=("mongo", "memory"), default="mongo",
+                        help="Storage engine (memory: in-process, no mongod needed)")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    app = create_bench_app(args.mongo_uri, allow_any_database=args.force, engine=args.engine)
+    client = app.test_client()
+    with app.app_context():
+        from backend.storage import storage
+
+        counts = ensure_dataset(args.scale, args.seed, regenerate=args.regenerate)
+        ctx = BenchContext(args.seed)
+        results = {}
+        for name in names:
+            results[name] = run_scenario(client, ctx, SCENARIOS[name], args.requests, args.warmup)
+            latency = results[name]["latency_ms"]
+            print(f"{name:<20} p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+                  f"p99 {latency['p99']:>8.2f} ms  ops/req {results[name]['mongo_ops_per_request']['mean']:>6.2f}  "
+                  f"errors {results[name]['errors']}")
+        mongod_version = storage().client.server_info()["version"]
+
+    revision = _git_revision()
+    report = {
+        "meta": {
+            **revision,
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "scale": args.scale,
+            "engine": args.engine,
+            "seed": args.seed,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "python": platform.python_version(),
+            "pymongo": pymongo.version,
+            "mongod": mongod_version,
+            "machine": platform.platform(),
+        },
+        "dataset": counts,
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / f"{args.scale}-{revision['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Outlet } from 'react-router-dom';
 import {
-  Box, CssBaseline, ThemeProvider, IconButton, AppBar, Toolbar, Typography, Button, GlobalStyles
+  Box, CssBaseline, ThemeProvider, IconButton, AppBar, Toolbar, Typography, Button, GlobalStyles,
+  Snackbar, Alert
 } from '@mui/material';
 import { 
   Brightness4 as Brightness4Icon, 
@@ -10,9 +11,14 @@ import {
 } from '@mui/icons-material';
 import getTheme from '../theme';
 import Sidebar from './Sidebar';
+import { eventsService } from '../services/api';
 
 const Dashboard = ({ onLogout }) => {
   const [mode, setMode] = useState('light');
+  const [notification, setNotification] = useState(null);
+
+  // Live match/claim/retrieval notifications instead of polling
+  useEffect(() => eventsService.subscribe(setNotification), []);
 
   const toggleColorMode = () => {
     setMode((prevMode) => (prevMode === 'light' ? 'dark' : 'light'));
@@ -55,6 +61,16 @@ const Dashboard = ({ onLogout }) => {
           <Outlet />
         </Box>
       </Box>
+      <Snackbar
+        open={Boolean(notification)}
+        autoHideDuration={6000}
+        onClose={() => setNotification(null)}
+        anchorOrigin={{ vertical: 'bottom', horizontal: 'right' }}
+      >
+        <Alert severity="info" onClose={() => setNotification(null)} sx={{ width: '100%' }}>
+          {notification?.message}
+        </Alert>
+      </Snackbar>
     </ThemeProvider>
   );
 };
@@ -7,7 +7,9 @@ import {
   Grid,
   CircularProgress,
   Paper,
-  InputAdornment
+  InputAdornment,
+  Chip,
+  Stack
 } from '@mui/material';
 import SearchIcon from '@mui/icons-material/Search';
 import { itemsService } from '../services/api';
@@ -19,6 +21,8 @@ export default function SearchFoundItems() {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searched, setSearched] = useState(false);
+  const [facets, setFacets] = useState({});
+  const [filters, setFilters] = useState({});
 
   useEffect(() => {
     loadAllFoundItems();
@@ -37,27 +41,49 @@ export default function SearchFoundItems() {
     }
   };
 
-  const handleSearch = async (e) => {
-    e.preventDefault();
-    if (!query.trim()) {
-      loadAllFoundItems();
-      setSearched(false);
-      return;
-    }
-
+  const runSearch = async (activeFilters) => {
     setLoading(true);
     setSearched(true);
     try {
-      const data = await itemsService.searchFoundItems(query);
-      setResults(data);
+      // One request returns both the hits and the per-facet counts
+      const data = await itemsService.searchFoundItems(query, {
+        ...activeFilters,
+        facets: 'category,location'
+      });
+      setResults(data.results);
+      setFacets(data.facets);
     } catch (error) {
       console.error('Search failed:', error);
       setResults([]);
+      setFacets({});
     } finally {
       setLoading(false);
     }
   };
 
+  const handleSearch = async (e) => {
+    e.preventDefault();
+    setFilters({});
+    if (!query.trim()) {
+      loadAllFoundItems();
+      setSearched(false);
+      setFacets({});
+      return;
+    }
+    runSearch({});
+  };
+
+  const toggleFilter = (facet, value) => {
+    const next = { ...filters };
+    if (next[facet] === value) {
+      delete next[facet];
+    } else {
+      next[facet] = value;
+    }
+    setFilters(next);
+    runSearch(next);
+  };
+
   return (
     <Box>
       <Hero 
@@ -120,6 +146,25 @@ export default function SearchFoundItems() {
           </Box>
         )}
 
+        {!loading && searched && Object.entries(facets).map(([facet, buckets]) => (
+          buckets.length > 0 && (
+            <Stack key={facet} direction="row" spacing={1} useFlexGap flexWrap="wrap" sx={{ mb: 2 }}>
+              <Typography variant="body2" sx={{ mr: 1, alignSelf: 'center', textTransform: 'capitalize' }}>
+                {facet}:
+              </Typography>
+              {buckets.map(({ value, count }) => (
+                <Chip
+                  key={value ?? 'unknown'}
+                  label={`${value ?? 'Unknown'} (${count})`}
+                  color={filters[facet] === value ? 'primary' : 'default'}
+                  onClick={() => toggleFilter(facet, value)}
+                  size="small"
+                />
+              ))}
+            </Stack>
+          )
+        ))}
+
         {!loading && (
           <Box>
             <Typography variant="h6" gutterBottom>
@@ -1,6 +1,10 @@
 import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
+// The SSE stream is served by the async app (backend/aio); the Flask dev server also serves it
+const EVENTS_URL = import.meta.env.VITE_EVENTS_URL || API_URL;
+// Campus for login/registration and anonymous searches (logged-in requests use the token's campus)
+const CAMPUS = import.meta.env.VITE_CAMPUS;
 
 // Add token to requests if available
 axios.interceptors.request.use((config) => {
@@ -8,6 +12,9 @@ axios.interceptors.request.use((config) => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  if (CAMPUS) {
+    config.headers['X-Campus'] = CAMPUS;
+  }
   return config;
 });
 
@@ -205,4 +212,27 @@ export const retrievalService = {
     const response = await axios.get(`${API_URL}/retrievals/my`);
     return response.data;
   }
-};
\ No newline at end of file
+};
+const EVENT_MESSAGES = {
+  new_match: 'New potential match found for one of your lost items',
+  claim_created: 'A claim was created for one of your items',
+  claim_approved: 'Your claim was approved',
+  claim_rejected: 'Your claim was rejected',
+  retrieval_recorded: 'Your item retrieval was recorded'
+};
+
+export const eventsService = {
+  // Opens the SSE stream; returns a function that closes it
+  subscribe: (onEvent) => {
+    const token = localStorage.getItem('token');
+    if (!token || typeof EventSource === 'undefined') return () => {};
+
+    const source = new EventSource(`${EVENTS_URL}/events?token=${encodeURIComponent(token)}`);
+    Object.keys(EVENT_MESSAGES).forEach((type) => {
+      source.addEventListener(type, (e) => {
+        onEvent({ type, message: EVENT_MESSAGES[type], data: JSON.parse(e.data) });
+      });
+    });
+    return () => source.close();
+  }
+};